@@ -0,0 +1,92 @@
+# Compares the prebuilt bindparam statements against building the same
+# select on every call. Run from the repository root:
+#   python benchmarks/prebuilt_statements.py
+import asyncio
+import os
+import sys
+import tempfile
+from time import perf_counter
+
+TEMP_DIR = tempfile.mkdtemp(prefix="church-app-bench-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{TEMP_DIR}/bench.db"
+)
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("CRYPTO_KEY", "bench-crypto-key")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from sqlalchemy import insert, select
+import models
+from models import User
+from database import Base, engine, session
+from controller.crud.user import USER_BY_CPF
+
+CALLS = 5000
+ROUNDS = 3
+USERS = 1000
+
+
+def get_cpf(number: int) -> str:
+    return f"{number:011d}"
+
+
+def build_per_call(cpf: str):
+    statement = select(User).filter(User.cpf == cpf)
+    return statement, None
+
+
+def build_prebuilt(cpf: str):
+    return USER_BY_CPF, {"user_cpf": cpf}
+
+
+def time_build(build) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        for number in range(CALLS):
+            statement, _ = build(get_cpf(number % USERS))
+            statement._generate_cache_key()
+        best = min(best, perf_counter() - start)
+    return best / CALLS
+
+
+async def time_execute(build) -> float:
+    best = float("inf")
+    async with session() as db_session:
+        for _ in range(ROUNDS):
+            start = perf_counter()
+            for number in range(CALLS):
+                statement, parameters = build(get_cpf(number % USERS))
+                result = await db_session.execute(statement, parameters)
+                result.scalars().first()
+            best = min(best, perf_counter() - start)
+    return best / CALLS
+
+
+async def main() -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(
+            insert(User),
+            [
+                {"cpf": get_cpf(number), "phone": get_cpf(number)}
+                for number in range(USERS)
+            ],
+        )
+
+    print(f"get_user_by_cpf, {CALLS} calls, best of {ROUNDS}")
+    print(f"{'statement':<12}{'build + cache key':>20}{'end to end':>14}")
+    for name, build in (
+        ("per call", build_per_call),
+        ("prebuilt", build_prebuilt),
+    ):
+        build_time = time_build(build) * 1e6
+        execute_time = await time_execute(build) * 1e6
+        print(f"{name:<12}{build_time:>17.1f} us{execute_time:>11.1f} us")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
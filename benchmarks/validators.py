@@ -0,0 +1,118 @@
+# Compares the scalar sign-up validators against the batch functions used
+# by the member import. Run from the repository root:
+#   python benchmarks/validators.py
+import os
+import random
+import sys
+from time import perf_counter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from fastapi import HTTPException
+from controller.validators.cpf import CPFValidator, validate_cpfs
+from controller.validators.date import DateValidator, validate_birthdays
+from controller.validators.name import NameValidator, validate_names
+from controller.validators.password import (
+    PasswordValidator,
+    validate_passwords,
+)
+from controller.validators.phone import PhoneValidator, validate_phones
+from controller.validators.sign_validator import (
+    SignUpValidator,
+    validate_sign_ups,
+)
+
+VALUES = 50_000
+ROWS = 20_000
+ROUNDS = 3
+SEED = 18
+
+
+def get_cpf(generator: random.Random) -> str:
+    digits = [generator.randrange(10) for _ in range(9)]
+    for weight in (10, 11):
+        total = sum(
+            digit * (weight - index) for index, digit in enumerate(digits)
+        )
+        digit = 11 - total % 11
+        digits.append(0 if digit > 9 else digit)
+    if generator.random() < 0.2:
+        digits[10] = (digits[10] + 1) % 10
+    return "".join(map(str, digits))
+
+
+def get_name(generator: random.Random) -> str:
+    name = generator.choice(["Maria", "Jose", "Ana", "Joao", "Lu"])
+    return name if generator.random() > 0.1 else name + "1"
+
+
+def get_birthday(generator: random.Random) -> str:
+    year = generator.randint(1900, 2020)
+    return f"{year}-{generator.randint(1, 12)}-{generator.randint(1, 28)}"
+
+
+def get_password(generator: random.Random) -> str:
+    return generator.choice(["Senha@123", "senha@123", "Senha 123", "S@1"])
+
+
+def get_phone(generator: random.Random) -> str:
+    number = generator.randrange(10**8, 10**9)
+    return generator.choice([f"+55119{number}", f"(11) 9{number}", "123"])
+
+
+FIELDS = (
+    ("cpf", CPFValidator, validate_cpfs, get_cpf),
+    ("name", NameValidator, validate_names, get_name),
+    ("birthday", DateValidator, validate_birthdays, get_birthday),
+    ("password", PasswordValidator, validate_passwords, get_password),
+    ("phone", PhoneValidator, validate_phones, get_phone),
+)
+
+
+def run_scalar(validator, values: list) -> list[str | None]:
+    errors = []
+    for value in values:
+        try:
+            validator(value)
+            errors.append(None)
+        except HTTPException as error:
+            errors.append(error.detail)
+    return errors
+
+
+def best_of(function, *args) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        function(*args)
+        best = min(best, perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    generator = random.Random(SEED)
+    print(f"{VALUES} values per field, best of {ROUNDS}, per item")
+    print(f"{'field':<10}{'scalar':>10}{'batch':>10}{'speedup':>10}")
+    for field, validator, validate, get_value in FIELDS:
+        values = [get_value(generator) for _ in range(VALUES)]
+        assert run_scalar(validator, values) == validate(values)
+        scalar = best_of(run_scalar, validator, values) / VALUES * 1e6
+        batch = best_of(validate, values) / VALUES * 1e6
+        print(
+            f"{field:<10}{scalar:>8.1f}us{batch:>8.1f}us"
+            f"{scalar / batch:>9.1f}x"
+        )
+
+    rows = [
+        {field: get_value(generator) for field, _, _, get_value in FIELDS}
+        for _ in range(ROWS)
+    ]
+    assert run_scalar(SignUpValidator, rows) == validate_sign_ups(rows)
+    scalar = best_of(run_scalar, SignUpValidator, rows)
+    batch = best_of(validate_sign_ups, rows)
+    print(f"{ROWS} sign-up rows: {scalar:.2f}s -> {batch:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,22 @@
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives import padding, hashes
 from cryptography.hazmat.backends import default_backend
+from functools import lru_cache
 import base64
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 CRYPTO_KEY = os.getenv("CRYPTO_KEY")
+CRYPTO_KEY_SALT = os.getenv("CRYPTO_KEY_SALT", "church-app-cpf").encode()
+VERSION_PREFIX = "v2:"
+HKDF_INFO = b"cpf"
 
 
 def derive_key(password: str, salt: bytes) -> bytes:
     from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-    from cryptography.hazmat.primitives import hashes
 
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
@@ -23,24 +28,64 @@ def derive_key(password: str, salt: bytes) -> bytes:
     return kdf.derive(password.encode())
 
 
+@lru_cache(maxsize=8)
+def get_master_key(password: str, salt: bytes = CRYPTO_KEY_SALT) -> bytes:
+    return derive_key(password, salt)
+
+
+def derive_message_key(master_key: bytes, salt: bytes) -> bytes:
+    hkdf = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        info=HKDF_INFO,
+        backend=default_backend(),
+    )
+    return hkdf.derive(master_key)
+
+
 def encrypt(message: str, password: str = CRYPTO_KEY) -> str:
+    master_key = get_master_key(password)
     salt = os.urandom(16)
-    key = derive_key(password, salt)
     nonce = os.urandom(12)
-    cipher = Cipher(
-        algorithms.AES(key), modes.GCM(nonce), backend=default_backend()
+    key = derive_message_key(master_key, salt)
+    encrypted_message = AESGCM(key).encrypt(
+        nonce, message.encode(), VERSION_PREFIX.encode()
     )
-    encryptor = cipher.encryptor()
+    encrypted_data = salt + nonce + encrypted_message
+    return VERSION_PREFIX + base64.b64encode(encrypted_data).decode("utf-8")
 
-    padder = padding.PKCS7(algorithms.AES.block_size).padder()
-    padded_message = padder.update(message.encode()) + padder.finalize()
 
-    encrypted_message = encryptor.update(padded_message) + encryptor.finalize()
-    encrypted_data = salt + nonce + encryptor.tag + encrypted_message
-    return base64.b64encode(encrypted_data).decode("utf-8")
+def decrypt(encrypted_message: str, password: str = CRYPTO_KEY) -> str:
+    if not encrypted_message.startswith(VERSION_PREFIX):
+        return decrypt_legacy(encrypted_message, password)
+    encrypted_data = base64.b64decode(encrypted_message[len(VERSION_PREFIX) :])
+    salt, nonce, encrypted_message = (
+        encrypted_data[:16],
+        encrypted_data[16:28],
+        encrypted_data[28:],
+    )
+    key = derive_message_key(get_master_key(password), salt)
+    decrypted_message = AESGCM(key).decrypt(
+        nonce, encrypted_message, VERSION_PREFIX.encode()
+    )
+    return decrypted_message.decode("utf-8")
 
 
-def decrypt(encrypted_message: str, password: str = CRYPTO_KEY) -> str:
+def encrypt_many(messages: list[str], password: str = CRYPTO_KEY) -> list[str]:
+    return [encrypt(message, password) for message in messages]
+
+
+def decrypt_many(
+    encrypted_messages: list[str], password: str = CRYPTO_KEY
+) -> list[str]:
+    return [
+        decrypt(encrypted_message, password)
+        for encrypted_message in encrypted_messages
+    ]
+
+
+def decrypt_legacy(encrypted_message: str, password: str = CRYPTO_KEY) -> str:
     encrypted_data = base64.b64decode(encrypted_message)
     salt, nonce, tag, encrypted_message = (
         encrypted_data[:16],
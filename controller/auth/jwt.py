@@ -1,32 +1,76 @@
 from jose import jwt
 from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from time import time
+from cachetools import TLRUCache
 from dotenv import load_dotenv
 from os import getenv
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import Depends
 from typing import Annotated
 from controller.errors.http.exceptions import unauthorized
+from controller.src.cache import MeteredCache
 
 load_dotenv()
 
 SECRET_KEY = getenv("SECRET_KEY")
 ALGORITHM = getenv("ALGORITHM")
 EXPIRE_MINUTES = 60 * 30
+TOKEN_CACHE_SIZE = int(getenv("TOKEN_CACHE_SIZE", 4096))
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/signin")
 
 
-def create_access_token(cpf: str, position: str = "user"):
+def get_token_expiry(key: str, value: tuple[dict, float], now: float):
+    return value[1]
+
+
+# Only a token identical to one that was already verified can hit, so
+# claims are never served for an unverified signature.
+token_cache = MeteredCache(
+    "token",
+    TLRUCache(maxsize=TOKEN_CACHE_SIZE, ttu=get_token_expiry, timer=time),
+)
+
+
+def create_access_token(
+    cpf: str,
+    position: str = "user",
+    user_id: str | None = None,
+    community_id: str | None = None,
+    community_patron: str | None = None,
+):
     expire = datetime.now(timezone.utc) + timedelta(minutes=EXPIRE_MINUTES)
     jwt_data = {"sub_cpf": cpf, "sub_position": position, "exp": expire}
+    if user_id:
+        jwt_data["sub_id"] = user_id
+    if community_id:
+        jwt_data["sub_community_id"] = community_id
+    if community_patron:
+        jwt_data["sub_community_patron"] = community_patron
     encoded_jwt = jwt.encode(jwt_data, key=SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def get_token_digest(token: str) -> str:
+    return sha256(token.encode()).hexdigest()
+
+
 def decode_token(token: Annotated[str, Depends(oauth2_scheme)]) -> dict:
+    digest = get_token_digest(token) if token else None
+    cached = token_cache.get(digest) if digest else None
+    if cached is not None:
+        return dict(cached[0])
     try:
         payload = jwt.decode(token, key=SECRET_KEY, algorithms=ALGORITHM)
-        cpf = payload.get("sub_cpf")
-        position = payload.get("sub_position")
-        return {"cpf": cpf, "position": position}
+        claims = {
+            "cpf": payload.get("sub_cpf"),
+            "position": payload.get("sub_position"),
+            "id": payload.get("sub_id"),
+            "community_id": payload.get("sub_community_id"),
+            "community_patron": payload.get("sub_community_patron"),
+        }
     except:
         raise unauthorized("Token expired or invalid")
+    if payload.get("exp"):
+        token_cache.set(digest, (claims, payload["exp"]))
+    return dict(claims)
@@ -1,11 +1,96 @@
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from os import cpu_count, getenv
+from time import perf_counter
+from dotenv import load_dotenv
 from passlib.context import CryptContext
+from controller.errors.http.exceptions import service_unavailable
+from controller.src.metrics import Counter, Histogram, register_collector
+
+load_dotenv()
+
+PASSWORD_HASH_WORKERS = int(getenv("PASSWORD_HASH_WORKERS", cpu_count() or 2))
+PASSWORD_HASH_MAX_IN_FLIGHT = int(getenv("PASSWORD_HASH_MAX_IN_FLIGHT", 64))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHasher:
+    def __init__(self, workers: int, max_in_flight: int) -> None:
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password"
+        )
+        self.in_flight = 0
+        self.rejected = Counter()
+        self.queue_wait = Histogram()
+        self.latency = Histogram()
+
+    async def run(self, function, *args):
+        # Past this point a caller would wait longer for a worker than the
+        # client is willing to, so refuse early instead of queueing.
+        if self.in_flight >= self.max_in_flight:
+            self.rejected.inc()
+            service_unavailable("Too many login attempts, try again later")
+        self.in_flight += 1
+        submitted = perf_counter()
+        try:
+            loop = get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self.executor, partial(timed_call, function, *args)
+            )
+        finally:
+            self.in_flight -= 1
+        self.queue_wait.observe(started - submitted)
+        self.latency.observe(finished - started)
+        return result
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(self.in_flight - self.workers, 0),
+            "rejected": self.rejected.value,
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "latency_seconds": self.latency.snapshot(),
+        }
+
+    def __repr__(self) -> str:
+        return f"PasswordHasher(workers={self.workers!r})"
+
+
+def timed_call(function, *args) -> tuple:
+    started = perf_counter()
+    result = function(*args)
+    return result, started, perf_counter()
+
+
+password_hasher = PasswordHasher(
+    PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_IN_FLIGHT
+)
+register_collector("password_hasher", password_hasher.get_metrics)
+
+
 def hash_pasword(password: str) -> str:
     return pwd_context.hash(password)
 
 
 def verify_hashed_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
+
+
+async def hash_pasword_async(password: str) -> str:
+    return await password_hasher.run(hash_pasword, password)
+
+
+async def verify_hashed_password_async(
+    plain_password: str, hashed_password: str
+) -> bool:
+    return await password_hasher.run(
+        verify_hashed_password, plain_password, hashed_password
+    )
@@ -1,17 +1,29 @@
-from sqlalchemy import select
+from sqlalchemy import select, update, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Community, User
 from controller.crud.crud import CRUD
 from controller.errors.http.exceptions import not_found, internal_server_error
 
 
+COMMUNITY_BY_PATRON = select(Community).filter(
+    Community.patron == bindparam("community_patron")
+)
+COMMUNITY_BY_ID = select(Community).filter(
+    Community.id == bindparam("community_id")
+)
+
+
 class CommunityCrud(CRUD):
     def __init__(self) -> None:
         super().__init__()
 
     async def get_communities_paginated(
-        self, page: int = 1, page_size: int = 100
+        self,
+        page: int = 1,
+        page_size: int = 100,
+        session: AsyncSession | None = None,
     ) -> [Community]:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
                 offset = (page - 1) * page_size
                 statement = select(Community).offset(offset).limit(page_size)
@@ -19,13 +31,15 @@ class CommunityCrud(CRUD):
                 communities = communities.scalars().all()
                 return communities
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def get_community_image(self, community_id: str):
-        async with self.session() as session:
+    async def get_community_image(
+        self, community_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(Community).filter(
                     Community.id == community_id
@@ -34,11 +48,13 @@ class CommunityCrud(CRUD):
                 community = community.scalars().first()
                 return community.image
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_community_image(self, community_id: str) -> Community:
-        async with self.session() as session:
+    async def delete_community_image(
+        self, community_id: str, session: AsyncSession | None = None
+    ) -> Community:
+        async with self.get_session(session) as session:
             try:
                 statement = select(Community).filter(
                     Community.id == community_id
@@ -46,14 +62,16 @@ class CommunityCrud(CRUD):
                 community = await session.execute(statement)
                 community = community.scalars().first()
                 community.image = None
-                await session.commit()
+                await self.commit(session)
                 return community
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def update_community_image(self, community_id: str, image):
-        async with self.session() as session:
+    async def update_community_image(
+        self, community_id: str, image, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(Community).filter(
                     Community.id == community_id
@@ -61,16 +79,20 @@ class CommunityCrud(CRUD):
                 community = await session.execute(statement)
                 community = community.scalars().first()
                 community.image = image
-                await session.commit()
+                await self.commit(session)
                 return community
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def get_all_community_users_paginated(
-        self, community_id: str, page: int = 1, page_size: int = 100
+        self,
+        community_id: str,
+        page: int = 1,
+        page_size: int = 100,
+        session: AsyncSession | None = None,
     ) -> [User]:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
                 offset = (page - 1) * page_size
                 statement = (
@@ -83,57 +105,63 @@ class CommunityCrud(CRUD):
                 users = result.scalars().all()
                 return users
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def get_all_communities(self):
-        async with self.session() as session:
+    async def get_all_communities(self, session: AsyncSession | None = None):
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(Community)
                 communities = await session.execute(statement)
                 return communities.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_community_by_patron(self, community_patron: str):
-        async with self.session() as session:
+    async def get_community_by_patron(
+        self, community_patron: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
-                statement = select(Community).filter(
-                    Community.patron == community_patron
+                community = await session.execute(
+                    COMMUNITY_BY_PATRON, {"community_patron": community_patron}
                 )
-                community = await session.execute(statement)
                 return community.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_community_by_id(self, community_id: str):
-        async with self.session() as session:
+    async def get_community_by_id(
+        self, community_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
-                statement = select(Community).filter(
-                    Community.id == community_id
+                community = await session.execute(
+                    COMMUNITY_BY_ID, {"community_id": community_id}
                 )
-                community = await session.execute(statement)
                 return community.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def create_community(self, community: Community):
-        async with self.session() as session:
+    async def create_community(
+        self, community: Community, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 session.add(community)
-                await session.commit()
+                await self.commit(session)
                 return community
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def update_community(self, new_community: dict):
-        async with self.session() as session:
+    async def update_community(
+        self, new_community: dict, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(Community).filter(
                     Community.id == new_community["id"]
@@ -154,24 +182,28 @@ class CommunityCrud(CRUD):
                             community.location = new_community["location"]
                         case "active":
                             community.active = new_community["active"]
-                await session.commit()
+                await self.commit(session)
                 return community
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_community(self, community: Community):
-        async with self.session() as session:
+    async def delete_community(
+        self, community: Community, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 await session.delete(community)
-                await session.commit()
+                await self.commit(session)
                 return f"{community} deleted with successfull"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_community_by_id(self, community_id: str):
-        async with self.session() as session:
+    async def delete_community_by_id(
+        self, community_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(Community).filter(
                     Community.id == community_id
@@ -179,45 +211,80 @@ class CommunityCrud(CRUD):
                 community = await session.execute(statement)
                 community = community.scalars().first()
                 await session.delete(community)
-                await session.commit()
+                await self.commit(session)
                 return f"{community} deleted with succesfull"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def increase_actual_month_payment_value(
-        self, community_id: str, value: int
+        self,
+        community_id: str,
+        value: int,
+        session: AsyncSession | None = None,
     ) -> Community:
-        async with self.session() as session:
+        async with self.get_session(session) as session:
             try:
-                statement = select(Community).filter(
-                    Community.id == community_id
+                statement = (
+                    update(Community)
+                    .where(Community.id == community_id)
+                    .values(
+                        actual_month_total_payment_value=(
+                            Community.actual_month_total_payment_value + value
+                        )
+                    )
+                    .returning(Community)
                 )
                 community = await session.execute(statement)
                 community = community.scalars().first()
-                community.actual_month_total_payment_value += value
-                await session.commit()
+                await self.commit(session)
                 return community
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
+    async def transfer_all_actual_to_last_month_and_reset_actual(
+        self, session: AsyncSession | None = None
+    ) -> int:
+        # One statement for every community: paging while updating the
+        # same table could skip a community or reset one twice.
+        async with self.get_session(session) as session:
+            try:
+                statement = update(Community).values(
+                    last_month_total_payment_value=(
+                        Community.actual_month_total_payment_value
+                    ),
+                    actual_month_total_payment_value=0,
+                )
+                result = await session.execute(statement)
+                await self.commit(session)
+                return result.rowcount
+            except Exception as error:
+                await self.rollback(session)
+                raise internal_server_error(
+                    f"A error occurs during CRUD: {error!r}"
+                )
+
     async def transfer_actual_to_last_month_and_reset_actual(
-        self, community_id: str
+        self, community_id: str, session: AsyncSession | None = None
     ) -> Community:
-        async with self.session() as session:
+        async with self.get_session(session) as session:
             try:
-                statement = select(Community).filter(
-                    Community.id == community_id
+                statement = (
+                    update(Community)
+                    .where(Community.id == community_id)
+                    .values(
+                        last_month_total_payment_value=(
+                            Community.actual_month_total_payment_value
+                        ),
+                        actual_month_total_payment_value=0,
+                    )
+                    .returning(Community)
                 )
                 community = await session.execute(statement)
                 community = community.scalars().first()
-                community.last_month_total_payment_value = (
-                    community.actual_month_total_payment_value
-                )
-                community.actual_month_total_payment_value = 0
-                await session.commit()
+                await self.commit(session)
                 return community
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
@@ -1,11 +1,107 @@
-from database import session
+from contextlib import asynccontextmanager
+from dataclasses import fields
+from typing import AsyncIterator, Any
+from sqlalchemy import Executable, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from os import getenv
+from database import (
+    session,
+    get_read_sessionmaker,
+    is_unit_of_work,
+    REPLICA_MAX_STALENESS,
+)
+from controller.errors.http.exceptions import not_found
+
+load_dotenv()
 
 SESSION = session
+STREAM_CHUNK_SIZE = int(getenv("STREAM_CHUNK_SIZE", 500))
+
+
+def columns_for(model, projection) -> list:
+    return [getattr(model, field.name) for field in fields(projection)]
 
 
 class CRUD:
     def __init__(self) -> None:
         self.session = SESSION
 
+    @asynccontextmanager
+    async def get_session(
+        self, session: AsyncSession | None = None
+    ) -> AsyncIterator[AsyncSession]:
+        if session is not None:
+            yield session
+            return
+        async with self.session() as new_session:
+            yield new_session
+
+    @asynccontextmanager
+    async def get_read_session(
+        self,
+        session: AsyncSession | None = None,
+        max_staleness: float = REPLICA_MAX_STALENESS,
+    ) -> AsyncIterator[AsyncSession]:
+        # A caller's session keeps its reads on the primary, next to the
+        # writes it made.
+        if session is not None:
+            yield session
+            return
+        read_session = await get_read_sessionmaker(max_staleness)
+        async with read_session() as new_session:
+            yield new_session
+
+    async def get_rows(
+        self,
+        statement: Executable,
+        parameters: dict | None = None,
+        into: type | None = None,
+        session: AsyncSession | None = None,
+        max_staleness: float = REPLICA_MAX_STALENESS,
+    ) -> list[Row] | list[Any]:
+        async with self.get_read_session(session, max_staleness) as session:
+            try:
+                result = await session.execute(statement, parameters)
+                if into is None:
+                    return result.all()
+                return [into(*row) for row in result]
+            except Exception as error:
+                await self.rollback(session)
+                raise not_found(f"A error occurs during CRUD: {error!r}")
+
+    async def get_row(
+        self,
+        statement: Executable,
+        parameters: dict | None = None,
+        into: type | None = None,
+        session: AsyncSession | None = None,
+        max_staleness: float = REPLICA_MAX_STALENESS,
+    ) -> Row | Any | None:
+        async with self.get_read_session(session, max_staleness) as session:
+            try:
+                result = await session.execute(statement, parameters)
+                row = result.first()
+                if row is None or into is None:
+                    return row
+                return into(*row)
+            except Exception as error:
+                await self.rollback(session)
+                raise not_found(f"A error occurs during CRUD: {error!r}")
+
+    async def commit(self, session: AsyncSession) -> None:
+        if is_unit_of_work(session):
+            await session.flush()
+            return
+        await session.commit()
+
+    async def rollback(self, session: AsyncSession) -> None:
+        # The request's unit of work owns its transaction; rolling it back
+        # here would silently drop every write made earlier in the request.
+        # The error is re-raised and get_session rolls back once.
+        if is_unit_of_work(session):
+            return
+        await session.rollback()
+
     def __repr__(self) -> str:
         return "CRUD()"
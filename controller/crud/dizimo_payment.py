@@ -1,77 +1,124 @@
 from models import DizimoPayment
-from sqlalchemy import select, and_
+from sqlalchemy import select, update, and_, bindparam, Row
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import AsyncIterator
 from controller.errors.http.exceptions import not_found, internal_server_error
 from controller.src.dizimo_payment import is_valid_payment_status
-from controller.src.dizimo_payment import pass_data_to
-from controller.crud.crud import CRUD
+from controller.src.dizimo_payment import pass_data_to, ACTIVE, PAID
+from controller.crud.crud import CRUD, STREAM_CHUNK_SIZE
+
+
+PAYMENT_BY_ID = select(DizimoPayment).filter(
+    DizimoPayment.id == bindparam("payment_id")
+)
+PAYMENT_BY_CORRELATION_ID = select(DizimoPayment).filter(
+    DizimoPayment.correlation_id == bindparam("correlation_id")
+)
+PAYMENT_BY_MONTH_YEAR_AND_USER_ID = select(DizimoPayment).filter(
+    and_(
+        DizimoPayment.user_id == bindparam("user_id"),
+        and_(
+            DizimoPayment.month == bindparam("month"),
+            DizimoPayment.year == bindparam("year"),
+        ),
+    )
+)
 
 
 class DizimoPaymentCrud(CRUD):
     def __init__(self) -> None:
         super().__init__()
 
-    async def get_all(self):
-        async with self.session() as session:
+    async def get_all(self, session: AsyncSession | None = None):
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(DizimoPayment)
                 payments = await session.execute(statement)
                 return payments.scalars().all()
             except Exception as error:
-                await session.rollback()
-                raise internal_server_error(f"A error occurs during CRUD: {error!r}")
+                await self.rollback(session)
+                raise internal_server_error(
+                    f"A error occurs during CRUD: {error!r}"
+                )
 
     async def get_all_user_dizimo_payment(
-        self, user_id: str, page: int = 1, page_size: int = 100
+        self,
+        user_id: str,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        session: AsyncSession | None = None,
     ) -> AsyncIterator:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
-                offset = (page - 1) * page_size
                 statement = (
                     select(DizimoPayment)
                     .filter(DizimoPayment.user_id == user_id)
-                    .offset(offset)
-                    .limit(page_size)
+                    .execution_options(yield_per=chunk_size)
                 )
-                dizimo_payments = await session.execute(statement)
-                dizimo_payments = dizimo_payments.scalars().all()
-                yield dizimo_payments
+                dizimo_payments = await session.stream_scalars(statement)
+                async for chunk in dizimo_payments.partitions():
+                    yield chunk
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def get_payment_by_id(self, payment_id: str) -> DizimoPayment:
-        async with self.session() as session:
+    async def get_payment_by_id(
+        self, payment_id: str, session: AsyncSession | None = None
+    ) -> DizimoPayment:
+        async with self.get_read_session(session, max_staleness=0) as session:
             try:
-                statement = select(DizimoPayment).filter(
-                    DizimoPayment.id == payment_id
+                payment = await session.execute(
+                    PAYMENT_BY_ID, {"payment_id": payment_id}
                 )
-                payment = await session.execute(statement)
                 return payment.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def get_payment_by_correlation_id(
-        self, correlation_id: str
+        self, correlation_id: str, session: AsyncSession | None = None
     ) -> DizimoPayment:
-        async with self.session() as session:
+        async with self.get_read_session(session, max_staleness=0) as session:
             try:
-                statement = select(DizimoPayment).filter(
-                    DizimoPayment.correlation_id == correlation_id
+                payment = await session.execute(
+                    PAYMENT_BY_CORRELATION_ID,
+                    {"correlation_id": correlation_id},
                 )
-                payment = await session.execute(statement)
                 return payment.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
+                raise not_found(f"A error occurs during CRUD: {error!r}")
+
+    async def get_payments_by_correlation_ids(
+        self, correlation_ids: list[str], session: AsyncSession | None = None
+    ) -> list[DizimoPayment]:
+        async with self.get_read_session(session, max_staleness=0) as session:
+            try:
+                statement = select(DizimoPayment).filter(
+                    DizimoPayment.correlation_id.in_(correlation_ids)
+                )
+                payments = await session.execute(statement)
+                return payments.scalars().all()
+            except Exception as error:
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
+    async def get_active_charges(
+        self, session: AsyncSession | None = None
+    ) -> list[Row]:
+        statement = select(
+            DizimoPayment.correlation_id, DizimoPayment.date
+        ).filter(
+            DizimoPayment.status == ACTIVE,
+            DizimoPayment.correlation_id.is_not(None),
+        )
+        return await self.get_rows(statement, session=session, max_staleness=0)
+
     async def get_payment_by_identifier(
-        self, identifier: str
+        self, identifier: str, session: AsyncSession | None = None
     ) -> DizimoPayment:
-        async with self.session() as session:
+        async with self.get_read_session(session, max_staleness=0) as session:
             try:
                 statement = select(DizimoPayment).filter(
                     DizimoPayment.identifier == identifier
@@ -79,11 +126,13 @@ class DizimoPaymentCrud(CRUD):
                 payment = await session.execute(statement)
                 return payment.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_payments_by_year(self, year: int) -> [DizimoPayment]:
-        async with self.session() as session:
+    async def get_payments_by_year(
+        self, year: int, session: AsyncSession | None = None
+    ) -> [DizimoPayment]:
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(DizimoPayment).filter(
                     DizimoPayment.year == year
@@ -91,11 +140,13 @@ class DizimoPaymentCrud(CRUD):
                 payments = await session.execute(statement)
                 return payments.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_payments_by_month(self, month: str) -> [DizimoPayment]:
-        async with self.session() as session:
+    async def get_payments_by_month(
+        self, month: str, session: AsyncSession | None = None
+    ) -> [DizimoPayment]:
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(DizimoPayment).filter(
                     DizimoPayment.month == month
@@ -103,13 +154,13 @@ class DizimoPaymentCrud(CRUD):
                 payments = await session.execute(statement)
                 return payments.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def get_payments_by_year_and_user_id(
-        self, year: int, user_id: str
+        self, year: int, user_id: str, session: AsyncSession | None = None
     ) -> [DizimoPayment]:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(DizimoPayment).filter(
                     and_(
@@ -120,13 +171,13 @@ class DizimoPaymentCrud(CRUD):
                 payments = await session.execute(statement)
                 return payments.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def get_payments_by_month_and_user_id(
-        self, month: str, user_id: str
+        self, month: str, user_id: str, session: AsyncSession | None = None
     ) -> [DizimoPayment]:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(DizimoPayment).filter(
                     and_(
@@ -137,43 +188,45 @@ class DizimoPaymentCrud(CRUD):
                 payments = await session.execute(statement)
                 return payments.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def get_payment_by_month_year_and_user_id(
-        self, month: str, year: int, user_id: str
+        self,
+        month: str,
+        year: int,
+        user_id: str,
+        session: AsyncSession | None = None,
     ) -> [DizimoPayment]:
-        async with self.session() as session:
+        async with self.get_read_session(session, max_staleness=0) as session:
             try:
-                statement = select(DizimoPayment).filter(
-                    and_(
-                        DizimoPayment.user_id == user_id,
-                        and_(
-                            DizimoPayment.month == month,
-                            DizimoPayment.year == year,
-                        ),
-                    )
+                payment = await session.execute(
+                    PAYMENT_BY_MONTH_YEAR_AND_USER_ID,
+                    {"month": month, "year": year, "user_id": user_id},
                 )
-                payment = await session.execute(statement)
                 return payment.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def create_payment(self, payment: DizimoPayment) -> DizimoPayment:
-        async with self.session() as session:
+    async def create_payment(
+        self, payment: DizimoPayment, session: AsyncSession | None = None
+    ) -> DizimoPayment:
+        async with self.get_session(session) as session:
             try:
                 session.add(payment)
-                await session.commit()
+                await self.commit(session)
                 return payment
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def update_payment(self, payment_data: dict) -> DizimoPayment:
-        async with self.session() as session:
+    async def update_payment(
+        self, payment_data: dict, session: AsyncSession | None = None
+    ) -> DizimoPayment:
+        async with self.get_session(session) as session:
             try:
                 statement = select(DizimoPayment).filter(
                     DizimoPayment.id == payment_data["id"]
@@ -193,16 +246,18 @@ class DizimoPaymentCrud(CRUD):
                             payment.value = payment_data["value"]
                         case "identifier":
                             payment.identifier = payment_data["identifier"]
-                await session.commit()
+                await self.commit(session)
                 return payment
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def complete_dizimo_payment(
-        self, dizimo_payment: DizimoPayment
+        self,
+        dizimo_payment: DizimoPayment,
+        session: AsyncSession | None = None,
     ) -> DizimoPayment:
-        async with self.session() as session:
+        async with self.get_session(session) as session:
             try:
                 statement = select(DizimoPayment).filter(
                     DizimoPayment.id == dizimo_payment.id
@@ -212,28 +267,32 @@ class DizimoPaymentCrud(CRUD):
                 actual_dizimo_payment = pass_data_to(
                     dizimo_payment, actual_dizimo_payment
                 )
-                await session.commit()
+                await self.commit(session)
                 return actual_dizimo_payment
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def delete_payment(self, payment: DizimoPayment) -> str:
-        async with self.session() as session:
+    async def delete_payment(
+        self, payment: DizimoPayment, session: AsyncSession | None = None
+    ) -> str:
+        async with self.get_session(session) as session:
             try:
                 await session.delete(payment)
-                await session.commit()
+                await self.commit(session)
                 return f"{payment!r}, deleted"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def delete_payment_by_id(self, payment_id: str) -> str:
-        async with self.session() as session:
+    async def delete_payment_by_id(
+        self, payment_id: str, session: AsyncSession | None = None
+    ) -> str:
+        async with self.get_session(session) as session:
             try:
                 statement = select(DizimoPayment).filter(
                     DizimoPayment.id == payment_id
@@ -241,62 +300,123 @@ class DizimoPaymentCrud(CRUD):
                 payment = await session.execute(statement)
                 payment = payment.scalars().one()
                 await session.delete(payment)
-                await session.commit()
+                await self.commit(session)
                 return f"{payment!r}, deleted"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def update_status(
-        self, dizimo_payment_id: str, status: str
+        self,
+        dizimo_payment_id: str,
+        status: str,
+        session: AsyncSession | None = None,
     ) -> DizimoPayment:
-        async with self.session() as session:
+        if not (is_valid_payment_status(status)):
+            return None
+        async with self.get_session(session) as session:
             try:
-                statement = select(DizimoPayment).filter(
-                    DizimoPayment.id == dizimo_payment_id
+                statement = (
+                    update(DizimoPayment)
+                    .where(DizimoPayment.id == dizimo_payment_id)
+                    .values(status=status)
+                    .returning(DizimoPayment)
                 )
                 payment = await session.execute(statement)
                 payment = payment.scalars().first()
-                if is_valid_payment_status(status):
-                    payment.status = status
-                    await session.commit()
-                    return payment
+                await self.commit(session)
+                return payment
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def update_correlation_id(
-        self, dizimo_payment_id: str, correlation_id: str = None
+        self,
+        dizimo_payment_id: str,
+        correlation_id: str = None,
+        session: AsyncSession | None = None,
     ) -> DizimoPayment:
-        async with self.session() as session:
+        async with self.get_session(session) as session:
             try:
-                statement = select(DizimoPayment).filter(
-                    DizimoPayment.id == dizimo_payment_id
+                statement = (
+                    update(DizimoPayment)
+                    .where(DizimoPayment.id == dizimo_payment_id)
+                    .values(correlation_id=correlation_id)
+                    .returning(DizimoPayment)
                 )
                 payment = await session.execute(statement)
                 payment = payment.scalars().first()
-                payment.correlation_id = correlation_id
-                await session.commit()
+                await self.commit(session)
                 return payment
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
+    async def mark_paid_if_active(
+        self, correlation_id: str, session: AsyncSession | None = None
+    ) -> DizimoPayment | None:
+        async with self.get_session(session) as session:
+            try:
+                # Only the first delivery of a payment finds the row active,
+                # so repeated webhooks and polls cannot count it twice.
+                statement = (
+                    update(DizimoPayment)
+                    .where(
+                        DizimoPayment.correlation_id == correlation_id,
+                        DizimoPayment.status == ACTIVE,
+                    )
+                    .values(status=PAID)
+                    .returning(DizimoPayment)
+                )
+                payment = await session.execute(statement)
+                payment = payment.scalars().first()
+                await self.commit(session)
+                return payment
+            except Exception as error:
+                await self.rollback(session)
+                raise internal_server_error(
+                    f"A error occurs during CRUD: {error!r}"
+                )
+
+    async def expire_if_active(
+        self, correlation_id: str, session: AsyncSession | None = None
+    ) -> DizimoPayment | None:
+        async with self.get_session(session) as session:
+            try:
+                statement = (
+                    update(DizimoPayment)
+                    .where(
+                        DizimoPayment.correlation_id == correlation_id,
+                        DizimoPayment.status == ACTIVE,
+                    )
+                    .values(correlation_id=None, value=None, date=None)
+                    .returning(DizimoPayment)
+                )
+                payment = await session.execute(statement)
+                payment = payment.scalars().first()
+                await self.commit(session)
+                return payment
+            except Exception as error:
+                await self.rollback(session)
+                raise internal_server_error(
+                    f"A error occurs during CRUD: {error!r}"
+                )
+
     async def update_correlation_id_to_none(
-        self, dizimo_payment_id: str
+        self, dizimo_payment_id: str, session: AsyncSession | None = None
     ) -> DizimoPayment:
-        async with self.session() as session:
+        async with self.get_session(session) as session:
             try:
-                statement = select(DizimoPayment).filter(
-                    DizimoPayment.id == dizimo_payment_id
+                statement = (
+                    update(DizimoPayment)
+                    .where(DizimoPayment.id == dizimo_payment_id)
+                    .values(correlation_id=None, value=None, date=None)
+                    .returning(DizimoPayment)
                 )
                 payment = await session.execute(statement)
                 payment = payment.scalars().first()
-                payment.correlation_id = None
-                payment.value = None
-                payment.date = None
-                await session.commit()
+                await self.commit(session)
                 return payment
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
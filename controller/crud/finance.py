@@ -1,21 +1,56 @@
-from controller.crud.crud import CRUD
+from controller.crud.crud import CRUD, columns_for
 from models.finance import Finance
-from sqlalchemy import select, and_, or_, extract
+from sqlalchemy import select, and_, or_, extract, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from controller.errors.http.exceptions import not_found, internal_server_error
 from datetime import datetime
+from dataclasses import dataclass
 import calendar
 
 DEFAULT_TITLE = "Last Month"
 
 
+@dataclass(slots=True)
+class FinanceRow:
+    date: datetime
+    title: str
+    type: str
+    value: float
+
+
+FINANCE_BY_ID = select(Finance).filter(Finance.id == bindparam("finance_id"))
+FINANCE_ROWS = select(*columns_for(Finance, FinanceRow))
+
+
+def get_year_range(year: int) -> tuple[datetime, datetime]:
+    first_month_date = datetime(year, 1, 1)
+    last_month_date = datetime(year, 12, calendar.monthrange(year, 12)[1])
+    last_month_date = last_month_date.replace(hour=23, minute=59, second=59)
+    return first_month_date, last_month_date
+
+
+def get_month_range(year: int, month: int) -> tuple[datetime, datetime]:
+    first_month_day = datetime(year, month, 1)
+    last_month_day = datetime(year, month, calendar.monthrange(year, month)[1])
+    last_month_day = last_month_day.replace(hour=23, minute=59, second=59)
+    return first_month_day, last_month_day
+
+
+def community_date_filter(community_id: str, start: datetime, end: datetime):
+    return and_(
+        Finance.community_id == community_id,
+        and_(Finance.date >= start, Finance.date <= end),
+    )
+
+
 class FinanceCrud(CRUD):
     def __init__(self) -> None:
         super().__init__()
 
     async def get_finance_last_month_obj_by_date(
-        self, year: int, month: int
+        self, year: int, month: int, session: AsyncSession | None = None
     ) -> Finance | None:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(Finance).filter(
                     and_(
@@ -26,13 +61,13 @@ class FinanceCrud(CRUD):
                 finance = await session.execute(statement)
                 return finance.scalars().first()
             finally:
-                await session.rollback()
+                await self.rollback(session)
                 return None
 
     async def get_finances_where_date_is_greater_than(
-        self, date: datetime
+        self, date: datetime, session: AsyncSession | None = None
     ) -> [Finance]:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(Finance).filter(
                     and_(
@@ -49,112 +84,129 @@ class FinanceCrud(CRUD):
                 finances = await session.execute(statement)
                 return finances.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_finance_by_id(self, finance_id: str) -> Finance:
-        async with self.session() as session:
+    async def get_finance_by_id(
+        self, finance_id: str, session: AsyncSession | None = None
+    ) -> Finance:
+        async with self.get_read_session(session) as session:
             try:
-                statement = select(Finance).filter(Finance.id == finance_id)
-                finance = await session.execute(statement)
+                finance = await session.execute(
+                    FINANCE_BY_ID, {"finance_id": finance_id}
+                )
                 return finance.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_all_finances(self) -> [Finance]:
-        async with self.session() as session:
+    async def get_all_finances(
+        self, session: AsyncSession | None = None
+    ) -> [Finance]:
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(Finance)
                 result = await session.execute(statement)
                 return result.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def create_finance(self, finance: Finance) -> Finance:
-        async with self.session() as session:
+    async def create_finance(
+        self, finance: Finance, session: AsyncSession | None = None
+    ) -> Finance:
+        async with self.get_session(session) as session:
             try:
                 session.add(finance)
-                await session.commit()
+                await self.commit(session)
                 return finance
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def get_finances_by_year(self, year: int, community_id) -> [Finance]:
-        async with self.session() as session:
+    async def get_finances_by_year(
+        self, year: int, community_id, session: AsyncSession | None = None
+    ) -> [Finance]:
+        async with self.get_read_session(session) as session:
             try:
-                first_month_date = datetime(year, 1, 1)
-                last_month_date = datetime(
-                    year, 12, calendar.monthrange(year, 12)[1]
-                )
-                last_month_date = last_month_date.replace(
-                    hour=23, minute=59, second=59
-                )
                 statement = select(Finance).filter(
-                    and_(
-                        Finance.community_id == community_id,
-                        and_(
-                            Finance.date >= first_month_date,
-                            Finance.date <= last_month_date,
-                        ),
-                    )
+                    community_date_filter(community_id, *get_year_range(year))
                 )
                 finances = await session.execute(statement)
                 return finances.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def get_finances_by_month(
-        self, year: int, month: int, community_id: str
+        self,
+        year: int,
+        month: int,
+        community_id: str,
+        session: AsyncSession | None = None,
     ) -> [Finance]:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
-                first_month_day = datetime(year, month, 1)
-                last_month_day = datetime(
-                    year, month, calendar.monthrange(year, month)[1]
-                )
-                last_month_day = last_month_day.replace(
-                    hour=23, minute=59, second=59
-                )
                 statement = select(Finance).filter(
-                    and_(
-                        Finance.community_id == community_id,
-                        and_(
-                            Finance.date >= first_month_day,
-                            Finance.date <= last_month_day,
-                        ),
+                    community_date_filter(
+                        community_id, *get_month_range(year, month)
                     )
                 )
                 finances = await session.execute(statement)
                 return finances.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_finance_by_id(self, finance_id: str) -> str:
-        async with self.session() as session:
+    async def get_finance_rows_by_year(
+        self,
+        year: int,
+        community_id: str,
+        session: AsyncSession | None = None,
+    ) -> [FinanceRow]:
+        statement = FINANCE_ROWS.filter(
+            community_date_filter(community_id, *get_year_range(year))
+        )
+        return await self.get_rows(statement, into=FinanceRow, session=session)
+
+    async def get_finance_rows_by_month(
+        self,
+        year: int,
+        month: int,
+        community_id: str,
+        session: AsyncSession | None = None,
+    ) -> [FinanceRow]:
+        statement = FINANCE_ROWS.filter(
+            community_date_filter(community_id, *get_month_range(year, month))
+        )
+        return await self.get_rows(statement, into=FinanceRow, session=session)
+
+    async def delete_finance_by_id(
+        self, finance_id: str, session: AsyncSession | None = None
+    ) -> str:
+        async with self.get_session(session) as session:
             try:
                 statement = select(Finance).filter(Finance.id == finance_id)
                 finance = await session.execute(statement)
                 finance = finance.scalars().first()
                 await session.delete(finance)
-                await session.commit()
+                await self.commit(session)
                 return "deleted"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def update_finance_by_id(
-        self, finance_id: str, finance_data: dict
+        self,
+        finance_id: str,
+        finance_data: dict,
+        session: AsyncSession | None = None,
     ) -> Finance:
-        async with self.session() as session:
+        async with self.get_session(session) as session:
             try:
                 statement = select(Finance).filter(Finance.id == finance_id)
                 finance = await session.execute(statement)
@@ -171,8 +223,8 @@ class FinanceCrud(CRUD):
                             finance.value = finance_data["value"]
                         case "date":
                             finance.date = finance_data["date"]
-                await session.commit()
+                await self.commit(session)
                 return finance
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
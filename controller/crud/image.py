@@ -1,43 +1,54 @@
 from models.image import Image
 from controller.crud.crud import CRUD
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from controller.errors.http.exceptions import not_found, internal_server_error
 
 
+IMAGE_BY_ID = select(Image).filter(Image.id == bindparam("image_id"))
+
+
 class ImageCrud(CRUD):
     def __init__(self) -> None:
         super().__init__()
 
-    async def get_image_by_id(self, image_id: str):
-        async with self.session() as session:
+    async def get_image_by_id(
+        self, image_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
-                statement = select(Image).filter(Image.id == image_id)
-                image = await session.execute(statement)
+                image = await session.execute(
+                    IMAGE_BY_ID, {"image_id": image_id}
+                )
                 image = image.scalars().first()
                 return image
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def create_image(self, image: Image) -> Image:
-        async with self.session() as session:
+    async def create_image(
+        self, image: Image, session: AsyncSession | None = None
+    ) -> Image:
+        async with self.get_session(session) as session:
             try:
                 session.add(image)
-                await session.commit()
+                await self.commit(session)
                 return image
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise error
 
-    async def delete_image_by_id(self, image_id: str) -> str:
-        async with self.session() as session:
+    async def delete_image_by_id(
+        self, image_id: str, session: AsyncSession | None = None
+    ) -> str:
+        async with self.get_session(session) as session:
             try:
                 statement = select(Image).filter(Image.id == image_id)
                 image = await session.execute(statement)
                 image = image.scalars().first()
                 await session.delete(image)
-                await session.commit()
+                await self.commit(session)
                 return "deleted"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
@@ -1,72 +1,92 @@
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Login
 from controller.errors.http.exceptions import not_found
 from controller.crud.crud import CRUD
-from controller.auth.password import hash_pasword
+from controller.auth.password import hash_pasword_async
+
+
+LOGIN_BY_ID = select(Login).filter(Login.id == bindparam("login_id"))
+LOGIN_BY_CPF = select(Login).filter(Login.cpf == bindparam("login_cpf"))
 
 
 class LoginCrud(CRUD):
     def __init__(self) -> None:
         super().__init__()
 
-    async def update_password(self, cpf: str, password: str):
-        async with self.session() as session:
+    async def update_password(
+        self, cpf: str, password: str, session: AsyncSession | None = None
+    ):
+        password = await hash_pasword_async(password)
+        async with self.get_session(session) as session:
             try:
                 statement = select(Login).filter(Login.cpf == cpf)
                 login = await session.execute(statement)
                 login = login.scalars().first()
-                login.password = hash_pasword(password)
-                await session.commit()
+                login.password = password
+                await self.commit(session)
                 return login
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def update_position(self, cpf: str, position: str):
-        async with self.session() as session:
+    async def update_position(
+        self, cpf: str, position: str, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(Login).filter(Login.cpf == cpf)
                 login = await session.execute(statement)
                 login = login.scalars().first()
                 login.position = position
-                await session.commit()
+                await self.commit(session)
                 return login
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_login_by_id(self, login_id: str):
-        async with self.session() as session:
+    async def get_login_by_id(
+        self, login_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session, max_staleness=0) as session:
             try:
-                statement = select(Login).filter(Login.id == login_id)
-                login = await session.execute(statement)
+                login = await session.execute(
+                    LOGIN_BY_ID, {"login_id": login_id}
+                )
                 return login.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_login_by_cpf(self, login_cpf: str):
-        async with self.session() as session:
+    async def get_login_by_cpf(
+        self, login_cpf: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session, max_staleness=0) as session:
             try:
-                statement = select(Login).filter(Login.cpf == login_cpf)
-                login = await session.execute(statement)
+                login = await session.execute(
+                    LOGIN_BY_CPF, {"login_cpf": login_cpf}
+                )
                 return login.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def create_login(self, login: Login):
-        async with self.session() as session:
+    async def create_login(
+        self, login: Login, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 session.add(login)
-                await session.commit()
+                await self.commit(session)
                 return login
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def update_login(self, new_login: dict):
-        async with self.session() as session:
+    async def update_login(
+        self, new_login: dict, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(Login).filter(Login.id == new_login["id"])
                 login = await session.execute(statement)
@@ -79,31 +99,35 @@ class LoginCrud(CRUD):
                             login.password = new_login["password"]
                         case "position":
                             login.profile = new_login["position"]
-                await session.commit()
+                await self.commit(session)
                 return login
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_login(self, login: Login):
-        async with self.session() as session:
+    async def delete_login(
+        self, login: Login, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 await session.delete(login)
-                await session.commit()
+                await self.commit(session)
                 return f"{login} deleted with succesfull"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_login_by_id(self, login_id: str):
-        async with self.session() as session:
+    async def delete_login_by_id(
+        self, login_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(Login).filter(Login.id == login_id)
                 login = await session.execute(statement)
                 login = login.scalars().first()
                 await session.delete(login)
-                await session.commit()
+                await self.commit(session)
                 return f"{login} deleted with succesfull"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
@@ -1,86 +1,106 @@
 from controller.crud.crud import CRUD
 from models.number import Number
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from controller.errors.http.exceptions import not_found, internal_server_error
 
 
+NUMBER_BY_NUMBER = select(Number).filter(Number.number == bindparam("number"))
+NUMBER_BY_USER_ID = select(Number).filter(
+    Number.user_id == bindparam("user_id")
+)
+
+
 class NumberCrud(CRUD):
     def __init__(self) -> None:
         super().__init__()
 
-    async def get_number_model_by_number(self, number: str) -> Number:
-        async with self.session() as session:
+    async def get_number_model_by_number(
+        self, number: str, session: AsyncSession | None = None
+    ) -> Number:
+        async with self.get_read_session(session, max_staleness=0) as session:
             try:
-                statement = select(Number).filter(Number.number == number)
-                result = await session.execute(statement)
+                result = await session.execute(
+                    NUMBER_BY_NUMBER, {"number": number}
+                )
                 number = result.scalars().first()
                 return number
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_number_model_by_user_id(self, user_id: str) -> Number:
-        async with self.session() as session:
+    async def get_number_model_by_user_id(
+        self, user_id: str, session: AsyncSession | None = None
+    ) -> Number:
+        async with self.get_read_session(session, max_staleness=0) as session:
             try:
-                statement = select(Number).filter(Number.user_id == user_id)
-                result = await session.execute(statement)
+                result = await session.execute(
+                    NUMBER_BY_USER_ID, {"user_id": user_id}
+                )
                 number = result.scalars().first()
                 return number
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def update_verification_code(self, number: str, code: int) -> Number:
-        async with self.session() as session:
+    async def update_verification_code(
+        self, number: str, code: int, session: AsyncSession | None = None
+    ) -> Number:
+        async with self.get_session(session) as session:
             try:
                 statement = select(Number).filter(Number.number == number)
                 result = await session.execute(statement)
                 number = result.scalars().first()
                 number.verification_code = code
-                await session.commit()
+                await self.commit(session)
                 return number
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def create_number(self, number: Number) -> Number:
-        async with self.session() as session:
+    async def create_number(
+        self, number: Number, session: AsyncSession | None = None
+    ) -> Number:
+        async with self.get_session(session) as session:
             try:
                 session.add(number)
-                await session.commit()
+                await self.commit(session)
                 return number
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
     async def update_number_number(
-        self, number: str, new_number: str
+        self, number: str, new_number: str, session: AsyncSession | None = None
     ) -> Number:
-        async with self.session() as session:
+        async with self.get_session(session) as session:
             try:
                 statement = select(Number).filter(Number.number == number)
                 result = await session.execute(statement)
                 number = result.scalars().first()
                 number.number = new_number
-                await session.commit()
+                await self.commit(session)
                 return number
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def update_number_by_user_id(
-        self, user_id: str, new_number: str
+        self,
+        user_id: str,
+        new_number: str,
+        session: AsyncSession | None = None,
     ) -> Number:
-        async with self.session() as session:
+        async with self.get_session(session) as session:
             try:
                 statement = select(Number).filter(Number.user_id == user_id)
                 result = await session.execute(statement)
                 number = result.scalars().first()
                 number.number = new_number
-                await session.commit()
+                await self.commit(session)
                 return number
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
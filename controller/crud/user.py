@@ -1,11 +1,74 @@
-from sqlalchemy import select, and_, or_
-from models import User
-from controller.errors.http.exceptions import not_found, internal_server_error
+from sqlalchemy import select, insert, update, and_, or_, bindparam, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import User, Login, Number, DizimoPayment
+from controller.errors.http.exceptions import (
+    not_found,
+    bad_request,
+    internal_server_error,
+)
 from controller.crud.community import CommunityCrud
-from controller.crud.crud import CRUD
+from controller.crud.crud import CRUD, STREAM_CHUNK_SIZE, columns_for
+from controller.src.cache import MeteredTTLCache
+from database import is_unit_of_work
 from typing import AsyncIterator
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from os import getenv
+
+load_dotenv()
+
+USER_CACHE_MAX_BYTES = int(getenv("USER_CACHE_MAX_BYTES", 8 * 1024 * 1024))
+USER_CACHE_TTL = float(getenv("USER_CACHE_TTL", 60))
 
 community_crud = CommunityCrud()
+user_cache = MeteredTTLCache("user", USER_CACHE_MAX_BYTES, USER_CACHE_TTL)
+
+
+@dataclass(slots=True, frozen=True)
+class UserReference:
+    id: str
+    cpf: str
+    community_id: str
+    position: str
+    active: bool
+
+
+USER_BY_ID = select(User).filter(User.id == bindparam("user_id"))
+USER_BY_CPF = select(User).filter(User.cpf == bindparam("user_cpf"))
+USER_BY_PHONE = select(User).filter(User.phone == bindparam("phone"))
+USER_REFERENCE_BY_CPF = select(*columns_for(User, UserReference)).filter(
+    User.cpf == bindparam("user_cpf")
+)
+
+
+def invalidate_user_cache(session: AsyncSession, *cpfs: str | None) -> None:
+    cpfs = [cpf for cpf in cpfs if cpf]
+    user_cache.invalidate(*cpfs)
+    # A request running in the meantime can still load the old row until the
+    # unit of work commits, so drop the entries again once it does.
+    if is_unit_of_work(session):
+        event.listen(
+            session.sync_session,
+            "after_commit",
+            lambda _: user_cache.invalidate(*cpfs),
+            once=True,
+        )
+
+
+MEMBER_TABLES = (
+    ("user", User),
+    ("login", Login),
+    ("number", Number),
+    ("payment", DizimoPayment),
+)
+
+
+async def insert_members(session: AsyncSession, members: list[dict]) -> None:
+    for key, model in MEMBER_TABLES:
+        await session.execute(
+            insert(model), [member[key] for member in members]
+        )
 
 
 class UserCrud(CRUD):
@@ -13,46 +76,190 @@ class UserCrud(CRUD):
         super().__init__()
 
     async def get_users_paginated(
-        self, page: int = 1, page_size: int = 100
+        self,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        session: AsyncSession | None = None,
     ) -> AsyncIterator:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
-                offset = (page - 1) * page_size
-                statement = select(User).offset(offset).limit(page_size)
-                users = await session.execute(statement)
-                users = users.scalars().all()
-                yield users
+                statement = select(User).execution_options(
+                    yield_per=chunk_size
+                )
+                users = await session.stream_scalars(statement)
+                async for chunk in users.partitions():
+                    yield chunk
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def get_all_users(self) -> [User]:
-        async with self.session() as session:
+    async def get_taken_cpfs_and_phones(
+        self,
+        cpfs: list[str],
+        phones: list[str],
+        session: AsyncSession | None = None,
+    ) -> tuple[set[str], set[str]]:
+        async with self.get_read_session(session, max_staleness=0) as session:
+            try:
+                statement = select(User.cpf, User.phone).filter(
+                    or_(User.cpf.in_(cpfs), User.phone.in_(phones))
+                )
+                rows = (await session.execute(statement)).all()
+                return {row.cpf for row in rows}, {row.phone for row in rows}
+            except Exception as error:
+                await self.rollback(session)
+                raise internal_server_error(
+                    f"A error occurs during CRUD: {error!r}"
+                )
+
+    async def create_members(
+        self, members: list[dict], session: AsyncSession | None = None
+    ) -> dict[int, str]:
+        async with self.get_session(session) as session:
+            try:
+                async with session.begin_nested():
+                    await insert_members(session, members)
+                await self.commit(session)
+                return {}
+            except IntegrityError:
+                pass
+            except Exception as error:
+                await self.rollback(session)
+                raise internal_server_error(
+                    f"A error occurs during CRUD: {error!r}"
+                )
+            # Somebody signed up with the same data after the pre-check; redo
+            # the chunk one member per savepoint to find out who.
+            failed = {}
+            try:
+                for index, member in enumerate(members):
+                    try:
+                        async with session.begin_nested():
+                            await insert_members(session, [member])
+                    except IntegrityError as error:
+                        failed[index] = f"User already exist: {error.orig!r}"
+                await self.commit(session)
+                return failed
+            except Exception as error:
+                await self.rollback(session)
+                raise internal_server_error(
+                    f"A error occurs during CRUD: {error!r}"
+                )
+
+    async def get_all_users(
+        self, session: AsyncSession | None = None
+    ) -> [User]:
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(User)
                 users = await session.execute(statement)
                 return users.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
+                raise not_found(f"A error occurs during CRUD: {error!r}")
+
+    async def update_profile(
+        self,
+        cpf: str,
+        values: dict,
+        password: str | None = None,
+        session: AsyncSession | None = None,
+    ) -> User:
+        async with self.get_session(session) as session:
+            try:
+                # logins.cpf follows users.cpf through ON UPDATE CASCADE.
+                statement = (
+                    update(User)
+                    .where(User.cpf == cpf)
+                    .values(**values)
+                    .returning(User)
+                )
+                user = (await session.execute(statement)).scalars().one()
+                if "phone" in values:
+                    await session.execute(
+                        update(Number)
+                        .where(Number.user_id == user.id)
+                        .values(number=values["phone"])
+                    )
+                if password is not None:
+                    await session.execute(
+                        update(Login)
+                        .where(Login.cpf == user.cpf)
+                        .values(password=password)
+                    )
+                await self.commit(session)
+                invalidate_user_cache(session, cpf, user.cpf)
+                return user
+            except IntegrityError as error:
+                await self.rollback(session)
+                raise bad_request(f"This data is already in use: {error!r}")
+            except Exception as error:
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def upgrade_user(self, cpf: str, position: str, responsability: str):
-        async with self.session() as session:
+    async def upgrade_position(
+        self,
+        cpf: str,
+        position: str,
+        responsibility: str,
+        session: AsyncSession | None = None,
+    ) -> None:
+        async with self.get_session(session) as session:
+            try:
+                user_update = (
+                    update(User)
+                    .where(User.cpf == cpf)
+                    .values(position=position, responsibility=responsibility)
+                    .returning(User.cpf)
+                )
+                login_update = update(Login).values(position=position)
+                if session.get_bind().dialect.name == "postgresql":
+                    # A data-modifying CTE updates both rows in one round
+                    # trip.
+                    updated_user = user_update.cte("updated_user")
+                    statement = login_update.where(
+                        Login.cpf == updated_user.c.cpf
+                    ).returning(Login.cpf)
+                    updated = (await session.execute(statement)).first()
+                else:
+                    updated = (await session.execute(user_update)).first()
+                    if updated is not None:
+                        await session.execute(
+                            login_update.where(Login.cpf == cpf)
+                        )
+                if updated is None:
+                    raise not_found("User not found")
+                await self.commit(session)
+                invalidate_user_cache(session, cpf)
+            except Exception as error:
+                await self.rollback(session)
+                raise not_found(f"A error occurs during CRUD: {error!r}")
+
+    async def upgrade_user(
+        self,
+        cpf: str,
+        position: str,
+        responsability: str,
+        session: AsyncSession | None = None,
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(User).filter(User.cpf == cpf)
                 user = await session.execute(statement)
                 user = user.scalars().first()
                 user.position = position
                 user.responsibility = responsability
-                await session.commit()
+                await self.commit(session)
+                invalidate_user_cache(session, cpf)
                 return user
             except Exception as error:
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_all_community_council_and_parish(self, community_id: str):
-        async with self.session() as session:
+    async def get_all_community_council_and_parish(
+        self, community_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(User).filter(
                     and_(
@@ -66,11 +273,13 @@ class UserCrud(CRUD):
                 users = await session.execute(statement)
                 return users.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_users_by_community_id(self, community_id: str):
-        async with self.session() as session:
+    async def get_users_by_community_id(
+        self, community_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(User).filter(
                     User.community_id == community_id
@@ -80,76 +289,109 @@ class UserCrud(CRUD):
             except Exception as error:
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_user_by_id(self, user_id: str):
-        async with self.session() as session:
+    async def get_user_by_id(
+        self, user_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
-                statement = select(User).filter(User.id == user_id)
-                user = await session.execute(statement)
+                user = await session.execute(USER_BY_ID, {"user_id": user_id})
                 return user.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_user_by_cpf(self, user_cpf: str):
-        async with self.session() as session:
+    async def get_user_by_cpf(
+        self, user_cpf: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
-                statement = select(User).filter(User.cpf == user_cpf)
-                user = await session.execute(statement)
+                user = await session.execute(
+                    USER_BY_CPF, {"user_cpf": user_cpf}
+                )
                 return user.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_user_by_phone(self, phone: str) -> User:
-        async with self.session() as session:
+    async def get_user_reference_by_cpf(
+        self, user_cpf: str, session: AsyncSession | None = None
+    ) -> UserReference | None:
+        if session is None:
+            user = user_cache.get(user_cpf)
+            if user is not None:
+                return user
+        user = await self.get_row(
+            USER_REFERENCE_BY_CPF,
+            {"user_cpf": user_cpf},
+            into=UserReference,
+            session=session,
+            max_staleness=0,
+        )
+        if user is not None and session is None:
+            user_cache.set(user_cpf, user)
+        return user
+
+    async def get_user_by_phone(
+        self, phone: str, session: AsyncSession | None = None
+    ) -> User:
+        async with self.get_read_session(session) as session:
             try:
-                statement = select(User).filter(User.phone == phone)
-                user = await session.execute(statement)
+                user = await session.execute(USER_BY_PHONE, {"phone": phone})
                 return user.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def create_user(self, user: User):
-        async with self.session() as session:
+    async def create_user(
+        self, user: User, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 session.add(user)
-                await session.commit()
+                await self.commit(session)
                 return user
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def get_user_image(self, user_cpf: str):
-        async with self.session() as session:
+    async def get_user_image(
+        self, user_cpf: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(User).filter(User.cpf == user_cpf)
                 user = await session.execute(statement)
                 user = user.scalars().first()
                 return user.image
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def update_user_image(self, user_cpf: str, image: str):
-        async with self.session() as session:
+    async def update_user_image(
+        self, user_cpf: str, image: str, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(User).filter(User.cpf == user_cpf)
                 user = await session.execute(statement)
                 user = user.scalars().first()
                 user.image = image
-                await session.commit()
+                await self.commit(session)
+                invalidate_user_cache(session, user_cpf)
                 return user
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def update_user(self, new_user: dict):
-        async with self.session() as session:
+    async def update_user(
+        self, new_user: dict, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(User).filter(User.id == new_user["id"])
                 user = await session.execute(statement)
                 user = user.scalars().first()
+                old_cpf = user.cpf
                 for key in new_user.keys():
                     match key:
                         case "cpf":
@@ -168,50 +410,60 @@ class UserCrud(CRUD):
                         case "community_patron":
                             community = (
                                 await community_crud.get_community_by_patron(
-                                    new_user["community_patron"]
+                                    new_user["community_patron"], session
                                 )
                             )
                             user.community_id = community.id
-                await session.commit()
+                await self.commit(session)
+                invalidate_user_cache(session, old_cpf, user.cpf)
                 return user
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_user(self, user: User):
-        async with self.session() as session:
+    async def delete_user(
+        self, user: User, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 await session.delete(user)
-                await session.commit()
+                await self.commit(session)
+                invalidate_user_cache(session, user.cpf)
                 return f"{user} deleted with succesfull"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_user_by_id(self, user_id: str):
-        async with self.session() as session:
+    async def delete_user_by_id(
+        self, user_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(User).filter(User.id == user_id)
                 user = await session.execute(statement)
                 user = user.scalars().first()
                 await session.delete(user)
-                await session.commit()
+                await self.commit(session)
+                invalidate_user_cache(session, user.cpf)
                 return f"{user} deleted with succesfull"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_user_image(self, user_id: str):
-        async with self.session() as session:
+    async def delete_user_image(
+        self, user_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(User).filter(User.id == user_id)
                 user = await session.execute(statement)
                 user = user.scalars().first()
                 user.image = None
-                await session.commit()
+                await self.commit(session)
+                invalidate_user_cache(session, user.cpf)
                 return User
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
@@ -1,18 +1,26 @@
 from controller.crud.crud import CRUD
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Warning
 from controller.errors.http.exceptions import not_found, internal_server_error
 from datetime import datetime
 
 
+WARNING_BY_ID = select(Warning).filter(Warning.id == bindparam("warning_id"))
+
+
 class WarningCrud(CRUD):
     def __init__(self) -> None:
         super().__init__()
 
     async def get_warnings_by_community_id_from_pagination(
-        self, community_id: str, page: int = 1, page_size: int = 100
+        self,
+        community_id: str,
+        page: int = 1,
+        page_size: int = 100,
+        session: AsyncSession | None = None,
     ) -> [Warning]:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
                 offset = (page - 1) * page_size
                 statement = (
@@ -26,25 +34,31 @@ class WarningCrud(CRUD):
                 warnings = result.scalars().all()
                 return warnings
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def get_warning_by_id(self, warning_id: str):
-        async with self.session() as session:
+    async def get_warning_by_id(
+        self, warning_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_read_session(session) as session:
             try:
-                statement = select(Warning).filter(Warning.id == warning_id)
-                warning = await session.execute(statement)
+                warning = await session.execute(
+                    WARNING_BY_ID, {"warning_id": warning_id}
+                )
                 return warning.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
     async def get_warning_by_community_id(
-        self, community_id: str, total: int = 10
+        self,
+        community_id: str,
+        total: int = 10,
+        session: AsyncSession | None = None,
     ):
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
                 statement = (
                     select(Warning)
@@ -54,23 +68,27 @@ class WarningCrud(CRUD):
                 warnings = await session.execute(statement)
                 return warnings.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def create_warning(self, warning: Warning):
-        async with self.session() as session:
+    async def create_warning(
+        self, warning: Warning, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 session.add(warning)
-                await session.commit()
+                await self.commit(session)
                 return warning
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def update_warning(self, new_warning: dict):
-        async with self.session() as session:
+    async def update_warning(
+        self, new_warning: dict, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(Warning).filter(
                     Warning.id == new_warning["id"]
@@ -86,31 +104,35 @@ class WarningCrud(CRUD):
                         case "description":
                             warning.description = new_warning["description"]
                 warning.edited_at = datetime.now()
-                await session.commit()
+                await self.commit(session)
                 return warning
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_warning(self, warning: Warning):
-        async with self.session() as session:
+    async def delete_warning(
+        self, warning: Warning, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 await session.delete(warning)
-                await session.commit()
+                await self.commit(session)
                 return f"{warning} deleted with succesfull"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
 
-    async def delete_warning_by_id(self, warning_id: str):
-        async with self.session() as session:
+    async def delete_warning_by_id(
+        self, warning_id: str, session: AsyncSession | None = None
+    ):
+        async with self.get_session(session) as session:
             try:
                 statement = select(Warning).filter(Warning.id == warning_id)
                 warning = await session.execute(statement)
                 warning = warning.scalars().first()
                 await session.delete(warning)
-                await session.commit()
+                await self.commit(session)
                 return f"{warning} deleted with succesfull"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise not_found(f"A error occurs during CRUD: {error!r}")
@@ -1,5 +1,6 @@
-from controller.crud.crud import CRUD
-from sqlalchemy import select
+from controller.crud.crud import CRUD, STREAM_CHUNK_SIZE
+from sqlalchemy import select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import WebPush
 from controller.errors.http.exceptions import internal_server_error
 from sqlalchemy.orm import selectinload
@@ -7,80 +8,96 @@ from typing import AsyncIterator
 from models import User
 
 
+WEB_PUSH_BY_USER_ID = select(WebPush).filter(
+    WebPush.user_id == bindparam("user_id")
+)
+
+
 class WebPushCrud(CRUD):
     def __init__(self) -> None:
         super().__init__()
 
-    async def create_web_push(self, web_push: WebPush) -> WebPush:
-        async with self.session() as session:
+    async def create_web_push(
+        self, web_push: WebPush, session: AsyncSession | None = None
+    ) -> WebPush:
+        async with self.get_session(session) as session:
             try:
                 session.add(web_push)
-                await session.commit()
+                await self.commit(session)
                 return web_push
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(str(error))
 
     async def get_web_pushes_paginated(
-        self, page: int = 1, page_size: int = 100
+        self,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        session: AsyncSession | None = None,
     ) -> AsyncIterator:
-        async with self.session() as session:
+        async with self.get_read_session(session) as session:
             try:
-                offset = (page - 1) * page_size
                 statement = (
                     select(WebPush)
                     .options(selectinload(WebPush.user))
-                    .offset(offset)
-                    .limit(page_size)
+                    .execution_options(yield_per=chunk_size)
                 )
-                web_pushes = await session.execute(statement)
-                web_pushes = web_pushes.scalars().all()
-                yield web_pushes
+                web_pushes = await session.stream_scalars(statement)
+                async for chunk in web_pushes.partitions():
+                    yield chunk
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise internal_server_error(
                     f"A error occurs during CRUD: {error!r}"
                 )
 
-    async def get_web_push_by_user_id(self, user_id: str) -> WebPush:
-        async with self.session() as session:
+    async def get_web_push_by_user_id(
+        self, user_id: str, session: AsyncSession | None = None
+    ) -> WebPush:
+        async with self.get_read_session(session) as session:
             try:
-                statement = select(WebPush).filter(WebPush.user_id == user_id)
-                web_push = await session.execute(statement)
+                web_push = await session.execute(
+                    WEB_PUSH_BY_USER_ID, {"user_id": user_id}
+                )
                 return web_push.scalars().first()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise error
 
-    async def delete_web_push(self, web_push: WebPush) -> str:
-        async with self.session() as session:
+    async def delete_web_push(
+        self, web_push: WebPush, session: AsyncSession | None = None
+    ) -> str:
+        async with self.get_session(session) as session:
             try:
                 await session.delete(web_push)
-                await session.commit()
+                await self.commit(session)
                 return "deleted"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise error
 
-    async def delete_web_push_by_user_id(self, user_id: str) -> str:
-        async with self.session() as session:
+    async def delete_web_push_by_user_id(
+        self, user_id: str, session: AsyncSession | None = None
+    ) -> str:
+        async with self.get_session(session) as session:
             try:
                 statement = select(WebPush).filter(WebPush.user_id == user_id)
                 web_push = await session.execute(statement)
                 web_push = web_push.scalars().first()
                 await session.delete(web_push)
-                await session.commit()
+                await self.commit(session)
                 return "deleted"
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise error
 
-    async def get_all_tokens(self) -> [WebPush]:
-        async with self.session() as session:
+    async def get_all_tokens(
+        self, session: AsyncSession | None = None
+    ) -> [WebPush]:
+        async with self.get_read_session(session) as session:
             try:
                 statement = select(WebPush)
                 tokens = await session.execute(statement)
                 return tokens.scalars().all()
             except Exception as error:
-                await session.rollback()
+                await self.rollback(session)
                 raise error
@@ -83,9 +83,11 @@ def precondition_required(message: str = None):
     )
 
 
-def too_many_requests(message: str = None):
+def too_many_requests(message: str = None, headers: dict = None):
     raise HTTPException(
-        status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=message
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=message,
+        headers=headers,
     )
 
 
@@ -103,7 +105,7 @@ def not_implemented(message: str = None):
 
 def bad_gateway(messsage: str = None):
     raise HTTPException(
-        status_code=status.WS_1014_BAD_GATEWAY, detail=messsage
+        status_code=status.HTTP_502_BAD_GATEWAY, detail=messsage
     )
 
 
@@ -1,10 +1,11 @@
+import logging
 from typing import NoReturn
 from controller.crud.dizimo_payment import DizimoPaymentCrud
-from controller.src.pix_payment import get_pix_payment_from_correlation_id
+from database import unit_of_work
+from controller.src.pix_payment import charge_cache
 from controller.src.pix_payment import (
     is_pix_paid,
     is_pix_expired,
-    is_pix_active,
 )
 from controller.src.pix_payment import (
     delete_pix_by_correlation_id,
@@ -13,11 +14,7 @@ from controller.src.pix_payment import (
 from models.user import User
 from controller.crud.user import UserCrud
 from controller.crud.community import CommunityCrud
-from controller.src.dizimo_payment import (
-    create_dizimo_payment,
-    get_dizimo_status,
-)
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from controller.src.dizimo_payment import create_dizimo_payment
 from firebase_admin import messaging
 from controller.crud.web_push import WebPushCrud
 
@@ -25,68 +22,61 @@ dizimo_payment_crud = DizimoPaymentCrud()
 user_crud = UserCrud()
 community_crud = CommunityCrud()
 web_push_crud = WebPushCrud()
-scheduler = AsyncIOScheduler()
+
+logger = logging.getLogger(__name__)
 
 PAID = "paid"
 EXPIRED = "expired"
 ACTIVE = "active"
+REMINDER_MINUTES = (5, 10, 15, 20, 25)
 
 
-async def update_payment_and_push_notification(
-    correlation_id: str, count: int = 0
-) -> NoReturn:
-    dizimo_payment = await dizimo_payment_crud.get_payment_by_correlation_id(
-        correlation_id
+async def mark_dizimo_payment_paid(correlation_id: str, value: int) -> bool:
+    async with unit_of_work() as session:
+        dizimo_payment = await dizimo_payment_crud.mark_paid_if_active(
+            correlation_id, session
+        )
+        if dizimo_payment is None:
+            return False
+        user = await user_crud.get_user_by_id(dizimo_payment.user_id, session)
+        await community_crud.increase_actual_month_payment_value(
+            user.community_id, value, session
+        )
+    await pix_notification_message(
+        "E-Igreja",
+        "Pagamento confirmado, obrigado pela a sua doacao",
+        user.id,
     )
-    pix_payment = get_pix_payment_from_correlation_id(
-        dizimo_payment.correlation_id
+    return True
+
+
+async def expire_dizimo_payment(correlation_id: str) -> bool:
+    dizimo_payment = await dizimo_payment_crud.expire_if_active(correlation_id)
+    if dizimo_payment is None:
+        return False
+    try:
+        await delete_pix_by_correlation_id(correlation_id)
+    except Exception:
+        logger.exception("could not delete Pix charge %s", correlation_id)
+    await pix_notification_message(
+        "E-Igreja",
+        "Pix expirado, por favor gerar outro pix",
+        dizimo_payment.user_id,
     )
-    user = await user_crud.get_user_by_id(dizimo_payment.user_id)
-    if get_dizimo_status(dizimo_payment) == ACTIVE:
-        if is_pix_paid(pix_payment):
-            await dizimo_payment_crud.update_status(dizimo_payment.id, PAID)
-            await community_crud.increase_actual_month_payment_value(
-                user.community_id, get_pix_value(pix_payment)
-            )
-            await pix_notification_message(
-                "E-Igreja",
-                "Pagamento confirmado, obrigado pela a sua doacao",
-                user.id,
-            )
-            remove_jobs_by_function(
-                update_payment_and_push_notification, correlation_id
-            )
-            return
-        if is_pix_expired(pix_payment):
-            delete_pix_by_correlation_id(dizimo_payment.correlation_id)
-            await dizimo_payment_crud.update_correlation_id_to_none(
-                dizimo_payment.id
-            )
-            await pix_notification_message(
-                "E-Igreja", "Pix expirado, por favor gerar outro pix", user.id
-            )
-            remove_jobs_by_function(
-                update_payment_and_push_notification, correlation_id
-            )
-            return
-        if is_pix_active(pix_payment):
-            if (
-                count == 5
-                or count == 10
-                or count == 15
-                or count == 20
-                or count == 25
-            ):
-                await pix_notification_message(
-                    "E-Igreja",
-                    f"Realize o pagamento, ainda falta {30 - count} minutos para realizar o pagamento",
-                    user.id,
-                )
-            return
-    if get_dizimo_status(dizimo_payment) == PAID:
-        remove_jobs_by_function(
-            update_payment_and_push_notification, correlation_id
+    return True
+
+
+async def apply_pix_payment(correlation_id: str, pix_payment: dict) -> bool:
+    # Shared by the webhook and the polling job; both may see the same
+    # event, and only the one that changes the row acts on it.
+    charge_cache.invalidate(correlation_id)
+    if is_pix_paid(pix_payment):
+        return await mark_dizimo_payment_paid(
+            correlation_id, get_pix_value(pix_payment)
         )
+    if is_pix_expired(pix_payment):
+        return await expire_dizimo_payment(correlation_id)
+    return False
 
 
 async def pix_notification_message(
@@ -99,18 +89,8 @@ async def pix_notification_message(
             token=web_push.token,
         )
         messaging.send(message)
-    except Exception as error:
-        print(error)
-
-
-def remove_jobs_by_function(func, correlation_id: str) -> NoReturn:
-    jobs = scheduler.get_jobs()
-    for job in jobs:
-        if (
-            job.func == func
-            and job.kwargs.get("correlation_id") == correlation_id
-        ):
-            scheduler.remove_job(job.id)
+    except Exception:
+        logger.exception("could not notify user %s", user_id)
 
 
 async def create_month_dizimo_payment_and_transfer_payments_values() -> (
@@ -120,8 +100,4 @@ async def create_month_dizimo_payment_and_transfer_payments_values() -> (
         for user in users:
             dizimo_payment = await create_dizimo_payment(user)
             await dizimo_payment_crud.create_payment(dizimo_payment)
-    async for communities in community_crud.get_communities_paginated():
-        for community in communities:
-            await community_crud.transfer_actual_to_last_month_and_reset_actual(
-                community.id
-            )
+    await community_crud.transfer_all_actual_to_last_month_and_reset_actual()
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+from heapq import heappop, heappush
+from time import time
+from typing import NoReturn
+from dotenv import load_dotenv
+from os import getenv
+from controller.crud.dizimo_payment import DizimoPaymentCrud
+from controller.jobs.dizimo_payment import (
+    apply_pix_payment,
+    pix_notification_message,
+    ACTIVE,
+    REMINDER_MINUTES,
+)
+from controller.src.dizimo_payment import get_dizimo_status
+from controller.src.pix_payment import (
+    get_pix_payments_from_correlation_ids,
+    is_pix_active,
+    EXPIRE_TIME,
+)
+from controller.src.pix_webhook import is_pix_webhook_enabled
+from controller.src.metrics import Counter, Histogram, register_collector
+from database import AdvisoryLock, engine
+
+load_dotenv()
+
+EXPIRE_MINUTES = EXPIRE_TIME // 60
+# With the webhook in place polling only catches missed events.
+PIX_FALLBACK_POLL_MINUTES = int(getenv("PIX_FALLBACK_POLL_MINUTES", 5))
+PIX_POLL_BATCH_SIZE = int(getenv("PIX_POLL_BATCH_SIZE", 100))
+# Workers that should never poll, e.g. when another service does it.
+PIX_POLLER_ENABLED = getenv("PIX_POLLER_ENABLED", "true").lower() == "true"
+PIX_POLLER_LOCK_ID = int(getenv("PIX_POLLER_LOCK_ID", 7_401_001))
+PIX_POLLER_LEADER_INTERVAL = float(getenv("PIX_POLLER_LEADER_INTERVAL", 30))
+BATCH_BUCKETS = (1, 5, 10, 25, 50, 100, 250)
+
+logger = logging.getLogger(__name__)
+dizimo_payment_crud = DizimoPaymentCrud()
+
+
+def get_check_minutes(interval: int) -> tuple[int, ...]:
+    # Reminders are due whatever the interval, and one check past the
+    # expiry catches charges that expired right at the last poll.
+    minutes = set(range(interval, EXPIRE_MINUTES + 1, interval))
+    minutes.update(REMINDER_MINUTES)
+    minutes.add(EXPIRE_MINUTES + 1)
+    return tuple(sorted(minutes))
+
+
+class PixPoller:
+    def __init__(
+        self,
+        check_minutes: tuple[int, ...],
+        batch_size: int,
+        lock: AdvisoryLock,
+        leader_interval: float,
+    ) -> None:
+        self.check_minutes = check_minutes
+        self.batch_size = batch_size
+        # Only the worker holding the lock polls; the others would send the
+        # same checks and reminders again.
+        self.lock = lock
+        self.leader_interval = leader_interval
+        self.leading = False
+        self.created: dict[str, float] = {}
+        # (due, minute, correlation_id); entries of settled charges are
+        # skipped when they come up instead of being searched for.
+        self.due: list[tuple[float, int, str]] = []
+        self.wakeup: asyncio.Event | None = None
+        self.task: asyncio.Task | None = None
+        self.checks = Counter()
+        self.errors = Counter()
+        self.batches = Histogram(BATCH_BUCKETS)
+        self.lag = Histogram()
+
+    def add(self, correlation_id: str, created: float | None = None) -> None:
+        # The leader picks up charges created on the other workers when it
+        # reloads them.
+        if not self.leading or correlation_id in self.created:
+            return
+        now = time()
+        created = created or now
+        self.created[correlation_id] = created
+        last_minute = self.check_minutes[-1]
+        if created + last_minute * 60 <= now:
+            # Loaded after its last check was due: check it once now.
+            heappush(self.due, (now, last_minute, correlation_id))
+        else:
+            self.schedule(correlation_id, now)
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    def discard(self, correlation_id: str) -> None:
+        self.created.pop(correlation_id, None)
+
+    def schedule(self, correlation_id: str, after: float) -> None:
+        created = self.created[correlation_id]
+        for minute in self.check_minutes:
+            due = created + minute * 60
+            if due > after:
+                heappush(self.due, (due, minute, correlation_id))
+                return
+        self.discard(correlation_id)
+
+    def pop_due(self) -> list[tuple[str, int]]:
+        now = time()
+        batch = []
+        while self.due and len(batch) < self.batch_size:
+            due, minute, correlation_id = self.due[0]
+            if due > now:
+                break
+            heappop(self.due)
+            if correlation_id not in self.created:
+                continue
+            self.lag.observe(now - due)
+            batch.append((correlation_id, minute))
+        return batch
+
+    async def wait(self) -> None:
+        if self.due and self.due[0][0] <= time():
+            return
+        timeout = self.due[0][0] - time() if self.due else None
+        self.wakeup.clear()
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def reschedule(self, correlation_id: str, minute: int) -> None:
+        created = self.created.get(correlation_id)
+        if created is not None:
+            self.schedule(correlation_id, created + minute * 60)
+
+    async def check(self, batch: list[tuple[str, int]]) -> None:
+        self.batches.observe(len(batch))
+        payments = await dizimo_payment_crud.get_payments_by_correlation_ids(
+            [correlation_id for correlation_id, _ in batch]
+        )
+        payments = {payment.correlation_id: payment for payment in payments}
+        active = []
+        for correlation_id, minute in batch:
+            payment = payments.get(correlation_id)
+            # Settled elsewhere, usually by the webhook: no need to ask Pix.
+            if payment is None or get_dizimo_status(payment) != ACTIVE:
+                self.discard(correlation_id)
+            else:
+                active.append((correlation_id, minute, payment))
+        if not active:
+            return
+
+        pix_payments = await get_pix_payments_from_correlation_ids(
+            [correlation_id for correlation_id, _, _ in active], cached=False
+        )
+        for (correlation_id, minute, payment), pix_payment in zip(
+            active, pix_payments
+        ):
+            self.checks.inc()
+            try:
+                if isinstance(pix_payment, Exception):
+                    raise pix_payment
+                if await apply_pix_payment(correlation_id, pix_payment):
+                    self.discard(correlation_id)
+                    continue
+                if is_pix_active(pix_payment) and minute in REMINDER_MINUTES:
+                    await pix_notification_message(
+                        "E-Igreja",
+                        f"Realize o pagamento, ainda falta {EXPIRE_MINUTES - minute} minutos para realizar o pagamento",
+                        payment.user_id,
+                    )
+            except Exception:
+                self.errors.inc()
+                logger.exception("Pix check failed for %s", correlation_id)
+            self.reschedule(correlation_id, minute)
+
+    async def run(self) -> NoReturn:
+        while True:
+            await self.wait()
+            batch = self.pop_due()
+            if not batch:
+                continue
+            try:
+                await self.check(batch)
+            except Exception:
+                self.errors.inc()
+                logger.exception("Pix check batch failed")
+                for correlation_id, minute in batch:
+                    self.reschedule(correlation_id, minute)
+
+    async def load(self, recent: bool = False) -> None:
+        charges = await dizimo_payment_crud.get_active_charges()
+        now = time()
+        last_check = self.check_minutes[-1] * 60
+        for correlation_id, date in charges:
+            created = date.timestamp() if date else None
+            # After the first load only new charges matter: the overdue ones
+            # were checked already and would be checked again every reload.
+            if recent and (created is None or created + last_check <= now):
+                continue
+            self.add(correlation_id, created)
+
+    async def lead(self) -> NoReturn:
+        run = None
+        try:
+            while True:
+                try:
+                    leading = await self.lock.acquire()
+                except Exception:
+                    logger.exception("Pix poller lock failed")
+                    leading = False
+                if leading:
+                    self.leading = True
+                    try:
+                        await self.load(recent=run is not None)
+                    except Exception:
+                        self.errors.inc()
+                        logger.exception("Pix poller load failed")
+                    if run is None:
+                        run = asyncio.create_task(self.run())
+                elif run is not None:
+                    logger.warning("Pix poller lost its lock")
+                    run.cancel()
+                    run = None
+                    self.reset()
+                await asyncio.sleep(self.leader_interval)
+        finally:
+            if run is not None:
+                run.cancel()
+            self.reset()
+            await self.lock.release()
+
+    def reset(self) -> None:
+        self.leading = False
+        self.created.clear()
+        self.due.clear()
+
+    async def start(self) -> None:
+        if not PIX_POLLER_ENABLED:
+            return
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self.lead())
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    def get_metrics(self) -> dict:
+        return {
+            "leader": self.leading,
+            "open_charges": len(self.created),
+            "scheduled_checks": len(self.due),
+            "checks": self.checks.value,
+            "errors": self.errors.value,
+            "batch_size": self.batches.snapshot(),
+            "lag_seconds": self.lag.snapshot(),
+        }
+
+    def __repr__(self) -> str:
+        return f"PixPoller(open_charges={len(self.created)!r})"
+
+
+pix_poller = PixPoller(
+    get_check_minutes(
+        PIX_FALLBACK_POLL_MINUTES if is_pix_webhook_enabled() else 1
+    ),
+    PIX_POLL_BATCH_SIZE,
+    AdvisoryLock(engine, PIX_POLLER_LOCK_ID),
+    PIX_POLLER_LEADER_INTERVAL,
+)
+register_collector("pix_poller", pix_poller.get_metrics)
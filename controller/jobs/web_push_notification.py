@@ -28,26 +28,24 @@ async def send_notification() -> NoReturn:
             is_first_month_day,
         )
 
-        web_pushes = await get_web_pushes()
-        for web_push in web_pushes:
+        today = datetime.now()
+        month = convert_to_month(today.month)
+        async for web_push in get_web_pushes():
             user = web_push.user
             token = web_push.token
-            month = convert_to_month(datetime.month)
-            year = datetime.year
-            day = datetime.day
             dizimo = await dizimo_payment_crud.get_payment_by_month_year_and_user_id(
-                month, year, user.id
+                month, today.year, user.id
             )
-            if is_first_month_day(day):
+            if is_first_month_day(today.day):
                 title = f"E-Igreja"
                 body = f"Pagamento de {month} ja disponivel"
                 execute_notification(token, title, body)
-                return
+                continue
             if dizimo_payment_is_active(dizimo):
                 title = f"E-Igreja"
                 body = f"Pagamento de {month} ainda pendente"
                 execute_notification(token, title, body)
-                return
+                continue
             title = f"E-Igreja"
             body = f"Convide amigos para fazer parte! Agradecemos pela sua contribuicao!"
             execute_notification(token, title, body)
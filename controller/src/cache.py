@@ -0,0 +1,67 @@
+from sys import getsizeof
+from dataclasses import fields, is_dataclass
+from cachetools import Cache, TTLCache
+from controller.src.metrics import Counter, register_collector
+
+
+def get_entry_size(value) -> int:
+    size = getsizeof(value)
+    if is_dataclass(value):
+        size += sum(
+            getsizeof(getattr(value, field.name)) for field in fields(value)
+        )
+    return size
+
+
+class MeteredCache:
+    def __init__(self, name: str, entries: Cache) -> None:
+        self.name = name
+        self.entries = entries
+        self.hits = Counter()
+        self.misses = Counter()
+        self.invalidations = Counter()
+        register_collector(f"{name}_cache", self.get_metrics)
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses.inc()
+        else:
+            self.hits.inc()
+        return value
+
+    def set(self, key, value) -> None:
+        try:
+            self.entries[key] = value
+        except ValueError:
+            # A single entry larger than the whole budget is not cached.
+            pass
+
+    def invalidate(self, *keys) -> None:
+        for key in keys:
+            if self.entries.pop(key, None) is not None:
+                self.invalidations.inc()
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def get_metrics(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "size": self.entries.currsize,
+            "max_size": self.entries.maxsize,
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "invalidations": self.invalidations.value,
+        }
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(name={self.name!r})"
+
+
+class MeteredTTLCache(MeteredCache):
+    def __init__(self, name: str, max_bytes: int, ttl: float) -> None:
+        super().__init__(
+            name,
+            TTLCache(maxsize=max_bytes, ttl=ttl, getsizeof=get_entry_size),
+        )
@@ -1,6 +1,11 @@
 from models import Community
-from uuid import uuid4
+from controller.src.generate_uuid import generate_uuid7
 from models import User
+from controller.crud.community import CommunityCrud
+from controller.src.user import get_user_reference
+from controller.errors.http.exceptions import forbidden, not_found
+
+community_crud = CommunityCrud()
 
 
 def get_users_friendly_data(users: [User]) -> list[dict]:
@@ -38,7 +43,7 @@ def create_community_data(community_data: dict) -> Community:
                 community.location = community_data["location"]
             case "email":
                 community.email = community_data["email"]
-    community.id = str(uuid4())
+    community.id = generate_uuid7()
     return community
 
 
@@ -81,3 +86,22 @@ def update_community_data(community: Community, data: dict) -> dict:
 
 def get_community_patron(community: Community) -> str:
     return community.patron
+
+
+async def get_scoped_community_id(community_patron: str, user: dict) -> str:
+    reference = await get_user_reference(user)
+    if user.get("community_patron") is None:
+        # Tokens issued before the patron claim existed.
+        community = await community_crud.get_community_by_patron(
+            community_patron
+        )
+        if community is None:
+            not_found("Community not found")
+        community_id = community.id
+    elif user["community_patron"] == community_patron:
+        community_id = reference.community_id
+    else:
+        forbidden("You can't access this community")
+    if community_id != reference.community_id:
+        forbidden("You can't access this community")
+    return community_id
@@ -1,10 +1,11 @@
 from models import DizimoPayment
 from models import User
-from uuid import uuid4
+from controller.src.generate_uuid import generate_uuid7
 from datetime import datetime
 from controller.src.pix_payment import (
     get_pix_no_sensitive_data,
     get_pix_payment_from_correlation_id,
+    get_pix_payments_from_correlation_ids,
 )
 
 STATUS = ("active", "expired", "paid")
@@ -62,7 +63,7 @@ def pass_data_to(
 
 async def create_dizimo_payment(user: User) -> DizimoPayment:
     dizimo_payment = DizimoPayment()
-    dizimo_payment.id = str(uuid4())
+    dizimo_payment.id = generate_uuid7()
     dizimo_payment.user_id = user.id
     dizimo_payment.status = ACTIVE
     dizimo_payment.year = datetime.now().year
@@ -74,7 +75,9 @@ def dizimo_payment_is_expired(payment: DizimoPayment) -> bool:
     return payment.status == EXPIRED
 
 
-def get_dizimo_payment_no_sensitive_data(payment: DizimoPayment) -> dict:
+async def get_dizimo_payment_no_sensitive_data(
+    payment: DizimoPayment,
+) -> dict:
     payment_no_sensitive_data = {
         "status": payment.status,
         "year": payment.year,
@@ -83,11 +86,40 @@ def get_dizimo_payment_no_sensitive_data(payment: DizimoPayment) -> dict:
     }
     if payment.correlation_id:
         payment_no_sensitive_data["payment"] = get_pix_no_sensitive_data(
-            get_pix_payment_from_correlation_id(payment.correlation_id)
+            await get_pix_payment_from_correlation_id(payment.correlation_id)
         )
     return payment_no_sensitive_data
 
 
+def get_pix_error(error: Exception) -> str:
+    return getattr(error, "detail", None) or repr(error)
+
+
+async def get_dizimo_payments_no_sensitive_data(
+    payments: list[DizimoPayment],
+) -> list[dict]:
+    charged = [payment for payment in payments if payment.correlation_id]
+    pix_payments = await get_pix_payments_from_correlation_ids(
+        [payment.correlation_id for payment in charged]
+    )
+    pix_by_payment = dict(zip(map(id, charged), pix_payments))
+    results = []
+    for payment in payments:
+        result = {
+            "status": payment.status,
+            "year": payment.year,
+            "month": payment.month,
+            "payment": None,
+        }
+        pix = pix_by_payment.get(id(payment))
+        if isinstance(pix, Exception):
+            result["error"] = get_pix_error(pix)
+        elif pix is not None:
+            result["payment"] = get_pix_no_sensitive_data(pix)
+        results.append(result)
+    return results
+
+
 def get_dizimo_status(dizimo: DizimoPayment) -> str:
     return dizimo.status
 
@@ -96,7 +128,7 @@ async def test_create_dizimo_payment(
     user: User, year: int, month: str
 ) -> DizimoPayment:
     dizimo_payment = DizimoPayment()
-    dizimo_payment.id = str(uuid4())
+    dizimo_payment.id = generate_uuid7()
     dizimo_payment.user_id = user.id
     dizimo_payment.status = ACTIVE
     dizimo_payment.year = year
@@ -1,5 +1,49 @@
-from uuid import uuid4
+from os import urandom
+from threading import Lock
+from time import time_ns
+from uuid import UUID, uuid4
+
+UUID7_VERSION = 0x7 << 76
+UUID7_VARIANT = 0b10 << 62
+RAND_B_MASK = (1 << 62) - 1
+SEQUENCE_MAX = 0xFFF
+
+uuid7_lock = Lock()
+uuid7_state = {"timestamp": 0, "sequence": 0}
 
 
 def generate_uuid4() -> str:
     return str(uuid4())
+
+
+def next_uuid7_sequence() -> tuple[int, int]:
+    timestamp = time_ns() // 1_000_000
+    with uuid7_lock:
+        if timestamp > uuid7_state["timestamp"]:
+            # Start low so the rest of the millisecond has room to count.
+            sequence = int.from_bytes(urandom(2), "big") & 0x7FF
+        else:
+            timestamp = uuid7_state["timestamp"]
+            sequence = uuid7_state["sequence"] + 1
+            if sequence > SEQUENCE_MAX:
+                timestamp += 1
+                sequence = 0
+        uuid7_state["timestamp"] = timestamp
+        uuid7_state["sequence"] = sequence
+    return timestamp, sequence
+
+
+def generate_uuid7() -> str:
+    # Millisecond timestamp first and a counter within the millisecond, so
+    # new keys land at the right edge of the primary key index instead of
+    # at random pages.
+    timestamp, sequence = next_uuid7_sequence()
+    random = int.from_bytes(urandom(8), "big")
+    value = (
+        (timestamp & 0xFFFF_FFFF_FFFF) << 80
+        | UUID7_VERSION
+        | sequence << 64
+        | UUID7_VARIANT
+        | random & RAND_B_MASK
+    )
+    return str(UUID(int=value))
@@ -1,12 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import Login
-from uuid import uuid4
-from controller.auth.password import hash_pasword, verify_hashed_password
+from controller.src.generate_uuid import generate_uuid7
+from controller.auth.password import (
+    hash_pasword_async,
+    verify_hashed_password_async,
+)
 from controller.crud import LoginCrud
 
 login_crud = LoginCrud()
 
 
-def create_login(login_data: dict) -> Login:
+async def create_login(login_data: dict) -> Login:
     login = Login()
     for key in login_data.keys():
         match key:
@@ -15,21 +19,27 @@ def create_login(login_data: dict) -> Login:
             case "position":
                 login.position = login_data["position"]
             case "password":
-                login.password = hash_pasword(login_data["password"])
-    login.id = str(uuid4())
+                login.password = await hash_pasword_async(
+                    login_data["password"]
+                )
+    login.id = generate_uuid7()
     return login
 
 
-async def verify_user_login(login_data: dict) -> bool:
-    login = await login_crud.get_login_by_cpf(login_data["cpf"])
-    return verify_hashed_password(login_data["password"], login.password)
+async def verify_user_login(
+    login_data: dict, session: AsyncSession | None = None
+) -> bool:
+    login = await login_crud.get_login_by_cpf(login_data["cpf"], session)
+    return await verify_hashed_password_async(
+        login_data["password"], login.password
+    )
 
 
 async def verify_admin_login(login_data: dict) -> bool:
     login = await login_crud.get_login_by_cpf(login_data["cpf"])
     if login.position:
         if login.position == login_data["position"]:
-            return verify_hashed_password(
+            return await verify_hashed_password_async(
                 login_data["password"], login.password
             )
     return False
@@ -44,9 +54,9 @@ def convert_to_dict(login: Login) -> dict:
     return new_login
 
 
-def update_login_password(login: Login, password: str) -> dict:
+async def update_login_password(login: Login, password: str) -> dict:
     login = convert_to_dict(login)
-    login["password"] = hash_pasword(password)
+    login["password"] = await hash_pasword_async(password)
     return login
 
 
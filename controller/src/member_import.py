@@ -0,0 +1,248 @@
+import csv
+import json
+from asyncio import Semaphore, gather
+from datetime import datetime
+from typing import AsyncIterator
+from controller.src.generate_uuid import generate_uuid7
+from dotenv import load_dotenv
+from os import getenv
+from controller.auth.password import hash_pasword_async, password_hasher
+from controller.crud import UserCrud
+from controller.src.dizimo_payment import ACTIVE, convert_to_month
+from controller.validators.sign_validator import validate_sign_ups
+from controller.errors.http.exceptions import (
+    bad_request,
+    unsupported_media_type,
+)
+
+load_dotenv()
+
+IMPORT_CHUNK_SIZE = int(getenv("IMPORT_CHUNK_SIZE", 200))
+IMPORT_MAX_ROWS = int(getenv("IMPORT_MAX_ROWS", 10_000))
+IMPORT_MAX_LINE_BYTES = int(getenv("IMPORT_MAX_LINE_BYTES", 4096))
+IMPORT_HASH_CONCURRENCY = int(
+    getenv("IMPORT_HASH_CONCURRENCY", password_hasher.workers)
+)
+
+CSV_TYPES = ("text/csv",)
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl")
+MEMBER_FIELDS = ("cpf", "name", "password", "birthday", "phone")
+
+user_crud = UserCrud()
+
+
+def get_import_format(content_type: str | None) -> str:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CSV_TYPES:
+        return "csv"
+    if media_type in NDJSON_TYPES:
+        return "ndjson"
+    raise unsupported_media_type(
+        "Send members as text/csv or application/x-ndjson"
+    )
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    buffer = b""
+    first = True
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > IMPORT_MAX_LINE_BYTES:
+            raise bad_request("Import line is too long")
+        for line in lines:
+            line = line.decode("utf-8", errors="replace").rstrip("\r")
+            if first:
+                line = line.lstrip("\ufeff")
+                first = False
+            yield line
+    if buffer:
+        line = buffer.decode("utf-8", errors="replace").rstrip("\r")
+        yield line.lstrip("\ufeff") if first else line
+
+
+async def iter_rows(
+    stream: AsyncIterator[bytes], import_format: str
+) -> AsyncIterator[tuple[int, dict | str]]:
+    header = None
+    line_number = 0
+    async for line in iter_lines(stream):
+        line_number += 1
+        if not line.strip():
+            continue
+        if import_format == "ndjson":
+            try:
+                row = json.loads(line)
+            except ValueError as error:
+                yield line_number, f"Invalid JSON: {error}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, "Each line must be a JSON object"
+                continue
+            yield line_number, row
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [value.strip().lower() for value in values]
+            missing = [field for field in MEMBER_FIELDS if field not in header]
+            if missing:
+                raise bad_request(f"Missing CSV columns: {', '.join(missing)}")
+            continue
+        if len(values) != len(header):
+            yield line_number, "Wrong number of columns"
+            continue
+        yield line_number, dict(zip(header, values))
+
+
+def get_missing_fields(row: dict) -> list[str]:
+    return [field for field in MEMBER_FIELDS if not row.get(field)]
+
+
+def normalize_row(row: dict) -> dict:
+    return {field: str(row[field]).strip() for field in MEMBER_FIELDS}
+
+
+def build_member(row: dict, community_id: str, password: str) -> dict:
+    user_id = generate_uuid7()
+    now = datetime.now()
+    return {
+        "user": {
+            "id": user_id,
+            "cpf": row["cpf"],
+            "name": row["name"],
+            "birthday": datetime.strptime(row["birthday"], "%Y-%m-%d"),
+            "phone": row["phone"],
+            "community_id": community_id,
+        },
+        "login": {
+            "id": generate_uuid7(),
+            "cpf": row["cpf"],
+            "password": password,
+        },
+        "number": {"user_id": user_id, "number": row["phone"]},
+        "payment": {
+            "id": generate_uuid7(),
+            "user_id": user_id,
+            "status": ACTIVE,
+            "year": now.year,
+            "month": convert_to_month(now.month),
+        },
+    }
+
+
+class MemberImport:
+    def __init__(self, community_id: str) -> None:
+        self.community_id = community_id
+        self.imported = 0
+        self.errors = []
+        self.seen_cpfs = set()
+        self.seen_phones = set()
+        self.hash_slots = Semaphore(IMPORT_HASH_CONCURRENCY)
+
+    def fail(self, line: int, row: dict | None, detail: str) -> None:
+        cpf = row.get("cpf") if isinstance(row, dict) else None
+        self.errors.append({"line": line, "cpf": cpf, "detail": detail})
+
+    async def hash_password(self, password: str) -> str:
+        # Stay under the hasher's in-flight limit so sign-ins keep working
+        # while an import runs.
+        async with self.hash_slots:
+            return await hash_pasword_async(password)
+
+    async def import_chunk(self, chunk: list[tuple[int, dict]]) -> None:
+        complete = []
+        for line, row in chunk:
+            missing = get_missing_fields(row)
+            if missing:
+                self.fail(line, row, f"Missing fields: {', '.join(missing)}")
+            else:
+                complete.append((line, normalize_row(row)))
+        errors = validate_sign_ups([row for _, row in complete])
+
+        valid = []
+        for (line, row), error in zip(complete, errors):
+            if error:
+                self.fail(line, row, error)
+                continue
+            if row["cpf"] in self.seen_cpfs:
+                self.fail(line, row, "Duplicated CPF in import")
+                continue
+            if row["phone"] in self.seen_phones:
+                self.fail(line, row, "Duplicated phone in import")
+                continue
+            self.seen_cpfs.add(row["cpf"])
+            self.seen_phones.add(row["phone"])
+            valid.append((line, row))
+        if not valid:
+            return
+
+        taken_cpfs, taken_phones = await user_crud.get_taken_cpfs_and_phones(
+            [row["cpf"] for _, row in valid],
+            [row["phone"] for _, row in valid],
+        )
+        rows = []
+        for line, row in valid:
+            if row["cpf"] in taken_cpfs:
+                self.fail(line, row, "User already exist")
+            elif row["phone"] in taken_phones:
+                self.fail(line, row, "Phone already in use")
+            else:
+                rows.append((line, row))
+        if not rows:
+            return
+
+        passwords = await gather(
+            *[self.hash_password(row["password"]) for _, row in rows]
+        )
+        members = [
+            build_member(row, self.community_id, password)
+            for (_, row), password in zip(rows, passwords)
+        ]
+        failed = await user_crud.create_members(members)
+        for index, detail in failed.items():
+            line, row = rows[index]
+            self.fail(line, row, detail)
+        self.imported += len(rows) - len(failed)
+
+    async def run(
+        self, stream: AsyncIterator[bytes], import_format: str
+    ) -> dict:
+        chunk = []
+        rows = 0
+        async for line, row in iter_rows(stream, import_format):
+            rows += 1
+            if rows > IMPORT_MAX_ROWS:
+                self.fail(
+                    line, None, f"Import is limited to {IMPORT_MAX_ROWS} rows"
+                )
+                break
+            if isinstance(row, str):
+                self.fail(line, None, row)
+                continue
+            chunk.append((line, row))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                await self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            await self.import_chunk(chunk)
+        return self.get_report()
+
+    def get_report(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": len(self.errors),
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"MemberImport(community_id={self.community_id!r}, "
+            f"imported={self.imported!r})"
+        )
+
+
+async def import_members(
+    stream: AsyncIterator[bytes], content_type: str | None, community_id: str
+) -> dict:
+    import_format = get_import_format(content_type)
+    return await MemberImport(community_id).run(stream, import_format)
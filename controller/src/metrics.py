@@ -0,0 +1,67 @@
+from bisect import bisect_left
+from os import getpid
+from typing import Callable
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+collectors: dict[str, Callable[[], dict]] = {}
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def __repr__(self) -> str:
+        return f"Counter({self.value!r})"
+
+
+class Histogram:
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        buckets = {}
+        cumulative = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            cumulative += count
+            buckets[str(bucket)] = cumulative
+        buckets["+Inf"] = self.count
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+    def __repr__(self) -> str:
+        return f"Histogram(count={self.count!r}, sum={self.sum!r})"
+
+
+def register_collector(name: str, collector: Callable[[], dict]) -> None:
+    collectors[name] = collector
+
+
+def collect_metrics() -> dict:
+    metrics = {"pid": getpid()}
+    for name, collector in collectors.items():
+        metrics[name] = collector()
+    return metrics
@@ -1,19 +1,44 @@
+import asyncio
 from dataclasses import dataclass
+from math import inf
+from random import uniform
+from time import monotonic, perf_counter
+from aiohttp import (
+    ClientConnectorError,
+    ClientError,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+)
 from models import DizimoPayment
 from models import User
 from dotenv import load_dotenv
 from os import getenv
-import requests
 from typing import NoReturn
+from cachetools import TLRUCache
+from controller.errors.http.exceptions import bad_gateway, gateway_timeout
+from controller.src.metrics import Counter, Histogram, register_collector
+from controller.src.cache import MeteredCache
 
 load_dotenv()
 
 PIX_COB_URL = getenv("PIX_COB_URL")
+PIX_TIMEOUT = float(getenv("PIX_TIMEOUT", 10))
+PIX_CONNECT_TIMEOUT = float(getenv("PIX_CONNECT_TIMEOUT", 3))
+PIX_MAX_CONNECTIONS = int(getenv("PIX_MAX_CONNECTIONS", 20))
+PIX_KEEPALIVE_TIMEOUT = float(getenv("PIX_KEEPALIVE_TIMEOUT", 30))
+PIX_RETRIES = int(getenv("PIX_RETRIES", 2))
+PIX_RETRY_BACKOFF = float(getenv("PIX_RETRY_BACKOFF", 0.2))
+PIX_CACHE_SIZE = int(getenv("PIX_CACHE_SIZE", 10_000))
+PIX_ACTIVE_CACHE_TTL = float(getenv("PIX_ACTIVE_CACHE_TTL", 5))
+PIX_MAX_IN_FLIGHT = int(getenv("PIX_MAX_IN_FLIGHT", PIX_MAX_CONNECTIONS))
+PIX_REQUEST_CONCURRENCY = int(getenv("PIX_REQUEST_CONCURRENCY", 6))
 header = {"Authorization": getenv("APP_ID"), "type": "application/json"}
 PAID = "COMPLETED"
 ACTIVE = "ACTIVE"
 EXPIRED = "EXPIRED"
 EXPIRE_TIME = 30 * 60
+FINAL_STATUSES = (PAID, EXPIRED)
 
 
 @dataclass
@@ -34,15 +59,201 @@ class PixPayment:
         }
 
 
+class PixRetryableError(Exception):
+    pass
+
+
+class PixOperationMetrics:
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.retries = Counter()
+        self.errors = Counter()
+
+    def snapshot(self) -> dict:
+        return {
+            "latency_seconds": self.latency.snapshot(),
+            "retries": self.retries.value,
+            "errors": self.errors.value,
+        }
+
+
+class PixClient:
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: dict,
+        timeout: ClientTimeout,
+        max_connections: int,
+        max_in_flight: int,
+        retries: int,
+        backoff: float,
+    ) -> None:
+        self.base_url = base_url
+        # requests silently dropped unset headers; aiohttp refuses them.
+        self.headers = {
+            key: value for key, value in headers.items() if value is not None
+        }
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_in_flight = max_in_flight
+        self.retries = retries
+        self.backoff = backoff
+        self.session: ClientSession | None = None
+        self.slots: asyncio.Semaphore | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.operations: dict[str, PixOperationMetrics] = {}
+
+    async def get_session(self) -> ClientSession:
+        loop = asyncio.get_running_loop()
+        # The session is bound to the loop that created it, so a new loop
+        # closes it and starts its own.
+        if self.loop is not loop:
+            await self.close()
+        if self.session is None or self.session.closed:
+            self.session = ClientSession(
+                headers=self.headers,
+                timeout=self.timeout,
+                connector=TCPConnector(
+                    limit=self.max_connections,
+                    keepalive_timeout=PIX_KEEPALIVE_TIMEOUT,
+                ),
+            )
+            self.slots = asyncio.Semaphore(self.max_in_flight)
+            self.loop = loop
+        return self.session
+
+    def get_operation_metrics(self, operation: str) -> PixOperationMetrics:
+        return self.operations.setdefault(operation, PixOperationMetrics())
+
+    def get_retry_delay(self, attempt: int) -> float:
+        # Full jitter keeps retries from many requests from lining up.
+        return uniform(0, self.backoff * 2**attempt)
+
+    async def send(
+        self, method: str, url: str, json: dict | None
+    ) -> dict | None:
+        session = await self.get_session()
+        async with session.request(method, url, json=json) as response:
+            if response.status in self.RETRY_STATUSES:
+                raise PixRetryableError(f"Pix answered {response.status}")
+            if response.status == 204:
+                return None
+            return await response.json(content_type=None)
+
+    async def request(
+        self,
+        operation: str,
+        method: str,
+        path: str = "",
+        json: dict | None = None,
+    ) -> dict | None:
+        metrics = self.get_operation_metrics(operation)
+        await self.get_session()
+        # Shared by every request, so one large fan-out cannot take all the
+        # provider capacity; retries keep their slot.
+        async with self.slots:
+            return await self.send_with_retries(
+                operation, metrics, method, path, json
+            )
+
+    async def send_with_retries(
+        self,
+        operation: str,
+        metrics: PixOperationMetrics,
+        method: str,
+        path: str,
+        json: dict | None,
+    ) -> dict | None:
+        url = self.base_url + path
+        # A charge creation that reached Pix must not be repeated, so only
+        # failures to connect are retried for it.
+        idempotent = method != "POST"
+        attempt = 0
+        start = perf_counter()
+        try:
+            while True:
+                try:
+                    return await self.send(method, url, json)
+                except ClientConnectorError:
+                    if attempt >= self.retries:
+                        raise
+                except (
+                    PixRetryableError,
+                    ClientError,
+                    asyncio.TimeoutError,
+                ):
+                    if not idempotent or attempt >= self.retries:
+                        raise
+                metrics.retries.inc()
+                await asyncio.sleep(self.get_retry_delay(attempt))
+                attempt += 1
+        except asyncio.TimeoutError:
+            metrics.errors.inc()
+            gateway_timeout(f"Pix {operation} timed out")
+        except (PixRetryableError, ClientError) as error:
+            metrics.errors.inc()
+            bad_gateway(f"Pix {operation} failed: {error!r}")
+        finally:
+            metrics.latency.observe(perf_counter() - start)
+
+    async def close(self) -> None:
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def get_metrics(self) -> dict:
+        return {
+            operation: metrics.snapshot()
+            for operation, metrics in self.operations.items()
+        }
+
+    def __repr__(self) -> str:
+        return f"PixClient(base_url={self.base_url!r})"
+
+
+pix_client = PixClient(
+    PIX_COB_URL,
+    header,
+    ClientTimeout(total=PIX_TIMEOUT, connect=PIX_CONNECT_TIMEOUT),
+    PIX_MAX_CONNECTIONS,
+    PIX_MAX_IN_FLIGHT,
+    PIX_RETRIES,
+    PIX_RETRY_BACKOFF,
+)
+register_collector("pix", pix_client.get_metrics)
+
+
+def get_charge_expiry(key: str, value: dict, now: float) -> float:
+    # Paid and expired charges never change again; an active one can be
+    # paid at any moment.
+    if value["charge"].get("status") in FINAL_STATUSES:
+        return inf
+    return now + PIX_ACTIVE_CACHE_TTL
+
+
+charge_cache = MeteredCache(
+    "pix_charge",
+    TLRUCache(maxsize=PIX_CACHE_SIZE, ttu=get_charge_expiry, timer=monotonic),
+)
+
+
+def cache_charge(correlation_id: str, pix: dict | None) -> None:
+    # Without a status there is no telling how long the answer holds.
+    charge = pix.get("charge") if pix else None
+    if isinstance(charge, dict) and charge.get("status"):
+        charge_cache.set(correlation_id, pix)
+
+
 def create_customer(user: User) -> dict:
     return {"name": user.name, "cpf": user.cpf, "phone": user.phone}
 
 
-def make_post_pix_request(pix: PixPayment) -> dict:
-    result = requests.post(
-        url=PIX_COB_URL, headers=header, json=pix.__dict__()
-    )
-    return result.json()
+async def make_post_pix_request(pix: PixPayment) -> dict:
+    result = await pix_client.request("create", "POST", json=pix.__dict__())
+    cache_charge(pix.correlationID, result)
+    return result
 
 
 def verify_if_is_payment_paid(pix: dict) -> bool:
@@ -65,14 +276,45 @@ def get_pix_status(pix: dict) -> str:
     return pix["charge"]["status"]
 
 
-def get_pix_payment_from_correlation_id(correlation_id: str) -> dict:
-    URL = PIX_COB_URL + "/" + correlation_id
-    return requests.get(URL, headers=header).json()
+async def get_pix_payment_from_correlation_id(
+    correlation_id: str, cached: bool = True
+) -> dict:
+    if cached:
+        pix = charge_cache.get(correlation_id)
+        if pix is not None:
+            return pix
+    pix = await pix_client.request("get", "GET", "/" + correlation_id)
+    cache_charge(correlation_id, pix)
+    return pix
+
+
+async def get_pix_payments_from_correlation_ids(
+    correlation_ids: list[str],
+    concurrency: int = PIX_REQUEST_CONCURRENCY,
+    cached: bool = True,
+) -> list[dict | Exception]:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def get_pix_payment(correlation_id: str) -> dict | Exception:
+        async with slots:
+            try:
+                return await get_pix_payment_from_correlation_id(
+                    correlation_id, cached
+                )
+            except Exception as error:
+                return error
+
+    return await asyncio.gather(
+        *[
+            get_pix_payment(correlation_id)
+            for correlation_id in correlation_ids
+        ]
+    )
 
 
-def delete_pix_by_correlation_id(correlation_id: str) -> NoReturn:
-    URL = PIX_COB_URL + "/" + correlation_id
-    return requests.delete(URL, headers=header)
+async def delete_pix_by_correlation_id(correlation_id: str) -> NoReturn:
+    charge_cache.invalidate(correlation_id)
+    return await pix_client.request("delete", "DELETE", "/" + correlation_id)
 
 
 def is_pix_active(pix: dict) -> bool:
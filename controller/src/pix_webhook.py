@@ -0,0 +1,91 @@
+import hmac
+import json
+from base64 import b64encode
+from hashlib import sha256
+from dotenv import load_dotenv
+from os import getenv
+from controller.jobs.dizimo_payment import apply_pix_payment
+from controller.src.pix_payment import PAID
+from controller.errors.http.exceptions import (
+    bad_request,
+    service_unavailable,
+    unauthorized,
+)
+from controller.src.metrics import Counter, register_collector
+
+load_dotenv()
+
+PIX_WEBHOOK_SECRET = getenv("PIX_WEBHOOK_SECRET")
+PIX_WEBHOOK_SIGNATURE_HEADER = getenv(
+    "PIX_WEBHOOK_SIGNATURE_HEADER", "X-Webhook-Signature"
+)
+
+IGNORED = "ignored"
+APPLIED = "applied"
+UNCHANGED = "unchanged"
+
+events = {}
+invalid_signatures = Counter()
+
+
+def is_pix_webhook_enabled() -> bool:
+    return bool(PIX_WEBHOOK_SECRET)
+
+
+def sign_pix_webhook(body: bytes) -> str:
+    digest = hmac.new(PIX_WEBHOOK_SECRET.encode(), body, sha256).digest()
+    return b64encode(digest).decode()
+
+
+def verify_pix_webhook(body: bytes, signature: str | None) -> None:
+    if not is_pix_webhook_enabled():
+        service_unavailable("Pix webhook is not configured")
+    if not signature or not hmac.compare_digest(
+        sign_pix_webhook(body), signature
+    ):
+        invalid_signatures.inc()
+        unauthorized("Invalid webhook signature")
+
+
+def get_webhook_charge(body: bytes) -> dict | None:
+    try:
+        event = json.loads(body)
+    except ValueError:
+        bad_request("Invalid JSON")
+    charge = event.get("charge") if isinstance(event, dict) else None
+    # Test pings and events about other resources carry no charge.
+    if not isinstance(charge, dict) or not charge.get("correlationID"):
+        return None
+    if not isinstance(charge.get("status"), str):
+        bad_request("Charge without a status")
+    value = charge.get("value")
+    if charge["status"] == PAID and (
+        not isinstance(value, int) or isinstance(value, bool) or value <= 0
+    ):
+        bad_request("Paid charge without a valid value")
+    return charge
+
+
+async def handle_pix_webhook(body: bytes, signature: str | None) -> str:
+    verify_pix_webhook(body, signature)
+    charge = get_webhook_charge(body)
+    if charge is None:
+        outcome = IGNORED
+    elif await apply_pix_payment(charge["correlationID"], {"charge": charge}):
+        outcome = APPLIED
+    else:
+        outcome = UNCHANGED
+    events.setdefault(outcome, Counter()).inc()
+    return outcome
+
+
+def get_pix_webhook_metrics() -> dict:
+    return {
+        "invalid_signatures": invalid_signatures.value,
+        "events": {
+            outcome: counter.value for outcome, counter in events.items()
+        },
+    }
+
+
+register_collector("pix_webhook", get_pix_webhook_metrics)
@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from math import ceil
+from time import time
+from sqlalchemy import select, delete, case
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from fastapi import Request
+from dotenv import load_dotenv
+from os import getenv
+from database import session, engine
+from models import RateLimit
+from controller.errors.http.exceptions import too_many_requests
+from controller.src.metrics import Counter, register_collector
+
+load_dotenv()
+
+RATE_LIMIT_BACKEND = getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(getenv("RATE_LIMIT_MAX_KEYS", 100_000))
+RATE_LIMIT_PRUNE_AFTER = float(getenv("RATE_LIMIT_PRUNE_AFTER", 60 * 60))
+
+
+@dataclass(frozen=True)
+class Limit:
+    name: str
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+
+SIGNIN_CPF_LIMIT = Limit("signin_cpf", capacity=5, period=5 * 60)
+SIGNIN_IP_LIMIT = Limit("signin_ip", capacity=20, period=60)
+# Sending and verifying get their own buckets, so the codes a user asked
+# for do not use up their attempts to enter one.
+PASSWORD_RECOVERY_SEND_CPF_LIMIT = Limit(
+    "password_recovery_send_cpf", capacity=3, period=60 * 60
+)
+PASSWORD_RECOVERY_VERIFY_CPF_LIMIT = Limit(
+    "password_recovery_verify_cpf", capacity=5, period=60 * 60
+)
+PASSWORD_RECOVERY_IP_LIMIT = Limit(
+    "password_recovery_ip", capacity=10, period=60 * 60
+)
+
+
+def get_retry_after(tokens: float, rate: float) -> float:
+    return max(1 - tokens, 0) / rate
+
+
+class MemoryBackend:
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self.buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        now = time()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = [float(capacity), now]
+            self.buckets[key] = bucket
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+        if bucket[0] < 1:
+            return get_retry_after(bucket[0], rate)
+        bucket[0] -= 1
+        return 0.0
+
+    async def prune(self, older_than: float) -> None:
+        for key, bucket in list(self.buckets.items()):
+            if bucket[1] < older_than:
+                del self.buckets[key]
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+
+class DatabaseBackend:
+    def __init__(self) -> None:
+        self.session = session
+        if engine.dialect.name == "postgresql":
+            self.insert = postgresql_insert
+        else:
+            self.insert = sqlite_insert
+
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        now = time()
+        refilled = RateLimit.tokens + (now - RateLimit.updated_at) * rate
+        available = case((refilled > capacity, capacity), else_=refilled)
+        # One round trip refills and takes a token; the WHERE leaves the row
+        # untouched, and returns nothing, when the bucket is empty.
+        statement = (
+            self.insert(RateLimit)
+            .values(key=key, tokens=capacity - 1, updated_at=now)
+            .on_conflict_do_update(
+                index_elements=[RateLimit.key],
+                set_={"tokens": available - 1, "updated_at": now},
+                where=available >= 1,
+            )
+            .returning(RateLimit.tokens)
+        )
+        async with self.session() as db_session:
+            result = await db_session.execute(statement)
+            taken = result.first()
+            if taken is not None:
+                await db_session.commit()
+                return 0.0
+            statement = select(RateLimit.tokens, RateLimit.updated_at).filter(
+                RateLimit.key == key
+            )
+            tokens, updated_at = (await db_session.execute(statement)).one()
+            await db_session.commit()
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        return get_retry_after(tokens, rate)
+
+    async def prune(self, older_than: float) -> None:
+        async with self.session() as db_session:
+            await db_session.execute(
+                delete(RateLimit).filter(RateLimit.updated_at < older_than)
+            )
+            await db_session.commit()
+
+
+class RateLimiter:
+    def __init__(self, backend) -> None:
+        self.backend = backend
+        self.allowed = {}
+        self.rejected = {}
+        self.backend_errors = Counter()
+
+    async def hit(self, limit: Limit, key: str) -> None:
+        try:
+            retry_after = await self.backend.take(
+                f"{limit.name}:{key}", limit.capacity, limit.rate
+            )
+        except Exception:
+            # A broken shared backend must not lock everybody out.
+            self.backend_errors.inc()
+            return
+        if retry_after <= 0:
+            self.allowed.setdefault(limit.name, Counter()).inc()
+            return
+        self.rejected.setdefault(limit.name, Counter()).inc()
+        too_many_requests(
+            "Too many attempts, try again later",
+            headers={"Retry-After": str(ceil(retry_after))},
+        )
+
+    async def prune(self) -> None:
+        await self.backend.prune(time() - RATE_LIMIT_PRUNE_AFTER)
+
+    def get_metrics(self) -> dict:
+        metrics = {
+            "backend": type(self.backend).__name__,
+            "backend_errors": self.backend_errors.value,
+            "allowed": {
+                name: counter.value for name, counter in self.allowed.items()
+            },
+            "rejected": {
+                name: counter.value for name, counter in self.rejected.items()
+            },
+        }
+        if isinstance(self.backend, MemoryBackend):
+            metrics["keys"] = len(self.backend)
+        return metrics
+
+    def __repr__(self) -> str:
+        return f"RateLimiter(backend={self.backend!r})"
+
+
+def get_client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def create_backend(name: str):
+    if name == "database":
+        return DatabaseBackend()
+    return MemoryBackend(RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = RateLimiter(create_backend(RATE_LIMIT_BACKEND))
+register_collector("rate_limit", rate_limiter.get_metrics)
@@ -0,0 +1,30 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import User
+from controller.src.user import create_user
+from controller.src.login import create_login
+from controller.src.dizimo_payment import create_dizimo_payment
+from controller.src.number import create_number_model
+from controller.validators.sign_validator import SignUpValidator
+from controller.errors.http.exceptions import bad_request
+
+
+async def signup_user(
+    sign_data: dict, session: AsyncSession, position: str | None = None
+) -> User:
+    SignUpValidator(sign_data)
+    # Hash before the first statement so bcrypt never runs while the
+    # session holds a pooled connection.
+    login = await create_login(sign_data)
+    user = await create_user(sign_data, session)
+    if position:
+        user.position = position
+        login.position = position
+    dizimo_payment = await create_dizimo_payment(user)
+    number_model = create_number_model(user.id, user.phone)
+    session.add_all([user, login, dizimo_payment, number_model])
+    try:
+        await session.flush()
+    except IntegrityError as error:
+        raise bad_request(f"User already exist: {error.orig!r}")
+    return user
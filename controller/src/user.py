@@ -1,6 +1,7 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from models import User
 from models import DizimoPayment
-from uuid import uuid4
+from controller.src.generate_uuid import generate_uuid7
 from datetime import datetime
 from controller.crud import CommunityCrud
 from models import Login
@@ -11,19 +12,31 @@ from controller.validators.cpf import CPFValidator
 from controller.validators.name import NameValidator
 from controller.validators.phone import PhoneValidator
 from controller.validators.password import PasswordValidator
-from controller.crud import LoginCrud
-from controller.auth.password import hash_pasword
+from controller.crud import LoginCrud, UserCrud
+from controller.crud.user import UserReference
+from controller.auth.password import hash_pasword_async
+from controller.auth import jwt
+from controller.errors.http.exceptions import not_found, unauthorized
 
 community_crud = CommunityCrud()
 login_crud = LoginCrud()
+user_crud = UserCrud()
 
 
-async def get_community_id(community_patron: str) -> str:
-    community = await community_crud.get_community_by_patron(community_patron)
+async def get_community_id(
+    community_patron: str, session: AsyncSession | None = None
+) -> str:
+    community = await community_crud.get_community_by_patron(
+        community_patron, session
+    )
+    if community is None:
+        not_found("Community not found")
     return community.id
 
 
-async def create_user(user_data: dict) -> User:
+async def create_user(
+    user_data: dict, session: AsyncSession | None = None
+) -> User:
     user = User()
     for key in user_data.keys():
         match key:
@@ -43,15 +56,49 @@ async def create_user(user_data: dict) -> User:
                 user.image = user_data["image"]
             case "community":
                 user_data["community"] = await get_community_id(
-                    user_data["community"]
+                    user_data["community"], session
                 )
                 user.community_id = user_data["community"]
             case "responsibility":
                 user.responsibility = user_data["responsibility"]
-    user.id = str(uuid4())
+    user.id = generate_uuid7()
     return user
 
 
+async def get_user_reference(user: dict) -> UserReference:
+    # Claims outlive the row they were issued from, so they are checked
+    # against the cached row: deleted, deactivated or moved users lose
+    # their access instead of keeping it until the token expires.
+    reference = await user_crud.get_user_reference_by_cpf(user["cpf"])
+    if (
+        reference is None
+        or not reference.active
+        or user.get("id") not in (None, reference.id)
+        or user.get("community_id") not in (None, reference.community_id)
+    ):
+        unauthorized("Token expired or invalid")
+    return reference
+
+
+async def create_user_access_token(
+    user: User,
+    community_patron: str | None = None,
+    session: AsyncSession | None = None,
+) -> str:
+    if community_patron is None:
+        community = await community_crud.get_community_by_id(
+            user.community_id, session
+        )
+        community_patron = community.patron
+    return jwt.create_access_token(
+        user.cpf,
+        user.position,
+        user_id=user.id,
+        community_id=user.community_id,
+        community_patron=community_patron,
+    )
+
+
 async def get_community_patron(community_id: str) -> str:
     community = await community_crud.get_community_by_id(community_id)
     return community.patron
@@ -154,7 +201,7 @@ async def get_update_data(user: User, update_data: dict) -> dict:
     if update_data.get("password"):
         PasswordValidator(update_data["password"])
         login = await login_crud.get_login_by_cpf(user.cpf)
-        login.password = hash_pasword(update_data["password"])
+        login.password = await hash_pasword_async(update_data["password"])
         login = {
             "id": login.id,
             "position": login.position,
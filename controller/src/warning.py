@@ -1,5 +1,5 @@
 from models import Warning
-from uuid import uuid4
+from controller.src.generate_uuid import generate_uuid7
 from datetime import datetime
 
 
@@ -17,7 +17,7 @@ async def create_warning(warning: dict) -> Warning:
                 new_warning.scope = warning["scope"]
             case "community_id":
                 new_warning.community_id = warning["community_id"]
-    new_warning.id = str(uuid4())
+    new_warning.id = generate_uuid7()
     new_warning.posted_at = datetime.now()
     return new_warning
 
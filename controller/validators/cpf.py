@@ -1,5 +1,19 @@
+import re
+from operator import mul
 from controller.errors.http.exceptions import bad_request
 
+CPF_PATTERN = re.compile(r"[0-9]{11}")
+FIRST_DIGIT_WEIGHTS = range(10, 1, -1)
+SECOND_DIGIT_WEIGHTS = range(11, 1, -1)
+# The checksums run over the raw ASCII codes, so take the "0" back out.
+FIRST_DIGIT_OFFSET = ord("0") * sum(FIRST_DIGIT_WEIGHTS)
+SECOND_DIGIT_OFFSET = ord("0") * sum(SECOND_DIGIT_WEIGHTS)
+
+ELEVEN_DIGITS_ERROR = "CPF don't has eleven digits"
+ONLY_DIGITS_ERROR = "Invalid CPF: CPF must have only digits"
+FIRST_DIGIT_ERROR = "Invalid CPF: First verificator digit is wrong"
+SECOND_DIGIT_ERROR = "Invalid CPF: Second verificator digit is wrong"
+
 
 class CPFValidator:
     def __init__(self, cpf: str):
@@ -10,7 +24,7 @@ class CPFValidator:
 
     def has_eleven_digits(self) -> None:
         if not (len(self.cpf) == 11):
-            raise bad_request("CPF don't has eleven digits")
+            raise bad_request(ELEVEN_DIGITS_ERROR)
 
     def verify_first_verificator_digit(self) -> None:
         sum = 0
@@ -23,7 +37,7 @@ class CPFValidator:
             digit_one = 0
 
         if int(self.cpf[9]) != digit_one:
-            raise bad_request("Invalid CPF: First verificator digit is wrong")
+            raise bad_request(FIRST_DIGIT_ERROR)
 
     def verify_second_verificator_digit(self) -> None:
         sum = 0
@@ -36,4 +50,31 @@ class CPFValidator:
             digit_two = 0
 
         if int(self.cpf[10]) != digit_two:
-            raise bad_request("Invalid CPF: Second verificator digit is wrong")
+            raise bad_request(SECOND_DIGIT_ERROR)
+
+
+def get_verificator_digit(digits: bytes, weights: range, offset: int) -> int:
+    digit = 11 - (sum(map(mul, digits, weights)) - offset) % 11
+    return 0 if digit > 9 else digit
+
+
+def validate_cpfs(cpfs: list[str]) -> list[str | None]:
+    errors = []
+    for cpf in cpfs:
+        if len(cpf) != 11:
+            errors.append(ELEVEN_DIGITS_ERROR)
+        elif not CPF_PATTERN.fullmatch(cpf):
+            errors.append(ONLY_DIGITS_ERROR)
+        else:
+            digits = cpf.encode("ascii")
+            if digits[9] - 48 != get_verificator_digit(
+                digits, FIRST_DIGIT_WEIGHTS, FIRST_DIGIT_OFFSET
+            ):
+                errors.append(FIRST_DIGIT_ERROR)
+            elif digits[10] - 48 != get_verificator_digit(
+                digits, SECOND_DIGIT_WEIGHTS, SECOND_DIGIT_OFFSET
+            ):
+                errors.append(SECOND_DIGIT_ERROR)
+            else:
+                errors.append(None)
+    return errors
@@ -1,6 +1,21 @@
+import re
 from datetime import datetime, date
 from controller.errors.http.exceptions import bad_request
 
+DATE_PATTERN = re.compile(r"([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})")
+
+FORMAT_ERROR = 'Invalid format of date, must be "%Y-%m-%d"'
+UNDERAGE_ERROR = "Your age is lower than 18"
+BIRTHDAY_ERROR = "Invalid birthday"
+
+
+def get_age(birthday: date, today: date) -> int:
+    return (
+        today.year
+        - birthday.year
+        - ((today.month, today.day) < (birthday.month, birthday.day))
+    )
+
 
 class DateValidator:
     def __init__(self, date: str):
@@ -12,17 +27,32 @@ class DateValidator:
         try:
             datetime.strptime(self.date, "%Y-%m-%d")
         except:
-            raise bad_request('Invalid format of date, must be "%Y-%m-%d"')
+            raise bad_request(FORMAT_ERROR)
 
     def is_actual_date(self) -> None:
         self.date = datetime.strptime(self.date, "%Y-%m-%d").date()
-        today = date.today()
-        age = (
-            today.year
-            - self.date.year
-            - ((today.month, today.day) < (self.date.month, self.date.day))
-        )
+        age = get_age(self.date, date.today())
         if age < 18:
-            raise bad_request("Your age is lower than 18")
+            raise bad_request(UNDERAGE_ERROR)
         if age > 120:
-            raise bad_request("Invalid birthday")
+            raise bad_request(BIRTHDAY_ERROR)
+
+
+def validate_birthdays(birthdays: list[str]) -> list[str | None]:
+    today = date.today()
+    errors = []
+    for birthday in birthdays:
+        match = DATE_PATTERN.fullmatch(birthday)
+        try:
+            birthday = date(*map(int, match.groups()))
+        except (AttributeError, ValueError):
+            errors.append(FORMAT_ERROR)
+            continue
+        age = get_age(birthday, today)
+        if age < 18:
+            errors.append(UNDERAGE_ERROR)
+        elif age > 120:
+            errors.append(BIRTHDAY_ERROR)
+        else:
+            errors.append(None)
+    return errors
@@ -1,6 +1,13 @@
 import re
 from controller.errors.http.exceptions import bad_request
 
+NUMBER_PATTERN = re.compile(r"[0-9]")
+SPECIAL_CHARACTER_PATTERN = re.compile(r'[!@#$%^&*(),.?|<>";]')
+
+NUMBER_ERROR = "Invalid name, name has number"
+SPECIAL_CHARACTER_ERROR = "Invalid name, name has special character"
+SHORT_NAME_ERROR = "This name is too short to be a name"
+
 
 class NameValidator:
     def __init__(self, name: str):
@@ -10,13 +17,27 @@ class NameValidator:
         self.is_sort_name()
 
     def has_number(self) -> None:
-        if re.search(r"[0-9]", self.name):
-            raise bad_request("Invalid name, name has number")
+        if NUMBER_PATTERN.search(self.name):
+            raise bad_request(NUMBER_ERROR)
 
     def has_special_character(self) -> None:
-        if re.search(r'[!@#$%^&*(),.?|<>";]', self.name):
-            raise bad_request("Invalid name, name has special character")
+        if SPECIAL_CHARACTER_PATTERN.search(self.name):
+            raise bad_request(SPECIAL_CHARACTER_ERROR)
 
     def is_sort_name(self) -> None:
         if len(self.name) < 3:
-            raise bad_request("This name is too short to be a name")
+            raise bad_request(SHORT_NAME_ERROR)
+
+
+def validate_names(names: list[str]) -> list[str | None]:
+    errors = []
+    for name in names:
+        if NUMBER_PATTERN.search(name):
+            errors.append(NUMBER_ERROR)
+        elif SPECIAL_CHARACTER_PATTERN.search(name):
+            errors.append(SPECIAL_CHARACTER_ERROR)
+        elif len(name) < 3:
+            errors.append(SHORT_NAME_ERROR)
+        else:
+            errors.append(None)
+    return errors
@@ -1,6 +1,16 @@
 import re
 from controller.errors.http.exceptions import bad_request
 
+UPPER_LETTER_PATTERN = re.compile(r"[A-Z]")
+SPECIAL_CHARACTER_PATTERN = re.compile(r'[!@#$%^&*(),.?":|<>;]')
+NUMBER_PATTERN = re.compile(r"[0-9]")
+
+MINIMUM_CHARACTERS_ERROR = "Password have to have a minimium of 8 characteres"
+SPACE_ERROR = "Password cannot have space"
+UPPER_LETTER_ERROR = "Password don't have upper case letter"
+NUMBER_ERROR = "Password don't have a number"
+SPECIAL_CHARACTER_ERROR = "Password don't have special caracter"
+
 
 class PasswordValidator:
     def __init__(self, password: str):
@@ -13,22 +23,38 @@ class PasswordValidator:
 
     def has_minimium_characters(self):
         if len(self.password) < 8:
-            raise bad_request(
-                "Password have to have a minimium of 8 characteres"
-            )
+            raise bad_request(MINIMUM_CHARACTERS_ERROR)
 
     def has_space(self):
         if " " in self.password:
-            raise bad_request("Password cannot have space")
+            raise bad_request(SPACE_ERROR)
 
     def has_upper_letter(self) -> None:
-        if not (re.search(r"[A-Z]", self.password)):
-            raise bad_request("Password don't have upper case letter")
+        if not (UPPER_LETTER_PATTERN.search(self.password)):
+            raise bad_request(UPPER_LETTER_ERROR)
 
     def has_special_character(self) -> None:
-        if not (re.search(r'[!@#$%^&*(),.?":|<>;]', self.password)):
-            raise bad_request("Password don't have special caracter")
+        if not (SPECIAL_CHARACTER_PATTERN.search(self.password)):
+            raise bad_request(SPECIAL_CHARACTER_ERROR)
 
     def has_number(self) -> None:
-        if not (re.search(r"[0-9]", self.password)):
-            raise bad_request("Password don't have a number")
+        if not (NUMBER_PATTERN.search(self.password)):
+            raise bad_request(NUMBER_ERROR)
+
+
+def validate_passwords(passwords: list[str]) -> list[str | None]:
+    errors = []
+    for password in passwords:
+        if len(password) < 8:
+            errors.append(MINIMUM_CHARACTERS_ERROR)
+        elif " " in password:
+            errors.append(SPACE_ERROR)
+        elif not UPPER_LETTER_PATTERN.search(password):
+            errors.append(UPPER_LETTER_ERROR)
+        elif not NUMBER_PATTERN.search(password):
+            errors.append(NUMBER_ERROR)
+        elif not SPECIAL_CHARACTER_PATTERN.search(password):
+            errors.append(SPECIAL_CHARACTER_ERROR)
+        else:
+            errors.append(None)
+    return errors
@@ -4,6 +4,20 @@ from phonenumbers import NumberParseException
 from controller.errors.http.exceptions import bad_request
 from typing import NoReturn
 
+PHONE_SEPARATORS_PATTERN = re.compile(r"[ \-\(\)]")
+PHONE_PATTERN = re.compile(r"^\+?\d{1,3}\d{6,14}$")
+
+
+def get_phone_error(phone: str) -> str | None:
+    cleaned_number = PHONE_SEPARATORS_PATTERN.sub("", phone)
+    if not PHONE_PATTERN.match(cleaned_number):
+        return f"Invalid phone format: {phone}"
+    try:
+        phonenumbers.parse(cleaned_number, None)
+    except NumberParseException as error:
+        return f"This is not a valid number: {error!r}"
+    return None
+
 
 class PhoneValidator:
     def __init__(self, phone: str):
@@ -11,12 +25,10 @@ class PhoneValidator:
         self.is_valid_phone_number()
 
     def is_valid_phone_number(self) -> NoReturn:
-        cleaned_number = re.sub(r"[ \-\(\)]", "", self.phone)
-        pattern = re.compile(r"^\+?\d{1,3}\d{6,14}$")
-        if not pattern.match(cleaned_number):
-            raise bad_request(f"Invalid phone format: {self.phone}")
-        try:
-            parsed_number = phonenumbers.parse(cleaned_number, None)
-            return phonenumbers.is_valid_number(parsed_number)
-        except NumberParseException as error:
-            raise bad_request(f"This is not a valid number: {error!r}")
+        error = get_phone_error(self.phone)
+        if error:
+            raise bad_request(error)
+
+
+def validate_phones(phones: list[str]) -> list[str | None]:
+    return [get_phone_error(phone) for phone in phones]
@@ -1,8 +1,19 @@
-from controller.validators.cpf import CPFValidator
-from controller.validators.date import DateValidator
-from controller.validators.password import PasswordValidator
-from controller.validators.name import NameValidator
-from controller.validators.phone import PhoneValidator
+from controller.validators.cpf import CPFValidator, validate_cpfs
+from controller.validators.date import DateValidator, validate_birthdays
+from controller.validators.password import (
+    PasswordValidator,
+    validate_passwords,
+)
+from controller.validators.name import NameValidator, validate_names
+from controller.validators.phone import PhoneValidator, validate_phones
+
+SIGN_UP_BATCH_VALIDATORS = (
+    ("cpf", validate_cpfs),
+    ("name", validate_names),
+    ("birthday", validate_birthdays),
+    ("password", validate_passwords),
+    ("phone", validate_phones),
+)
 
 
 class SignUpValidator:
@@ -18,3 +29,17 @@ class SignInValidator:
     def __int__(self, data: dict):
         CPFValidator(data["cpf"])
         PasswordValidator(data["password"])
+
+
+def validate_sign_ups(rows: list[dict]) -> list[str | None]:
+    errors = [None] * len(rows)
+    for field, validate in SIGN_UP_BATCH_VALIDATORS:
+        # Only rows that are still valid reach the next column, and each
+        # keeps the first error SignUpValidator would have raised.
+        pending = [index for index, error in enumerate(errors) if not error]
+        if not pending:
+            break
+        column = validate([rows[index][field] for index in pending])
+        for index, error in zip(pending, column):
+            errors[index] = error
+    return errors
@@ -1,2 +1,11 @@
-from database.db import Base, engine
-from database.session import session
+from database.db import Base, engine, read_engine
+from database.session import (
+    session,
+    read_session,
+    get_session,
+    unit_of_work,
+    get_read_sessionmaker,
+    is_unit_of_work,
+    REPLICA_MAX_STALENESS,
+)
+from database.lock import AdvisoryLock
@@ -1,17 +1,66 @@
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import DeclarativeBase
 from dotenv import load_dotenv
 from os import getenv
+from database.pool import TimedQueuePool, observe_pool
+from database.instrumentation import instrument_engine
+from controller.src.metrics import register_collector
 
 load_dotenv()
 
-engine = create_async_engine(
-    url = getenv("DATABASE_URL"),
-    echo = False,
-    pool_size = 5,
-    max_overflow = 10,
-    pool_pre_ping = True
+DATABASE_URL = getenv("DATABASE_URL")
+DATABASE_READ_URL = getenv("DATABASE_READ_URL")
+DB_POOL_SIZE = int(getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(getenv("DB_POOL_RECYCLE", -1))
+DB_POOL_PRE_PING = getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(getenv("DB_STATEMENT_CACHE_SIZE", 100))
+
+
+def get_connect_args(url: str) -> dict:
+    if make_url(url).get_driver_name() != "asyncpg":
+        return {}
+    return {
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    }
+
+
+def create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url=url,
+        echo=False,
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=get_connect_args(url),
+    )
+
+
+engine = create_engine(DATABASE_URL)
+
+# Without a replica every read goes to the primary.
+read_engine = create_engine(DATABASE_READ_URL) if DATABASE_READ_URL else engine
+
+instrument_engine(engine)
+if read_engine is not engine:
+    instrument_engine(read_engine)
+
+POOL_CAPACITY = DB_POOL_SIZE + max(DB_MAX_OVERFLOW, 0)
+
+register_collector(
+    "database_pool", observe_pool(engine.pool, POOL_CAPACITY).snapshot
 )
+if read_engine is not engine:
+    register_collector(
+        "database_read_pool",
+        observe_pool(read_engine.pool, POOL_CAPACITY).snapshot,
+    )
 
 
 class Base(DeclarativeBase):
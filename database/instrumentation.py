@@ -0,0 +1,215 @@
+import logging
+from collections import Counter as StatementCounter
+from contextvars import ContextVar
+from time import perf_counter
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from dotenv import load_dotenv
+from os import getenv
+from controller.src.metrics import Counter, Histogram, register_collector
+
+load_dotenv()
+
+SLOW_QUERY_SECONDS = float(getenv("SLOW_QUERY_SECONDS", 0.5))
+N_PLUS_ONE_THRESHOLD = int(getenv("N_PLUS_ONE_THRESHOLD", 10))
+MAX_TRACKED_STATEMENTS = int(getenv("MAX_TRACKED_STATEMENTS", 200))
+
+BACKGROUND_ROUTE = "background"
+UNMATCHED_ROUTE = "unmatched"
+OTHER_STATEMENTS = "other"
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    def __init__(self, scope: dict) -> None:
+        self.scope = scope
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.statements = StatementCounter()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        if route is None:
+            return UNMATCHED_ROUTE
+        return f"{self.scope['method']} {route.path}"
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.query_seconds += elapsed
+        self.statements[statement] += 1
+
+    def get_repeated_statements(self) -> list[tuple[str, int]]:
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= N_PLUS_ONE_THRESHOLD
+        ]
+
+    def __repr__(self) -> str:
+        return (
+            f"RequestStats(route={self.route!r}, queries={self.query_count!r})"
+        )
+
+
+class StatementMetrics:
+    def __init__(self) -> None:
+        self.latency = Histogram()
+        self.rows = Histogram(ROW_BUCKETS)
+        self.routes = set()
+
+    def snapshot(self) -> dict:
+        return {
+            "latency_seconds": self.latency.snapshot(),
+            "rows": self.rows.snapshot(),
+            "routes": sorted(self.routes),
+        }
+
+
+class RouteMetrics:
+    def __init__(self) -> None:
+        self.queries_per_request = Histogram(QUERY_COUNT_BUCKETS)
+        self.query_seconds_per_request = Histogram()
+        self.n_plus_one = Counter()
+
+    def snapshot(self) -> dict:
+        return {
+            "queries_per_request": self.queries_per_request.snapshot(),
+            "query_seconds_per_request": (
+                self.query_seconds_per_request.snapshot()
+            ),
+            "n_plus_one": self.n_plus_one.value,
+        }
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar(
+    "request_stats", default=None
+)
+statement_metrics: dict[str, StatementMetrics] = {}
+route_metrics: dict[str, RouteMetrics] = {}
+slow_queries = Counter()
+
+
+def normalize_statement(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def redact_parameters(parameters):
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) for value in parameters]
+    return type(parameters).__name__
+
+
+def get_statement_metrics(statement: str) -> StatementMetrics:
+    metrics = statement_metrics.get(statement)
+    if metrics is not None:
+        return metrics
+    # Statements are already parameterized, but keep the registry bounded in
+    # case something builds SQL text dynamically.
+    if len(statement_metrics) >= MAX_TRACKED_STATEMENTS:
+        statement = OTHER_STATEMENTS
+    return statement_metrics.setdefault(statement, StatementMetrics())
+
+
+def get_route_metrics(route: str) -> RouteMetrics:
+    return route_metrics.setdefault(route, RouteMetrics())
+
+
+def count_rows(cursor, context) -> int | None:
+    if cursor.rowcount >= 0:
+        return cursor.rowcount
+    # Streamed results are still on the server when the statement returns.
+    if context.execution_options.get("stream_results"):
+        return None
+    rows = getattr(cursor, "_rows", None)
+    return len(rows) if rows is not None else None
+
+
+def before_cursor_execute(
+    connection, cursor, statement, parameters, context, executemany
+) -> None:
+    connection.info.setdefault("query_start", []).append(perf_counter())
+
+
+def after_cursor_execute(
+    connection, cursor, statement, parameters, context, executemany
+) -> None:
+    elapsed = perf_counter() - connection.info["query_start"].pop()
+    statement = normalize_statement(statement)
+    stats = request_stats.get()
+    route = stats.route if stats is not None else BACKGROUND_ROUTE
+    rows = count_rows(cursor, context)
+
+    metrics = get_statement_metrics(statement)
+    metrics.latency.observe(elapsed)
+    if rows is not None:
+        metrics.rows.observe(rows)
+    metrics.routes.add(route)
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed >= SLOW_QUERY_SECONDS:
+        slow_queries.inc()
+        logger.warning(
+            "slow query %.3fs route=%s rows=%s statement=%s parameters=%s",
+            elapsed,
+            route,
+            rows,
+            statement,
+            redact_parameters(parameters),
+        )
+
+
+def handle_error(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is None:
+        return
+    query_start = connection.info.get("query_start")
+    if query_start:
+        query_start.pop()
+
+
+def finish_request(stats: RequestStats) -> None:
+    route = stats.route
+    metrics = get_route_metrics(route)
+    metrics.queries_per_request.observe(stats.query_count)
+    metrics.query_seconds_per_request.observe(stats.query_seconds)
+    repeated = stats.get_repeated_statements()
+    if repeated:
+        metrics.n_plus_one.inc()
+    for statement, count in repeated:
+        logger.warning(
+            "possible N+1 route=%s count=%s statement=%s",
+            route,
+            count,
+            statement,
+        )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(sync_engine, "handle_error", handle_error)
+
+
+def get_sql_metrics() -> dict:
+    return {
+        "slow_queries": slow_queries.value,
+        "statements": {
+            statement: metrics.snapshot()
+            for statement, metrics in statement_metrics.items()
+        },
+        "routes": {
+            route: metrics.snapshot()
+            for route, metrics in route_metrics.items()
+        },
+    }
+
+
+register_collector("sql", get_sql_metrics)
@@ -0,0 +1,58 @@
+import logging
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+
+class AdvisoryLock:
+    def __init__(self, engine: AsyncEngine, lock_id: int) -> None:
+        self.engine = engine
+        self.lock_id = lock_id
+        self.connection: AsyncConnection | None = None
+
+    async def acquire(self) -> bool:
+        # Only PostgreSQL can share the lock between processes; anywhere
+        # else the process is on its own and always holds it.
+        if self.engine.dialect.name != "postgresql":
+            return True
+        if self.connection is not None:
+            try:
+                await self.connection.execute(text("SELECT 1"))
+                return True
+            except Exception as error:
+                # The lock went away with the server session.
+                logger.warning(
+                    "advisory lock %s lost: %r", self.lock_id, error
+                )
+                await self.release()
+        connection = await self.engine.connect()
+        try:
+            # A session-level lock outlives transactions, so the connection
+            # does not sit idle in one while it holds the lock.
+            await connection.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await connection.scalar(
+                select(func.pg_try_advisory_lock(self.lock_id))
+            )
+        except Exception:
+            await connection.close()
+            raise
+        if not acquired:
+            await connection.close()
+            return False
+        self.connection = connection
+        return True
+
+    async def release(self) -> None:
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        # Dropping the connection ends the server session and its lock,
+        # instead of returning a locked session to the pool.
+        try:
+            await connection.invalidate()
+        finally:
+            await connection.close()
+
+    def __repr__(self) -> str:
+        return f"AdvisoryLock(lock_id={self.lock_id!r})"
@@ -0,0 +1,74 @@
+from time import perf_counter
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+from controller.src.metrics import Counter, Histogram
+
+CHECKED_OUT_AT = "checked_out_at"
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # The pool emits no event while a caller waits for a connection, so
+    # connect() itself is timed: queueing, pre-ping and opening included.
+    checkout_wait: Histogram | None = None
+
+    def connect(self):
+        started = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            if self.checkout_wait is not None:
+                self.checkout_wait.observe(perf_counter() - started)
+
+    def recreate(self) -> "TimedQueuePool":
+        pool = super().recreate()
+        pool.checkout_wait = self.checkout_wait
+        return pool
+
+
+class PoolMetrics:
+    def __init__(self, pool: Pool, capacity: int) -> None:
+        self.pool = pool
+        self.capacity = capacity
+        self.checkouts = Counter()
+        self.saturated_checkouts = Counter()
+        self.checkout_hold = Histogram()
+        self.checkout_wait = Histogram()
+
+    def checkout(self, dbapi_connection, connection_record, proxy) -> None:
+        self.checkouts.inc()
+        connection_record.info[CHECKED_OUT_AT] = perf_counter()
+        # The pool emits no event while a caller waits for a connection, so
+        # count the checkouts that took the last free one: every checkout
+        # after them waits until a connection comes back.
+        if self.pool.checkedout() >= self.capacity:
+            self.saturated_checkouts.inc()
+
+    def checkin(self, dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop(CHECKED_OUT_AT, None)
+        if checked_out_at is not None:
+            self.checkout_hold.observe(perf_counter() - checked_out_at)
+
+    def snapshot(self) -> dict:
+        return {
+            "size": self.pool.size(),
+            "checked_out": self.pool.checkedout(),
+            "idle": self.pool.checkedin(),
+            "overflow": max(self.pool.overflow(), 0),
+            "capacity": self.capacity,
+            "checkouts": self.checkouts.value,
+            "saturated_checkouts": self.saturated_checkouts.value,
+            "checkout_hold_seconds": self.checkout_hold.snapshot(),
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+        }
+
+    def __repr__(self) -> str:
+        return f"PoolMetrics(capacity={self.capacity!r})"
+
+
+def observe_pool(pool: Pool, capacity: int) -> PoolMetrics:
+    metrics = PoolMetrics(pool, capacity)
+    event.listen(pool, "checkout", metrics.checkout)
+    event.listen(pool, "checkin", metrics.checkin)
+    if isinstance(pool, TimedQueuePool):
+        pool.checkout_wait = metrics.checkout_wait
+    return metrics
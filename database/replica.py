@@ -0,0 +1,58 @@
+from asyncio import Lock
+from time import monotonic
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from dotenv import load_dotenv
+from os import getenv
+from controller.src.metrics import Counter
+
+load_dotenv()
+
+REPLICA_LAG_CHECK_INTERVAL = float(getenv("REPLICA_LAG_CHECK_INTERVAL", 5))
+
+# A replica that already replayed everything it received is not behind,
+# even if the primary has been idle since its last transaction.
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE("
+    "EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0"
+    ") END"
+)
+
+
+class ReplicaLag:
+    def __init__(self, engine: AsyncEngine, interval: float) -> None:
+        self.engine = engine
+        self.interval = interval
+        self.seconds = 0.0
+        self.checked_at = float("-inf")
+        self.lock = Lock()
+        self.check_errors = Counter()
+
+    def is_fresh(self) -> bool:
+        return monotonic() - self.checked_at < self.interval
+
+    async def get_seconds(self) -> float:
+        if self.is_fresh():
+            return self.seconds
+        async with self.lock:
+            if not self.is_fresh():
+                self.seconds = await self.measure()
+                self.checked_at = monotonic()
+        return self.seconds
+
+    async def measure(self) -> float:
+        if self.engine.dialect.name != "postgresql":
+            return 0.0
+        try:
+            async with self.engine.connect() as connection:
+                return float(await connection.scalar(REPLICA_LAG_QUERY))
+        except Exception:
+            # An unreachable replica is treated as infinitely behind, so
+            # every read falls back to the primary until the next check.
+            self.check_errors.inc()
+            return float("inf")
+
+    def __repr__(self) -> str:
+        return f"ReplicaLag(seconds={self.seconds!r})"
@@ -1,4 +1,66 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker
-from database.db import engine
+from contextlib import asynccontextmanager
+from math import isfinite
+from typing import AsyncIterator
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from dotenv import load_dotenv
+from os import getenv
+from database.db import engine, read_engine
+from database.replica import ReplicaLag, REPLICA_LAG_CHECK_INTERVAL
+from controller.src.metrics import Counter, register_collector
+
+load_dotenv()
+
+UNIT_OF_WORK = "unit_of_work"
+REPLICA_MAX_STALENESS = float(getenv("REPLICA_MAX_STALENESS", 5))
 
 session = async_sessionmaker(bind=engine, expire_on_commit=False)
+read_session = async_sessionmaker(bind=read_engine, expire_on_commit=False)
+
+replica_lag = ReplicaLag(read_engine, REPLICA_LAG_CHECK_INTERVAL)
+replica_reads = Counter()
+primary_reads = Counter()
+
+
+def is_unit_of_work(session: AsyncSession) -> bool:
+    return session.info.get(UNIT_OF_WORK, False)
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    async with session() as request_session:
+        request_session.info[UNIT_OF_WORK] = True
+        try:
+            yield request_session
+            await request_session.commit()
+        except Exception:
+            await request_session.rollback()
+            raise
+
+
+unit_of_work = asynccontextmanager(get_session)
+
+
+async def get_read_sessionmaker(
+    max_staleness: float = REPLICA_MAX_STALENESS,
+) -> async_sessionmaker:
+    if read_engine is engine or max_staleness <= 0:
+        primary_reads.inc()
+        return session
+    if await replica_lag.get_seconds() > max_staleness:
+        primary_reads.inc()
+        return session
+    replica_reads.inc()
+    return read_session
+
+
+def get_replica_metrics() -> dict:
+    lag = replica_lag.seconds
+    return {
+        "lag_seconds": lag if isfinite(lag) else None,
+        "lag_check_errors": replica_lag.check_errors.value,
+        "replica_reads": replica_reads.value,
+        "primary_reads": primary_reads.value,
+    }
+
+
+if read_engine is not engine:
+    register_collector("database_replica", get_replica_metrics)
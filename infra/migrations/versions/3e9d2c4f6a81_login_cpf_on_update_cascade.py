@@ -0,0 +1,37 @@
+"""login cpf on update cascade
+
+Revision ID: 3e9d2c4f6a81
+Revises: 5c1f0e7a9b2d
+Create Date: 2026-10-18 16:40:27.118904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3e9d2c4f6a81"
+down_revision: Union[str, None] = "5c1f0e7a9b2d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint("logins_cpf_fkey", "logins", type_="foreignkey")
+    op.create_foreign_key(
+        "logins_cpf_fkey",
+        "logins",
+        "users",
+        ["cpf"],
+        ["cpf"],
+        onupdate="CASCADE",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("logins_cpf_fkey", "logins", type_="foreignkey")
+    op.create_foreign_key(
+        "logins_cpf_fkey", "logins", "users", ["cpf"], ["cpf"]
+    )
@@ -0,0 +1,37 @@
+"""rate limits
+
+Revision ID: 5c1f0e7a9b2d
+Revises: 8aa4baca1440
+Create Date: 2026-10-18 14:02:11.507316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1f0e7a9b2d"
+down_revision: Union[str, None] = "8aa4baca1440"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limits",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        "ix_rate_limits_updated_at", "rate_limits", ["updated_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rate_limits_updated_at", table_name="rate_limits")
+    op.drop_table("rate_limits")
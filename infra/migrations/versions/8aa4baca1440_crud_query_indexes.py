@@ -0,0 +1,96 @@
+"""crud query indexes
+
+Revision ID: 8aa4baca1440
+Revises: 028c3b948a88
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8aa4baca1440"
+down_revision: Union[str, None] = "028c3b948a88"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps the tables writable while the indexes are built,
+    # it can't run inside the migration transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_payments_user_id_year_month",
+            "payments",
+            ["user_id", "year", "month"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_finances_community_id_date",
+            "finances",
+            ["community_id", "date"],
+            postgresql_include=["type", "value", "title"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_warnings_community_id_posted_at",
+            "warnings",
+            ["community_id", "posted_at"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_web_push_user_id",
+            "web_push",
+            ["user_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_community_id_position",
+            "users",
+            ["community_id", "position"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_numbers_user_id",
+            "numbers",
+            ["user_id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_numbers_user_id",
+            table_name="numbers",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_users_community_id_position",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_web_push_user_id",
+            table_name="web_push",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_warnings_community_id_posted_at",
+            table_name="warnings",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_finances_community_id_date",
+            table_name="finances",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_payments_user_id_year_month",
+            table_name="payments",
+            postgresql_concurrently=True,
+        )
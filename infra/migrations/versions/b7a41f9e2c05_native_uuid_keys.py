@@ -0,0 +1,98 @@
+"""native uuid keys
+
+Revision ID: b7a41f9e2c05
+Revises: 3e9d2c4f6a81
+Create Date: 2026-10-18 18:12:45.630172
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7a41f9e2c05"
+down_revision: Union[str, None] = "3e9d2c4f6a81"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FOREIGN_KEYS = (
+    ("users_community_id_fkey", "users", "community_id", "communities"),
+    ("warnings_community_id_fkey", "warnings", "community_id", "communities"),
+    ("finances_community_id_fkey", "finances", "community_id", "communities"),
+    (
+        "finance_resumes_community_id_fkey",
+        "finance_resumes",
+        "community_id",
+        "communities",
+    ),
+    (
+        "finance_resumes_last_month_id_fkey",
+        "finance_resumes",
+        "last_month_id",
+        "finances",
+    ),
+    ("numbers_user_id_fkey", "numbers", "user_id", "users"),
+    ("payments_user_id_fkey", "payments", "user_id", "users"),
+    ("web_push_user_id_fkey", "web_push", "user_id", "users"),
+)
+
+COLUMNS = (
+    ("communities", "id"),
+    ("images", "id"),
+    ("finances", "id"),
+    ("users", "id"),
+    ("warnings", "id"),
+    ("logins", "id"),
+    ("numbers", "id"),
+    ("payments", "id"),
+    ("web_push", "id"),
+    ("users", "community_id"),
+    ("warnings", "community_id"),
+    ("finances", "community_id"),
+    ("finance_resumes", "community_id"),
+    ("finance_resumes", "last_month_id"),
+    ("numbers", "user_id"),
+    ("payments", "user_id"),
+    ("web_push", "user_id"),
+)
+
+
+def drop_foreign_keys() -> None:
+    for name, table, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(name, table, type_="foreignkey")
+
+
+def create_foreign_keys() -> None:
+    for name, table, column, referent in FOREIGN_KEYS:
+        op.create_foreign_key(name, table, referent, [column], ["id"])
+
+
+def upgrade() -> None:
+    # Existing keys are uuid4 text, so they cast as is. Every column is
+    # rewritten, so run this in a maintenance window on large tables.
+    drop_foreign_keys()
+    for table, column in COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Uuid(),
+            existing_type=sa.String(),
+            postgresql_using=f"{column}::uuid",
+        )
+    create_foreign_keys()
+
+
+def downgrade() -> None:
+    drop_foreign_keys()
+    for table, column in COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.String(),
+            existing_type=sa.Uuid(),
+            postgresql_using=f"{column}::text",
+        )
+    create_foreign_keys()
@@ -3,6 +3,8 @@ import uuid
 from controller.auth.firebase import initialize_firebase
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_session
 import router.user
 import router.community
 import router.login
@@ -12,25 +14,23 @@ import router.web.web_push_notification
 import router.image
 import router.sms
 import router.finance
-from controller.auth import jwt
+import router.metrics
+import router.pix
 from controller.src.pix_payment import (
     make_post_pix_request,
     create_customer,
     PixPayment,
+    pix_client,
 )
 from models.community import Community
 from controller.crud.community import CommunityCrud
 from controller.crud.user import UserCrud
 from models.user import User
 from schemas.sign import SignUp
-from controller.errors.http.exceptions import (
-    internal_server_error,
-    bad_request,
-)
-from controller.validators.sign_validator import SignUpValidator
-from controller.crud.login import LoginCrud
-from controller.src.login import create_login
-from controller.src.user import create_user
+from controller.src.signup import signup_user
+from controller.src.generate_uuid import generate_uuid7
+from controller.auth.password import password_hasher
+from controller.src.user import create_user_access_token
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from contextlib import asynccontextmanager
 from apscheduler.triggers.cron import CronTrigger
@@ -39,6 +39,7 @@ from controller.jobs.dizimo_payment import (
 )
 from controller.crud.dizimo_payment import DizimoPaymentCrud
 from router.middleware.authorization import verify_user_access_token
+from router.middleware.query_stats import track_query_stats
 from controller.src.dizimo_payment import (
     is_valid_payment_status,
     test_create_dizimo_payment,
@@ -49,10 +50,12 @@ from controller.src.web_push_notification import (
 )
 from controller.crud.web_push import WebPushCrud
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from controller.src.rate_limit import rate_limiter
+from controller.jobs.pix_poller import pix_poller
 from controller.jobs.web_push_notification import execute_notification
 from controller.jobs.finance import calc_community_available_money
 
-login_crud = LoginCrud()
 community_crud = CommunityCrud()
 user_crud = UserCrud()
 dizimo_payment_crud = DizimoPaymentCrud()
@@ -74,9 +77,16 @@ async def event_manager(app: FastAPI):
             calc_community_available_money,
             trigger=CronTrigger(day=1, hour=0, minute=0, second=0),
         )
+        scheduler.add_job(
+            rate_limiter.prune, trigger=IntervalTrigger(minutes=10)
+        )
+        await pix_poller.start()
         yield
     finally:
+        await pix_poller.stop()
         scheduler.shutdown()
+        password_hasher.shutdown()
+        await pix_client.close()
 
 
 app = FastAPI(lifespan=event_manager)
@@ -87,6 +97,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(track_query_stats)
 
 app.include_router(router.user.router)
 app.include_router(router.community.router)
@@ -97,6 +108,8 @@ app.include_router(router.web.web_push_notification.router)
 app.include_router(router.image.router)
 app.include_router(router.sms.router)
 app.include_router(router.finance.router)
+app.include_router(router.metrics.router)
+app.include_router(router.pix.router)
 
 
 @app.get("/communities")
@@ -112,7 +125,7 @@ async def get_all_pay():
 @app.post("/community/root")
 async def create_community():
     a = Community()
-    a.id = str(uuid.uuid4())
+    a.id = generate_uuid7()
     a.name = "community"
     a.email = "a@gmail.com"
     a.image = None
@@ -123,49 +136,29 @@ async def create_community():
 
 
 @app.post("/council")
-async def signup(sign_data: SignUp):
-    sign_data = dict(sign_data)
-    SignUpValidator(sign_data)
-    user = await create_user(sign_data)
-    user.position = "council member"
-    login = create_login(sign_data)
-    login.position = "council member"
-    try:
-        await user_crud.create_user(user)
-        try:
-            await login_crud.create_login(login)
-        except:
-            await user_crud.delete_user(user)
-            raise internal_server_error("Database failed to create user")
-    except:
-        raise bad_request("User already exist")
+async def signup(
+    sign_data: SignUp, session: AsyncSession = Depends(get_session)
+):
+    user = await signup_user(
+        dict(sign_data), session, position="council member"
+    )
     return {
-        "access_token": jwt.create_access_token(
-            user.cpf, position="council member"
+        "access_token": await create_user_access_token(
+            user, sign_data.community
         )
     }
 
 
 @app.post("/parish")
-async def signup(sign_data: SignUp):
-    sign_data = dict(sign_data)
-    SignUpValidator(sign_data)
-    user = await create_user(sign_data)
-    user.position = "parish leader"
-    login = create_login(sign_data)
-    login.position = "parish leader"
-    try:
-        await user_crud.create_user(user)
-        try:
-            await login_crud.create_login(login)
-        except:
-            await user_crud.delete_user(user)
-            raise internal_server_error("Database failed to create user")
-    except:
-        raise bad_request("User already exist")
+async def signup(
+    sign_data: SignUp, session: AsyncSession = Depends(get_session)
+):
+    user = await signup_user(
+        dict(sign_data), session, position="parish leader"
+    )
     return {
-        "access_token": jwt.create_access_token(
-            user.cpf, position="parish leader"
+        "access_token": await create_user_access_token(
+            user, sign_data.community
         )
     }
 
@@ -204,7 +197,7 @@ async def create_payment_router(
         customer=create_customer(user),
         correlationID=str(uuid.uuid4()),
     )
-    pix_payment = make_post_pix_request(pix_payment)
+    pix_payment = await make_post_pix_request(pix_payment)
     dizimo = complete_dizimo_payment(dizimo, pix_payment)
     return await dizimo_payment_crud.create_payment(dizimo)
 
@@ -7,3 +7,4 @@ from models.login import Login
 from models.finance import Finance
 from models.image import Image
 from models.number import Number
+from models.rate_limit import RateLimit
@@ -1,14 +1,16 @@
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import String, LargeBinary, Boolean, ForeignKey, Float
+from sqlalchemy import String, LargeBinary, Boolean, ForeignKey, Float, Uuid
 from database import Base
 from models.warning import Warning
-from controller.src.generate_uuid import generate_uuid4
+from controller.src.generate_uuid import generate_uuid7
 
 
 class Community(Base):
     __tablename__ = "communities"
 
-    id = mapped_column(String, primary_key=True, default=generate_uuid4)
+    id = mapped_column(
+        Uuid(as_uuid=False), primary_key=True, default=generate_uuid7
+    )
     patron = mapped_column(String, unique=True)
     location = mapped_column(String)
     email = mapped_column(String, unique=True)
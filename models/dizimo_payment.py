@@ -1,19 +1,32 @@
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import String, DateTime, Float, ForeignKey, Integer
+from sqlalchemy import (
+    String,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    Index,
+    Uuid,
+)
 from database import Base
-from controller.src.generate_uuid import generate_uuid4
+from controller.src.generate_uuid import generate_uuid7
 
 
 class DizimoPayment(Base):
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_user_id_year_month", "user_id", "year", "month"),
+    )
 
-    id = mapped_column(String, primary_key=True, default=generate_uuid4)
+    id = mapped_column(
+        Uuid(as_uuid=False), primary_key=True, default=generate_uuid7
+    )
     correlation_id = mapped_column(String, nullable=True, unique=True)
     date = mapped_column(DateTime, nullable=True)
     month = mapped_column(String)
     year = mapped_column(Integer)
     value = mapped_column(Float, nullable=True)
     status = mapped_column(String)
-    user_id = mapped_column(String, ForeignKey("users.id"))
+    user_id = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"))
 
     user = relationship("User", back_populates="dizimo_payments")
@@ -1,15 +1,27 @@
 from sqlalchemy.orm import mapped_column
-from sqlalchemy import String, ForeignKey, DateTime, Float
+from sqlalchemy import String, ForeignKey, DateTime, Float, Index, Uuid
 from database import Base
-from controller.src.generate_uuid import generate_uuid4
+from controller.src.generate_uuid import generate_uuid7
 from datetime import datetime
 
 
 class Finance(Base):
     __tablename__ = "finances"
+    __table_args__ = (
+        Index(
+            "ix_finances_community_id_date",
+            "community_id",
+            "date",
+            postgresql_include=["type", "value", "title"],
+        ),
+    )
 
-    id = mapped_column(String, primary_key=True, default=generate_uuid4)
-    community_id = mapped_column(String, ForeignKey("communities.id"))
+    id = mapped_column(
+        Uuid(as_uuid=False), primary_key=True, default=generate_uuid7
+    )
+    community_id = mapped_column(
+        Uuid(as_uuid=False), ForeignKey("communities.id")
+    )
     title = mapped_column(String)
     description = mapped_column(String, nullable=True)
     date = mapped_column(DateTime(timezone=True), default=datetime.now)
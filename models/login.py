@@ -1,13 +1,19 @@
-from sqlalchemy.orm import mapped_column
-from sqlalchemy import String, ForeignKey
+from sqlalchemy.orm import mapped_column, relationship
+from sqlalchemy import String, ForeignKey, Uuid
 from database import Base
-from controller.src.generate_uuid import generate_uuid4
+from controller.src.generate_uuid import generate_uuid7
 
 
 class Login(Base):
     __tablename__ = "logins"
 
-    id = mapped_column(String, primary_key=True, default=generate_uuid4)
-    cpf = mapped_column(String, ForeignKey("users.cpf"), unique=True)
+    id = mapped_column(
+        Uuid(as_uuid=False), primary_key=True, default=generate_uuid7
+    )
+    cpf = mapped_column(
+        String, ForeignKey("users.cpf", onupdate="CASCADE"), unique=True
+    )
     password = mapped_column(String)
     position = mapped_column(String, default="user")
+
+    user = relationship("User")
@@ -1,14 +1,17 @@
 from database.db import Base
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import String, Integer, Boolean, ForeignKey
-from controller.src.generate_uuid import generate_uuid4
+from sqlalchemy import String, Integer, Boolean, ForeignKey, Index, Uuid
+from controller.src.generate_uuid import generate_uuid7
 
 
 class Number(Base):
     __tablename__ = "numbers"
+    __table_args__ = (Index("ix_numbers_user_id", "user_id"),)
 
-    id = mapped_column(String, default=generate_uuid4, primary_key=True)
-    user_id = mapped_column(String, ForeignKey("users.id"))
+    id = mapped_column(
+        Uuid(as_uuid=False), primary_key=True, default=generate_uuid7
+    )
+    user_id = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"))
     number = mapped_column(String, unique=True)
     verification_code = mapped_column(Integer, nullable=True)
     valid = mapped_column(Boolean, default=False)
@@ -0,0 +1,12 @@
+from sqlalchemy.orm import mapped_column
+from sqlalchemy import String, Float, Index
+from database import Base
+
+
+class RateLimit(Base):
+    __tablename__ = "rate_limits"
+    __table_args__ = (Index("ix_rate_limits_updated_at", "updated_at"),)
+
+    key = mapped_column(String, primary_key=True)
+    tokens = mapped_column(Float, nullable=False)
+    updated_at = mapped_column(Float, nullable=False)
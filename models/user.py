@@ -1,14 +1,27 @@
 from sqlalchemy.orm import mapped_column, relationship
-from sqlalchemy import String, Date, LargeBinary, ForeignKey, Boolean
+from sqlalchemy import (
+    String,
+    Date,
+    LargeBinary,
+    ForeignKey,
+    Boolean,
+    Index,
+    Uuid,
+)
 from database import Base
-from controller.src.generate_uuid import generate_uuid4
+from controller.src.generate_uuid import generate_uuid7
 from models.web_push import WebPush
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_community_id_position", "community_id", "position"),
+    )
 
-    id = mapped_column(String, primary_key=True, default=generate_uuid4)
+    id = mapped_column(
+        Uuid(as_uuid=False), primary_key=True, default=generate_uuid7
+    )
     cpf = mapped_column(String, unique=True)
     name = mapped_column(String)
     birthday = mapped_column(Date)
@@ -16,7 +29,9 @@ class User(Base):
     position = mapped_column(String, default="user")
     image = mapped_column(String, nullable=True)
     active = mapped_column(Boolean, default=True)
-    community_id = mapped_column(String, ForeignKey("communities.id"))
+    community_id = mapped_column(
+        Uuid(as_uuid=False), ForeignKey("communities.id")
+    )
     responsibility = mapped_column(String, default="faithful")
 
     dizimo_payments = relationship("DizimoPayment", back_populates="user")
@@ -1,18 +1,35 @@
 from sqlalchemy.orm import mapped_column
-from sqlalchemy import String, Text, ForeignKey, DateTime, LargeBinary
+from sqlalchemy import (
+    String,
+    Text,
+    ForeignKey,
+    DateTime,
+    LargeBinary,
+    Index,
+    Uuid,
+)
 from datetime import datetime, timezone
 from database import Base
-from controller.src.generate_uuid import generate_uuid4
+from controller.src.generate_uuid import generate_uuid7
 
 
 class Warning(Base):
     __tablename__ = "warnings"
+    __table_args__ = (
+        Index(
+            "ix_warnings_community_id_posted_at", "community_id", "posted_at"
+        ),
+    )
 
-    id = mapped_column(String, primary_key=True, default=generate_uuid4)
+    id = mapped_column(
+        Uuid(as_uuid=False), primary_key=True, default=generate_uuid7
+    )
     scope = mapped_column(String)
     title = mapped_column(String)
     description = mapped_column(Text)
     posted_at = mapped_column(DateTime, default=datetime.now)
     edited_at = mapped_column(DateTime, nullable=True)
-    community_id = mapped_column(String, ForeignKey("communities.id"))
+    community_id = mapped_column(
+        Uuid(as_uuid=False), ForeignKey("communities.id")
+    )
     image = mapped_column(LargeBinary, nullable=True)
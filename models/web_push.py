@@ -1,14 +1,17 @@
 from database import Base
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index, Uuid
 from sqlalchemy.orm import mapped_column, relationship
-from controller.src.generate_uuid import generate_uuid4
+from controller.src.generate_uuid import generate_uuid7
 
 
 class WebPush(Base):
     __tablename__ = "web_push"
+    __table_args__ = (Index("ix_web_push_user_id", "user_id"),)
 
-    id = mapped_column(String, primary_key=True, default=generate_uuid4)
+    id = mapped_column(
+        Uuid(as_uuid=False), primary_key=True, default=generate_uuid7
+    )
     token = mapped_column(String)
-    user_id = mapped_column(String, ForeignKey("users.id"))
+    user_id = mapped_column(Uuid(as_uuid=False), ForeignKey("users.id"))
 
     user = relationship("User", back_populates="web_push")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Request
 from controller.crud import CommunityCrud
 from fastapi.responses import StreamingResponse
 from controller.src.community import (
@@ -10,7 +10,9 @@ from controller.src.community import (
     get_users_friendly_data,
     get_community_list,
     get_community_patron,
+    get_scoped_community_id,
 )
+from controller.src.member_import import import_members
 from router.middleware.authorization import verify_user_access_token
 from schemas.community import CreateCommunityModel, UpdateCommunityModel
 from controller.src.user import (
@@ -18,6 +20,7 @@ from controller.src.user import (
     is_council_member,
     get_user_name_and_responsability,
     get_user_name_and_responsability_and_cpf,
+    get_user_reference,
 )
 from controller.errors.http.exceptions import unauthorized
 from controller.crud import UserCrud
@@ -188,3 +191,28 @@ async def get_community_council_members(
     ):
         return get_user_name_and_responsability_and_cpf(users)
     raise unauthorized("You can't access this")
+
+
+@router.post(
+    "/community/{community_patron}/members/import",
+    status_code=status.HTTP_200_OK,
+    summary="Community",
+    description="Import members from a CSV or NDJSON stream",
+)
+async def import_community_members(
+    community_patron: str,
+    request: Request,
+    user: dict = Depends(verify_user_access_token),
+):
+    if not (
+        await is_parish_leader(user["position"])
+        or await is_council_member(user["position"])
+    ):
+        raise unauthorized("You can't import members")
+    community_id = await get_scoped_community_id(community_patron, user)
+    user_reference = await get_user_reference(user)
+    if user_reference.community_id != community_id:
+        raise unauthorized("You can't import members to this community")
+    return await import_members(
+        request.stream(), request.headers.get("content-type"), community_id
+    )
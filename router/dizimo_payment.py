@@ -18,20 +18,22 @@ from controller.src.pix_payment import (
     make_post_pix_request,
     get_pix_no_sensitive_data,
     get_pix_payment_from_correlation_id,
+    get_pix_payments_from_correlation_ids,
     is_pix_active,
 )
 from schemas.dizimo_payment import CreateDizimoPaymentModel
-from apscheduler.triggers.date import DateTrigger
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from controller.jobs.dizimo_payment import update_payment_and_push_notification
-from datetime import datetime, timedelta
-from controller.src.dizimo_payment import get_dizimo_payment_no_sensitive_data
+from controller.src.dizimo_payment import (
+    get_dizimo_payment_no_sensitive_data,
+    get_dizimo_payments_no_sensitive_data,
+    get_pix_error,
+)
 from controller.jobs.dizimo_payment import pix_notification_message
+from controller.src.user import get_user_reference
+from controller.jobs.pix_poller import pix_poller
 
 router = APIRouter()
 dizimo_payment_crud = DizimoPaymentCrud()
 user_crud = UserCrud()
-scheduler = AsyncIOScheduler()
 
 
 @router.post(
@@ -43,10 +45,6 @@ async def create_dizimo_payment_router(
     pix_data: CreateDizimoPaymentModel,
     user: dict = Depends(verify_user_access_token),
 ):
-    try:
-        scheduler.start()
-    except Exception as error:
-        pass
     user = await user_crud.get_user_by_cpf(user["cpf"])
     pix_data = dict(pix_data)
     month = pix_data["month"]
@@ -61,8 +59,8 @@ async def create_dizimo_payment_router(
     if dizimo_payment_is_expired(dizimo_payment):
         raise not_acceptable(f"Payment is expired")
     if dizimo_payment.correlation_id:
-        pix_payment = get_pix_payment_from_correlation_id(
-            dizimo_payment.correlation_id
+        pix_payment = await get_pix_payment_from_correlation_id(
+            dizimo_payment.correlation_id, cached=False
         )
         if is_pix_active(pix_payment):
             await pix_notification_message(
@@ -74,16 +72,12 @@ async def create_dizimo_payment_router(
         customer=create_customer(user),
         correlationID=str(uuid4()),
     )
-    pix_payment = make_post_pix_request(pix_payment)
+    pix_payment = await make_post_pix_request(pix_payment)
     dizimo_payment = complete_dizimo_payment(dizimo_payment, pix_payment)
     await dizimo_payment_crud.complete_dizimo_payment(dizimo_payment)
-    for i in range(1, 31):
-        TIME = datetime.now() + timedelta(minutes=i)
-        scheduler.add_job(
-            update_payment_and_push_notification,
-            DateTrigger(run_date=TIME),
-            args=[dizimo_payment.correlation_id, i],
-        )
+    pix_poller.add(
+        dizimo_payment.correlation_id, dizimo_payment.date.timestamp()
+    )
     await pix_notification_message(
         "Pix gerado", "Realize o pagamento em ate 30 minutos", user.id
     )
@@ -98,16 +92,13 @@ async def create_dizimo_payment_router(
 async def get_dizimo_payment_by_year(
     year: int, user: dict = Depends(verify_user_access_token)
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
+    user = await get_user_reference(user)
     dizimo_payments = (
         await dizimo_payment_crud.get_payments_by_year_and_user_id(
             year, user.id
         )
     )
-    return [
-        get_dizimo_payment_no_sensitive_data(payment)
-        for payment in dizimo_payments
-    ]
+    return await get_dizimo_payments_no_sensitive_data(dizimo_payments)
 
 
 @router.get(
@@ -118,13 +109,13 @@ async def get_dizimo_payment_by_year(
 async def get_dizimo_payment_by_year_and_month(
     year: int, month: str, user: dict = Depends(verify_user_access_token)
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
+    user = await get_user_reference(user)
     dizimo_payment = (
         await dizimo_payment_crud.get_payment_by_month_year_and_user_id(
             month, year, user.id
         )
     )
-    return get_dizimo_payment_no_sensitive_data(dizimo_payment)
+    return await get_dizimo_payment_no_sensitive_data(dizimo_payment)
 
 
 @router.get(
@@ -135,17 +126,26 @@ async def get_dizimo_payment_by_year_and_month(
 async def get_all_user_payments(
     user: dict = Depends(verify_user_access_token),
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
-    async for (
-        dizimo_payments
-    ) in dizimo_payment_crud.get_all_user_dizimo_payment(user.id):
+    user = await get_user_reference(user)
 
-        async def dizimo_payment_generator():
-            for dizimo_payment in dizimo_payments:
-                payment = get_pix_payment_from_correlation_id(
-                    dizimo_payment.correlation_id
-                )
-                yield json.dumps(get_pix_no_sensitive_data(payment)) + "\n"
+    async def dizimo_payment_generator():
+        async for (
+            dizimo_payments
+        ) in dizimo_payment_crud.get_all_user_dizimo_payment(user.id):
+            correlation_ids = [
+                dizimo_payment.correlation_id
+                for dizimo_payment in dizimo_payments
+                if dizimo_payment.correlation_id
+            ]
+            payments = await get_pix_payments_from_correlation_ids(
+                correlation_ids
+            )
+            for payment in payments:
+                if isinstance(payment, Exception):
+                    data = {"error": get_pix_error(payment)}
+                else:
+                    data = get_pix_no_sensitive_data(payment)
+                yield json.dumps(data) + "\n"
 
     return StreamingResponse(
         dizimo_payment_generator(), media_type="application/json"
@@ -28,6 +28,7 @@ from controller.src.finance import (
     get_finance_resume_pdf_year,
     get_csv_finance_resume_year,
 )
+from controller.src.community import get_scoped_community_id
 
 community_crud = CommunityCrud()
 user_crud = UserCrud()
@@ -45,11 +46,10 @@ async def create_finance_obj_router(
     finance_data: CreateFinanceModel | DictCreateFinanceModel,
     user: dict = Depends(verify_user_access_token),
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
-    community = await community_crud.get_community_by_patron(community_patron)
+    community_id = await get_scoped_community_id(community_patron, user)
     if isinstance(finance_data, CreateFinanceModel):
         finance_data = dict(finance_data)
-        finance_data["community_id"] = community.id
+        finance_data["community_id"] = community_id
         finance = await create_finance_in_database(finance_data)
         return finance_no_sensitive_data(finance)
     elif isinstance(finance_data, DictCreateFinanceModel):
@@ -57,7 +57,7 @@ async def create_finance_obj_router(
         finance_objs = []
         for key in finance_data.keys():
             finance = finance_data[key]
-            finance["community_id"] = community.id
+            finance["community_id"] = community_id
             finance = create_finance_model(finance)
             finance_objs.append(finance)
         finance_models = []
@@ -77,9 +77,8 @@ async def get_finance_by_year_router(
     year: int,
     user: dict = Depends(verify_user_access_token),
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
-    community = await community_crud.get_community_by_patron(community_patron)
-    finances = await finance_crud.get_finances_by_year(year, community.id)
+    community_id = await get_scoped_community_id(community_patron, user)
+    finances = await finance_crud.get_finances_by_year(year, community_id)
     finances = [finance_no_sensitive_data(finance) for finance in finances]
     return {
         "finances": finances,
@@ -98,11 +97,10 @@ async def get_finance_by_month_router(
     month: str,
     user: dict = Depends(verify_user_access_token),
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
-    community = await community_crud.get_community_by_patron(community_patron)
+    community_id = await get_scoped_community_id(community_patron, user)
     month = month_to_integer(month)
     finances = await finance_crud.get_finances_by_month(
-        year, month, community.id
+        year, month, community_id
     )
     finances = [finance_no_sensitive_data(finance) for finance in finances]
     return {
@@ -121,8 +119,7 @@ async def delete_finance_by_id_router(
     id: str,
     user: dict = Depends(verify_user_access_token),
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
-    community = await community_crud.get_community_by_patron(community_patron)
+    community_id = await get_scoped_community_id(community_patron, user)
     finance = await finance_crud.get_finance_by_id(id)
     await finance_crud.delete_finance_by_id(id)
     if is_actual_month_and_year(finance):
@@ -151,8 +148,7 @@ async def update_finance_by_id(
     finance_data: UpdateFinanceModel,
     user: dict = Depends(verify_user_access_token),
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
-    community = await community_crud.get_community_by_patron(community_patron)
+    community_id = await get_scoped_community_id(community_patron, user)
     last_finance = await finance_crud.get_finance_by_id(id)
     finance_data = dict(finance_data)
     finance = await finance_crud.update_finance_by_id(id, finance_data)
@@ -177,14 +173,16 @@ async def update_finance_by_id(
 async def get_finance_resume_by_year(
     patron: str, year: int, user: dict = Depends(verify_user_access_token)
 ):
-    community = await community_crud.get_community_by_patron(patron)
+    community_id = await get_scoped_community_id(patron, user)
+    finances_by_month = {i: [] for i in range(1, 13)}
+    for finance in await finance_crud.get_finance_rows_by_year(
+        year, community_id
+    ):
+        finances_by_month[finance.date.month].append(finance)
     finance_resume = {}
-    for i in range(1, 13):
+    for i, finances in finances_by_month.items():
         month = integer_to_month(i)
         try:
-            finances = await finance_crud.get_finances_by_month(
-                year, i, community.id
-            )
             finance_resume[month] = get_finance_resume(finances)
         except:
             finance_resume[month] = None
@@ -202,10 +200,10 @@ async def get_finance_resume_by_year_and_month(
     month: str,
     user: dict = Depends(verify_user_access_token),
 ):
-    community = await community_crud.get_community_by_patron(patron)
+    community_id = await get_scoped_community_id(patron, user)
     month = month_to_integer(month)
-    finances = await finance_crud.get_finances_by_month(
-        year, month, community.id
+    finances = await finance_crud.get_finance_rows_by_month(
+        year, month, community_id
     )
     month = integer_to_month(month)
     resume = get_finance_resume(finances)
@@ -223,10 +221,10 @@ async def get_finance_resume_pdf_by_year_and_month(
     month: str,
     user: dict = Depends(verify_user_access_token),
 ):
-    community = await community_crud.get_community_by_patron(patron)
+    community_id = await get_scoped_community_id(patron, user)
     month = month_to_integer(month)
-    finances = await finance_crud.get_finances_by_month(
-        year, month, community.id
+    finances = await finance_crud.get_finance_rows_by_month(
+        year, month, community_id
     )
     pdf_bytes = get_pdf_table_finance_resume(finances)
     month = integer_to_month(month)
@@ -248,8 +246,8 @@ async def get_finance_resume_pdf_by_year_and_month(
 async def get_finance_resume_pdf_by_year(
     patron: str, year: int, user: dict = Depends(verify_user_access_token)
 ):
-    community = await community_crud.get_community_by_patron(patron)
-    finances = await finance_crud.get_finances_by_year(year, community.id)
+    community_id = await get_scoped_community_id(patron, user)
+    finances = await finance_crud.get_finance_rows_by_year(year, community_id)
     pdf_bytes = await get_finance_resume_pdf_year(finances, year)
     response = StreamingResponse(
         BytesIO(pdf_bytes),
@@ -272,10 +270,10 @@ async def get_finance_resume_csv_by_year_and_month(
     month: str,
     user: dict = Depends(verify_user_access_token),
 ):
-    community = await community_crud.get_community_by_patron(patron)
+    community_id = await get_scoped_community_id(patron, user)
     month = month_to_integer(month)
-    finances = await finance_crud.get_finances_by_month(
-        year, month, community.id
+    finances = await finance_crud.get_finance_rows_by_month(
+        year, month, community_id
     )
     csv_file = get_csv_finance_resume(finances)
     response = StreamingResponse(
@@ -297,8 +295,8 @@ async def get_finance_resume_csv_by_year_and_month(
 async def get_finance_resume_csv_by_year(
     patron: str, year: int, user: dict = Depends(verify_user_access_token)
 ):
-    community = await community_crud.get_community_by_patron(patron)
-    finances = await finance_crud.get_finances_by_year(year, community.id)
+    community_id = await get_scoped_community_id(patron, user)
+    finances = await finance_crud.get_finance_rows_by_year(year, community_id)
     csv_file = await get_csv_finance_resume_year(finances, year)
     response = StreamingResponse(
         iter([csv_file.getvalue()]), media_type="text/csv"
@@ -6,6 +6,7 @@ from controller.crud.user import UserCrud
 from controller.crud.community import CommunityCrud
 from controller.crud.image import ImageCrud
 from controller.src.image import create_image, convert_image_to_base64
+from controller.src.user import get_user_reference
 
 user_crud = UserCrud()
 community_crud = CommunityCrud()
@@ -25,7 +26,7 @@ async def upload_community_image(
     file: UploadFile = File(...),
 ):
     if is_png_or_jpeg_image(file):
-        user = await user_crud.get_user_by_cpf(user["cpf"])
+        user = await get_user_reference(user)
         community = await community_crud.get_community_by_patron(patron)
         if community.image:
             await image_crud.delete_image_by_id(community.image)
@@ -45,7 +46,7 @@ async def upload_community_image(
 async def delete_community_image(
     patron: str, user: dict = Depends(verify_user_access_token)
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
+    user = await get_user_reference(user)
     community = await community_crud.get_community_by_patron(patron)
     if community.image:
         await image_crud.delete_image_by_id(community.image)
@@ -60,7 +61,7 @@ async def delete_community_image(
 async def get_community_image(
     patron: str, user: dict = Depends(verify_user_access_token)
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
+    user = await get_user_reference(user)
     community = await community_crud.get_community_by_patron(patron)
     if community.image:
         image = await image_crud.get_image_by_id(community.image)
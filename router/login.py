@@ -1,25 +1,26 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, status, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_session
 from schemas.sign import SignIn, SignUp
-from controller.validators.sign_validator import SignUpValidator
-from controller.src.login import create_login, verify_user_login
+from controller.src.login import verify_user_login
+from controller.src.signup import signup_user
 from controller.crud import LoginCrud
 from controller.crud import UserCrud
-from controller.src.user import create_user
-from controller.src.number import create_number_model
-from controller.auth import jwt
-from controller.errors.http.exceptions import (
-    internal_server_error,
-    bad_request,
+from controller.errors.http.exceptions import bad_request
+from controller.src.user import (
+    convert_user_to_dict,
+    create_user_access_token,
+)
+from controller.src.rate_limit import (
+    rate_limiter,
+    get_client_ip,
+    SIGNIN_CPF_LIMIT,
+    SIGNIN_IP_LIMIT,
 )
-from controller.src.user import convert_user_to_dict
-from controller.src.dizimo_payment import create_dizimo_payment
-from controller.crud import DizimoPaymentCrud, NumberCrud
 
 router = APIRouter()
 login_crud = LoginCrud()
 user_crud = UserCrud()
-dizimo_payment_crud = DizimoPaymentCrud()
-number_crud = NumberCrud()
 
 
 @router.post(
@@ -28,17 +29,24 @@ number_crud = NumberCrud()
     summary="Login",
     description="Do Sign In",
 )
-async def signin(sign_data: SignIn):
+async def signin(
+    sign_data: SignIn,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+):
     sign_data = dict(sign_data)
+    await rate_limiter.hit(SIGNIN_IP_LIMIT, get_client_ip(request))
+    await rate_limiter.hit(SIGNIN_CPF_LIMIT, sign_data["cpf"])
+    # The hash is read on its own short session, so no pooled connection
+    # is held while bcrypt runs.
     if await verify_user_login(sign_data):
-        user = await user_crud.get_user_by_cpf(sign_data["cpf"])
+        user = await user_crud.get_user_by_cpf(sign_data["cpf"], session)
         if not (user.active):
             user.active = True
-            user = convert_user_to_dict(user)
-            await user_crud.update_user(user)
+            await user_crud.update_user(convert_user_to_dict(user), session)
         return {
-            "access_token": jwt.create_access_token(
-                sign_data["cpf"], user.position
+            "access_token": await create_user_access_token(
+                user, session=session
             )
         }
     return bad_request("Password or CPF is not correct")
@@ -50,24 +58,12 @@ async def signin(sign_data: SignIn):
     summary="Login",
     description="Create user account",
 )
-async def signup(sign_data: SignUp):
-    sign_data = dict(sign_data)
-    SignUpValidator(sign_data)
-    user = await create_user(sign_data)
-    login = create_login(sign_data)
-    try:
-        await user_crud.create_user(user)
-        try:
-            await login_crud.create_login(login)
-        except Exception as error:
-            await user_crud.delete_user(user)
-            raise internal_server_error(
-                f"Database failed to create user: {error!r}"
-            )
-    except Exception as error:
-        raise bad_request(f"User already exist: {error!r}")
-    dizimo_payment = await create_dizimo_payment(user)
-    await dizimo_payment_crud.create_payment(dizimo_payment)
-    number_model = create_number_model(user.id, user.phone)
-    await number_crud.create_number(number_model)
-    return {"access_token": jwt.create_access_token(user.cpf)}
+async def signup(
+    sign_data: SignUp, session: AsyncSession = Depends(get_session)
+):
+    user = await signup_user(dict(sign_data), session)
+    return {
+        "access_token": await create_user_access_token(
+            user, sign_data.community
+        )
+    }
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, status
+from controller.src.metrics import collect_metrics
+from router.middleware.authorization import verify_metrics_token
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    summary="Metrics",
+    description="Get this worker process metrics",
+    dependencies=[Depends(verify_metrics_token)],
+)
+async def get_metrics():
+    return collect_metrics()
@@ -1,8 +1,31 @@
+import hmac
 from fastapi import Request
+from dotenv import load_dotenv
+from os import getenv
 from controller.auth import jwt
+from controller.errors.http.exceptions import not_found, unauthorized
+
+load_dotenv()
+
+METRICS_TOKEN = getenv("METRICS_TOKEN")
 
 
 async def verify_user_access_token(request: Request) -> dict:
-    access_token = request.headers.get("Authorization")
-    user = jwt.decode_token(access_token)
-    return user
+    user = getattr(request.state, "user", None)
+    if user is None:
+        access_token = request.headers.get("Authorization")
+        user = jwt.decode_token(access_token)
+        request.state.user = user
+    return dict(user)
+
+
+async def verify_metrics_token(request: Request) -> None:
+    # Metrics expose pool state, SQL text and route names: without a
+    # configured token they are not served at all.
+    if not METRICS_TOKEN:
+        not_found()
+    authorization = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(
+        authorization.encode(), f"Bearer {METRICS_TOKEN}".encode()
+    ):
+        unauthorized("Invalid metrics token")
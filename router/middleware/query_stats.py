@@ -0,0 +1,34 @@
+from typing import AsyncIterator
+from fastapi import Request
+from database.instrumentation import (
+    RequestStats,
+    request_stats,
+    finish_request,
+)
+
+
+async def finish_after_body(
+    body: AsyncIterator[bytes], stats: RequestStats
+) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        finish_request(stats)
+
+
+async def track_query_stats(request: Request, call_next):
+    stats = RequestStats(request.scope)
+    token = request_stats.set(stats)
+    try:
+        response = await call_next(request)
+    except Exception:
+        finish_request(stats)
+        raise
+    finally:
+        request_stats.reset(token)
+    # A streaming body keeps querying after call_next returns; the app task
+    # still records into this request's stats, so report them once the
+    # body has been sent.
+    response.body_iterator = finish_after_body(response.body_iterator, stats)
+    return response
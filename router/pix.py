@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Request, status
+from controller.src.pix_webhook import (
+    handle_pix_webhook,
+    PIX_WEBHOOK_SIGNATURE_HEADER,
+)
+
+router = APIRouter()
+
+
+@router.post(
+    "/pix/webhook",
+    status_code=status.HTTP_200_OK,
+    summary="Pix webhook",
+    description="Receive signed charge status events from Pix",
+)
+async def pix_webhook(request: Request):
+    body = await request.body()
+    signature = request.headers.get(PIX_WEBHOOK_SIGNATURE_HEADER)
+    return {"status": await handle_pix_webhook(body, signature)}
@@ -1,7 +1,14 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, status, Request
 from controller.crud import NumberCrud, LoginCrud, UserCrud
 from controller.src.sms import generate_verification_code, send_message
 from controller.errors.http.exceptions import not_acceptable
+from controller.src.rate_limit import (
+    rate_limiter,
+    get_client_ip,
+    PASSWORD_RECOVERY_SEND_CPF_LIMIT,
+    PASSWORD_RECOVERY_VERIFY_CPF_LIMIT,
+    PASSWORD_RECOVERY_IP_LIMIT,
+)
 
 router = APIRouter()
 number_crud = NumberCrud()
@@ -10,7 +17,9 @@ user_crud = UserCrud()
 
 
 @router.get("/password_recovery/{cpf}", status_code=status.HTTP_200_OK)
-async def get_password_recovery_code(cpf: str):
+async def get_password_recovery_code(cpf: str, request: Request):
+    await rate_limiter.hit(PASSWORD_RECOVERY_IP_LIMIT, get_client_ip(request))
+    await rate_limiter.hit(PASSWORD_RECOVERY_SEND_CPF_LIMIT, cpf)
     user = await user_crud.get_user_by_cpf(cpf)
     code = generate_verification_code()
     await number_crud.update_verification_code(user.phone, code)
@@ -20,7 +29,9 @@ async def get_password_recovery_code(cpf: str):
 
 
 @router.get("/password_recovery/{cpf}/{code}", status_code=status.HTTP_200_OK)
-async def verify_recovery_code(cpf: str, code: int):
+async def verify_recovery_code(cpf: str, code: int, request: Request):
+    await rate_limiter.hit(PASSWORD_RECOVERY_IP_LIMIT, get_client_ip(request))
+    await rate_limiter.hit(PASSWORD_RECOVERY_VERIFY_CPF_LIMIT, cpf)
     DEFAULT_PASSWORD = "Re1234@@"
     user = await user_crud.get_user_by_cpf(cpf)
     number_model = await number_crud.get_number_model_by_number(user.phone)
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_session
 from router.middleware.authorization import verify_user_access_token
-from controller.crud import CommunityCrud, NumberCrud, UserCrud, LoginCrud
+from controller.crud import CommunityCrud, UserCrud, LoginCrud
 from controller.src.user import (
     get_user_client_data,
-    get_update_data,
     is_council_member,
     is_parish_leader,
-    upgrade_user_position,
     convert_user_to_dict,
+    create_user_access_token,
+    get_community_id,
 )
 from schemas.user import UpdateUserModel, UpgradeUserPositionResponsability
 from controller.errors.http.exceptions import (
@@ -16,10 +18,7 @@ from controller.errors.http.exceptions import (
     internal_server_error,
 )
 from controller.validators.cpf import CPFValidator
-from controller.auth import jwt
-from models import Login
-from uuid import uuid4
-from controller.auth.password import hash_pasword
+from controller.auth.password import hash_pasword_async
 from datetime import datetime
 from controller.validators.phone import PhoneValidator
 from io import BytesIO
@@ -28,7 +27,6 @@ router = APIRouter()
 user_crud = UserCrud()
 login_crud = LoginCrud()
 community_crud = CommunityCrud()
-number_crud = NumberCrud()
 
 
 @router.get(
@@ -65,40 +63,36 @@ async def get_user_data(user: dict = Depends(verify_user_access_token)):
     description="Update user info",
 )
 async def update_user(
-    user_data: UpdateUserModel, user: dict = Depends(verify_user_access_token)
+    user_data: UpdateUserModel,
+    user: dict = Depends(verify_user_access_token),
+    session: AsyncSession = Depends(get_session),
 ):
     user_data = dict(user_data)
     CPFValidator(user_data["cpf"])
-    user = await user_crud.get_user_by_cpf(user["cpf"])
-    if user_data.get("phone"):
-        PhoneValidator(user_data["phone"])
-        await number_crud.update_number_by_user_id(user.id, user_data["phone"])
-    user_data["id"] = user.id
-    user_data["birthday"] = datetime.strptime(
-        user_data["birthday"], "%Y-%m-%d"
-    )
-    login = await login_crud.get_login_by_cpf(user.cpf)
-    await login_crud.delete_login(login)
-    try:
-        user = await user_crud.update_user(user_data)
-    except Exception as error:
-        login_obj = Login()
-        login_obj.id = str(uuid4())
-        login_obj.position = login.position
-        login_obj.cpf = login.cpf
-        login_obj.password = login.password
-        await login_crud.create_login(login_obj)
-        raise bad_request(f"This data is already in use: {error!r}")
-    new_login = Login(id=str(uuid4()), position=user.position, cpf=user.cpf)
+    PhoneValidator(user_data["phone"])
+    password = None
     if user_data.get("password"):
-        if not (user_data["password"] is None):
-            new_login.password = hash_pasword(user_data["password"])
-        else:
-            new_login.password = login.password
-    else:
-        new_login.password = login.password
-    await login_crud.create_login(new_login)
-    return {"access_token": jwt.create_access_token(user.cpf, user.position)}
+        password = await hash_pasword_async(user_data["password"])
+    # Moving to another community is allowed here, so the patron is looked
+    # up instead of being scoped to the token's community.
+    community_id = await get_community_id(
+        user_data["community_patron"], session
+    )
+    values = {
+        "cpf": user_data["cpf"],
+        "name": user_data["name"],
+        "phone": user_data["phone"],
+        "birthday": datetime.strptime(user_data["birthday"], "%Y-%m-%d"),
+        "community_id": community_id,
+    }
+    user = await user_crud.update_profile(
+        user["cpf"], values, password, session
+    )
+    return {
+        "access_token": await create_user_access_token(
+            user, user_data["community_patron"], session
+        )
+    }
 
 
 @router.patch(
@@ -111,36 +105,18 @@ async def update_user(
 async def patch_upgrade_user_position(
     position_data: UpgradeUserPositionResponsability,
     user: dict = Depends(verify_user_access_token),
+    session: AsyncSession = Depends(get_session),
 ):
     # if is_parish_leader(user['position']) or is_council_member(user['position']):
     if position_data.position == "user":
-        await user_crud.upgrade_user(
-            position_data.cpf, position_data.position, "faithful"
-        )
-        await login_crud.update_position(
-            position_data.cpf, position_data.position
-        )
-        return
-    if position_data.position == "council member":
-        if position_data.responsibility:
-            await user_crud.upgrade_user(
-                position_data.cpf,
-                position_data.position,
-                position_data.responsibility,
-            )
-            await login_crud.update_position(
-                position_data.cpf, position_data.position
-            )
-            return
-        else:
-            await user_crud.upgrade_user(
-                position_data.cpf, position_data.position, "member"
-            )
-            await login_crud.update_position(
-                position_data.cpf, position_data.position
-            )
-            return
-    raise bad_request(f"Rule {position_data.position!r} doesn't exists")
+        responsibility = "faithful"
+    elif position_data.position == "council member":
+        responsibility = position_data.responsibility or "member"
+    else:
+        raise bad_request(f"Rule {position_data.position!r} doesn't exists")
+    await user_crud.upgrade_position(
+        position_data.cpf, position_data.position, responsibility, session
+    )
     # raise unauthorized(f"You can't upgrade user position")
 
 
@@ -153,11 +129,12 @@ async def patch_upgrade_user_position(
 )
 async def deactivate_user_account(
     user: dict = Depends(verify_user_access_token),
+    session: AsyncSession = Depends(get_session),
 ):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
+    user = await user_crud.get_user_by_cpf(user["cpf"], session)
     user.active = False
     user = convert_user_to_dict(user)
-    await user_crud.update_user(user)
+    await user_crud.update_user(user, session)
     return {"user account deactivate, do login again to activate"}
 
 
@@ -181,8 +158,10 @@ async def get_user_by_cpf(
     summary="Users",
     description="Delete user by CPF",
 )
-async def delete_user_by_cpf(cpf: str):
-    login = await login_crud.get_login_by_cpf(cpf)
-    await login_crud.delete_login(login)
-    user = await user_crud.get_user_by_cpf(cpf)
-    await user_crud.delete_user(user)
+async def delete_user_by_cpf(
+    cpf: str, session: AsyncSession = Depends(get_session)
+):
+    login = await login_crud.get_login_by_cpf(cpf, session)
+    await login_crud.delete_login(login, session)
+    user = await user_crud.get_user_by_cpf(cpf, session)
+    await user_crud.delete_user(user, session)
@@ -10,6 +10,7 @@ from controller.src.web_push_notification import (
     send_notification_to_user,
     MessageNotification,
 )
+from controller.src.user import get_user_reference
 
 router = APIRouter()
 warning_crud = WarningCrud()
@@ -73,7 +74,7 @@ async def get_community_warning(
     user: dict = Depends(verify_user_access_token),
 ):
     # if warning_id == None: raise bad_request(f"No warning was send")
-    user = await user_crud.get_user_by_cpf(user["cpf"])
+    user = await get_user_reference(user)
     warning = await warning_crud.get_warning_by_id(warning_id)
     # if user.community_id != warning.community_id: raise not_found("Warning not found")
     return get_warning_client_data(warning)
@@ -90,7 +91,7 @@ async def create_community_warning(
     warning: CreateWarningModel, user: dict = Depends(verify_user_access_token)
 ):
     # if is_parish_leader(user['position']) or is_council_member(user['position']):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
+    user = await get_user_reference(user)
     warning = dict(warning)
     WarningValidator(warning)
     warning["community_id"] = user.community_id
@@ -129,7 +130,7 @@ async def update_community_warning(
     warning = dict(warning)
     warning["id"] = warning_id
     WarningValidator(warning)
-    user = await user_crud.get_user_by_cpf(user["cpf"])
+    user = await get_user_reference(user)
     db_warning = await warning_crud.get_warning_by_id(warning["id"])
     # if user.community_id == db_warning.community_id:
     warning = await warning_crud.update_warning(warning)
@@ -148,7 +149,7 @@ async def delete_community_warning(
     warning_id: str, user: dict = Depends(verify_user_access_token)
 ):
     # if is_parish_leader(user['position']) or is_council_member(user['position']):
-    user = await user_crud.get_user_by_cpf(user["cpf"])
+    user = await get_user_reference(user)
     warning = await warning_crud.get_warning_by_id(warning_id)
     # if user.community_id == warning.community_id:
     return await warning_crud.delete_warning(warning)
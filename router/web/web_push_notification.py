@@ -6,6 +6,7 @@ from controller.crud import UserCrud
 from router.middleware.authorization import verify_user_access_token
 from firebase_admin import messaging
 from controller.crud import DizimoPaymentCrud
+from controller.src.user import get_user_reference
 
 router = APIRouter()
 web_push_crud = WebPushCrud()
@@ -23,7 +24,7 @@ async def subscribe(
 ) -> str:
     try:
         subscription = dict(subscription)
-        user = await user_crud.get_user_by_cpf(user["cpf"])
+        user = await get_user_reference(user)
         subscription["user_id"] = user.id
         try:
             await web_push_crud.delete_web_push_by_user_id(user.id)
@@ -22,7 +22,7 @@ class UpdateUserModel(BaseModel):
     phone: str
     name: str
     community_patron: str
-    password: str
+    password: str | None = None
     birthday: str
     image: str | None = None
 
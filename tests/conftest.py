@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+# The app reads its configuration at import time, so the test settings
+# must be in place before anything from the project is imported.
+TEST_DIR = tempfile.mkdtemp(prefix="church-app-tests-")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{TEST_DIR}/primary.db"
+)
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("CRYPTO_KEY", "test-crypto-key")
+os.environ.setdefault("PIX_COB_URL", "http://127.0.0.1:1/charge")
+os.environ.setdefault("METRICS_TOKEN", "test-metrics-token")
+
+import pytest
+from sqlalchemy import insert
+import models
+from models import Community
+from database import Base, engine
+from controller.crud.user import user_cache
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def database(anyio_backend):
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+    # Rows are gone with the tables, so are the cached ones.
+    user_cache.clear()
+
+
+@pytest.fixture
+async def community(database):
+    community_id = "0192f1a0000070008000000000000001"
+    async with engine.begin() as connection:
+        await connection.execute(
+            insert(Community).values(
+                id=community_id,
+                patron="sao jose",
+                location="x",
+                email="a@a.com",
+            )
+        )
+    return community_id
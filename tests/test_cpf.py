@@ -0,0 +1,113 @@
+import base64
+import os
+import pytest
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from controller.auth.cpf import (
+    CRYPTO_KEY,
+    VERSION_PREFIX,
+    decrypt,
+    decrypt_legacy,
+    decrypt_many,
+    derive_key,
+    derive_message_key,
+    encrypt,
+    encrypt_many,
+    get_master_key,
+)
+
+CPFS = ["12345678909", "98765432100", "11144477735"]
+
+
+def encrypt_legacy(message: str, password: str = CRYPTO_KEY) -> str:
+    # The format written before the v2 envelope: a PBKDF2 key per message
+    # and a PKCS7 padded AES-GCM payload.
+    salt = os.urandom(16)
+    nonce = os.urandom(12)
+    cipher = Cipher(
+        algorithms.AES(derive_key(password, salt)),
+        modes.GCM(nonce),
+        backend=default_backend(),
+    )
+    encryptor = cipher.encryptor()
+    padder = padding.PKCS7(algorithms.AES.block_size).padder()
+    padded_message = padder.update(message.encode()) + padder.finalize()
+    encrypted_message = encryptor.update(padded_message) + encryptor.finalize()
+    encrypted_data = salt + nonce + encryptor.tag + encrypted_message
+    return base64.b64encode(encrypted_data).decode("utf-8")
+
+
+def tamper(encrypted_message: str, index: int) -> str:
+    encrypted_data = bytearray(
+        base64.b64decode(encrypted_message[len(VERSION_PREFIX) :])
+    )
+    encrypted_data[index] ^= 1
+    return VERSION_PREFIX + base64.b64encode(encrypted_data).decode("utf-8")
+
+
+def test_encrypt_roundtrip():
+    encrypted = encrypt(CPFS[0])
+    assert encrypted.startswith(VERSION_PREFIX)
+    assert CPFS[0] not in encrypted
+    assert decrypt(encrypted) == CPFS[0]
+
+
+def test_encrypt_uses_a_fresh_salt_and_nonce():
+    assert encrypt(CPFS[0]) != encrypt(CPFS[0])
+
+
+def test_decrypt_rejects_the_wrong_password():
+    with pytest.raises(InvalidTag):
+        decrypt(encrypt(CPFS[0]), "another-crypto-key")
+
+
+def test_decrypt_reads_the_legacy_format():
+    encrypted = encrypt_legacy(CPFS[0])
+    assert not encrypted.startswith(VERSION_PREFIX)
+    assert decrypt_legacy(encrypted) == CPFS[0]
+    assert decrypt(encrypted) == CPFS[0]
+
+
+@pytest.mark.parametrize("index", [0, 16, 28, -1])
+def test_decrypt_rejects_a_tampered_ciphertext(index):
+    # A changed salt derives another key; any other changed byte breaks
+    # the tag.
+    with pytest.raises(InvalidTag):
+        decrypt(tamper(encrypt(CPFS[0]), index))
+
+
+def test_decrypt_rejects_a_tampered_prefix():
+    encrypted = encrypt(CPFS[0])
+    with pytest.raises(InvalidTag):
+        decrypt(encrypted[len(VERSION_PREFIX) :])
+    with pytest.raises(InvalidTag):
+        decrypt("v1:" + encrypted[len(VERSION_PREFIX) :])
+
+
+def test_decrypt_binds_the_prefix_as_associated_data():
+    salt = os.urandom(16)
+    nonce = os.urandom(12)
+    key = derive_message_key(get_master_key(CRYPTO_KEY), salt)
+    encrypted_message = AESGCM(key).encrypt(nonce, CPFS[0].encode(), b"v1:")
+    encrypted = VERSION_PREFIX + base64.b64encode(
+        salt + nonce + encrypted_message
+    ).decode("utf-8")
+    with pytest.raises(InvalidTag):
+        decrypt(encrypted)
+
+
+def test_encrypt_many_roundtrip():
+    encrypted = encrypt_many(CPFS)
+    assert len(encrypted) == len(CPFS)
+    assert len(set(encrypted)) == len(CPFS)
+    assert decrypt_many(encrypted) == CPFS
+
+
+def test_decrypt_many_reads_both_formats():
+    encrypted = [encrypt(CPFS[0]), encrypt_legacy(CPFS[1]), encrypt(CPFS[2])]
+    assert decrypt_many(encrypted) == CPFS
+    assert encrypt_many([]) == []
+    assert decrypt_many([]) == []
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, text
+from database import unit_of_work, session as sessionmaker
+from models import Community
+from controller.crud.crud import CRUD
+
+pytestmark = pytest.mark.anyio
+
+crud = CRUD()
+BROKEN = text("select * from missing_table")
+
+
+async def rename_community(db_session, community_id: str) -> None:
+    community = await db_session.get(Community, community_id)
+    community.patron = "santo antonio"
+    await db_session.flush()
+
+
+async def get_patron(community_id: str) -> str:
+    async with sessionmaker() as db_session:
+        statement = select(Community.patron).filter(
+            Community.id == community_id
+        )
+        return (await db_session.execute(statement)).scalar_one()
+
+
+async def test_failed_helper_keeps_unit_of_work_writes(community):
+    async with unit_of_work() as db_session:
+        await rename_community(db_session, community)
+        with pytest.raises(HTTPException):
+            await crud.get_rows(BROKEN, session=db_session)
+        # The helper left the transaction to its owner.
+        assert db_session.in_transaction()
+        statement = select(Community.patron).filter(Community.id == community)
+        patron = (await db_session.execute(statement)).scalar_one()
+        assert patron == "santo antonio"
+
+
+async def test_unit_of_work_rolls_back_once_on_error(community):
+    with pytest.raises(HTTPException):
+        async with unit_of_work() as db_session:
+            await rename_community(db_session, community)
+            await crud.get_rows(BROKEN, session=db_session)
+    assert await get_patron(community) == "sao jose"
+
+
+async def test_own_session_is_rolled_back(community):
+    async with sessionmaker() as db_session:
+        await rename_community(db_session, community)
+        with pytest.raises(HTTPException):
+            await crud.get_rows(BROKEN, session=db_session)
+        assert not db_session.in_transaction()
+    assert await get_patron(community) == "sao jose"
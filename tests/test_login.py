@@ -0,0 +1,81 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from controller.auth import password
+from database import engine
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+SIGN_UP = {
+    "cpf": "52998224725",
+    "name": "Maria Silva",
+    "password": "Senha@123",
+    "birthday": "1990-01-01",
+    "community": "sao jose",
+    "phone": "+5511987654321",
+}
+FINANCES_URL = "/community/sao jose/finance/2026"
+
+
+@pytest.fixture
+async def client(database, community):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+def checked_out(monkeypatch):
+    # Pooled connections checked out while bcrypt runs.
+    checked_out = []
+    hash_pasword = password.hash_pasword
+    verify_hashed_password = password.verify_hashed_password
+
+    def hash_and_record(plain_password):
+        checked_out.append(engine.pool.checkedout())
+        return hash_pasword(plain_password)
+
+    def verify_and_record(plain_password, hashed_password):
+        checked_out.append(engine.pool.checkedout())
+        return verify_hashed_password(plain_password, hashed_password)
+
+    monkeypatch.setattr(password, "hash_pasword", hash_and_record)
+    monkeypatch.setattr(password, "verify_hashed_password", verify_and_record)
+    return checked_out
+
+
+async def test_signup_hashes_without_a_connection(client, checked_out):
+    response = await client.post("/signup", json=SIGN_UP)
+    assert response.status_code == 201
+    assert checked_out == [0]
+
+
+async def test_signin_verifies_without_a_connection(client, checked_out):
+    assert (await client.post("/signup", json=SIGN_UP)).status_code == 201
+    response = await client.post(
+        "/signin",
+        json={"cpf": SIGN_UP["cpf"], "password": SIGN_UP["password"]},
+    )
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+    assert checked_out == [0, 0]
+
+
+async def test_signin_reactivates_an_inactive_user(client):
+    response = await client.post("/signup", json=SIGN_UP)
+    headers = {"Authorization": response.json()["access_token"]}
+    response = await client.delete("/me/deactivate", headers=headers)
+    assert response.status_code == 204
+    response = await client.get(FINANCES_URL, headers=headers)
+    assert response.status_code == 401
+
+    response = await client.post(
+        "/signin",
+        json={"cpf": SIGN_UP["cpf"], "password": SIGN_UP["password"]},
+    )
+    assert response.status_code == 200
+    headers = {"Authorization": response.json()["access_token"]}
+    response = await client.get(FINANCES_URL, headers=headers)
+    assert response.status_code == 200
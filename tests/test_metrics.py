@@ -0,0 +1,41 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from database import engine
+from main import app
+
+pytestmark = pytest.mark.anyio
+
+METRICS_HEADERS = {"Authorization": "Bearer test-metrics-token"}
+
+
+@pytest.fixture
+async def client(database):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        yield client
+
+
+async def test_metrics_require_the_token(client):
+    assert (await client.get("/metrics")).status_code == 401
+    response = await client.get(
+        "/metrics", headers={"Authorization": "Bearer wrong"}
+    )
+    assert response.status_code == 401
+
+
+async def test_metrics_report_pool_checkouts(client):
+    before = (await client.get("/metrics", headers=METRICS_HEADERS)).json()
+    async with engine.connect() as connection:
+        await connection.execute(text("select 1"))
+    response = await client.get("/metrics", headers=METRICS_HEADERS)
+    assert response.status_code == 200
+    pool = response.json()["database_pool"]
+    checkouts = before["database_pool"]["checkouts"]
+    assert pool["checkouts"] == checkouts + 1
+    assert pool["checkout_hold_seconds"]["count"] >= 1
+    waits = before["database_pool"]["checkout_wait_seconds"]["count"]
+    assert pool["checkout_wait_seconds"]["count"] == waits + 1
+    assert pool["checked_out"] == 0
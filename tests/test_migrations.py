@@ -0,0 +1,156 @@
+import os
+from importlib.util import module_from_spec, spec_from_file_location
+from pathlib import Path
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+alembic = pytest.importorskip("alembic")
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+# Points at a throwaway database: the test drops the public schema.
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(
+        not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"
+    ),
+]
+
+VERSIONS_DIR = (
+    Path(__file__).resolve().parent.parent
+    / "infra"
+    / "migrations"
+    / "versions"
+)
+NATIVE_UUID_KEYS = "b7a41f9e2c05"
+
+COMMUNITY_ID = "6f1c1f1e-3a2b-4c5d-8e9f-0a1b2c3d4e5f"
+USER_ID = "1b4e28ba-2fa1-11d2-883f-0016d3cca427"
+SEED = (
+    f"INSERT INTO communities (id, patron) VALUES ('{COMMUNITY_ID}', 'x')",
+    "INSERT INTO users (id, cpf, community_id)"
+    f" VALUES ('{USER_ID}', '52998224725', '{COMMUNITY_ID}')",
+    "INSERT INTO numbers (id, user_id)"
+    f" VALUES ('4e7b5bed-5cd4-44a5-9b6b-3349a6ffd75a', '{USER_ID}')",
+    "INSERT INTO payments (id, user_id)"
+    f" VALUES ('5f8c6cfe-6de5-45b6-8c7c-445ab7aae86b', '{USER_ID}')",
+    "INSERT INTO finances (id, community_id)"
+    f" VALUES ('3d6a4adc-4bc3-43f4-8a5a-2238f5eec649', '{COMMUNITY_ID}')",
+    "INSERT INTO finance_resumes (id, last_month_id, community_id) VALUES"
+    f" ('r1', '3d6a4adc-4bc3-43f4-8a5a-2238f5eec649', '{COMMUNITY_ID}')",
+)
+KEY_TYPES = """
+    SELECT DISTINCT data_type FROM information_schema.columns
+    WHERE table_schema = 'public'
+    AND column_name IN ('id', 'community_id', 'user_id', 'last_month_id')
+    AND NOT (table_name = 'finance_resumes' AND column_name = 'id')
+"""
+FOREIGN_KEYS = "SELECT count(*) FROM pg_constraint WHERE contype = 'f'"
+JOINED_ROWS = """
+    SELECT count(*) FROM users
+    JOIN communities ON communities.id = users.community_id
+    JOIN numbers ON numbers.user_id = users.id
+    JOIN payments ON payments.user_id = users.id
+    JOIN finance_resumes
+    ON finance_resumes.community_id = communities.id
+"""
+
+
+def load_revisions() -> list:
+    revisions = {}
+    for path in VERSIONS_DIR.glob("*.py"):
+        spec = spec_from_file_location(path.stem, path)
+        module = module_from_spec(spec)
+        spec.loader.exec_module(module)
+        revisions[module.down_revision] = module
+    chain, revision = [], None
+    while revision in revisions:
+        chain.append(revisions[revision])
+        revision = chain[-1].revision
+    return chain
+
+
+def run(connection, revisions: list, direction: str) -> None:
+    # Alembic owns the transaction: the index migration commits it to
+    # build its indexes concurrently.
+    context = MigrationContext.configure(connection)
+    with context.begin_transaction(), Operations.context(context):
+        for revision in revisions:
+            getattr(revision, direction)()
+
+
+async def migrate(engine, revisions: list, direction: str) -> None:
+    async with engine.connect() as connection:
+        await connection.run_sync(run, revisions, direction)
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="module")
+def revisions():
+    revisions = load_revisions()
+    assert revisions[-1].revision == NATIVE_UUID_KEYS
+    return revisions
+
+
+@pytest.fixture(scope="module")
+async def postgres(anyio_backend, revisions):
+    # The schema one revision before the UUID keys, with a few rows. Each
+    # test leaves it as it found it.
+    engine = create_async_engine(TEST_POSTGRES_URL)
+    async with engine.begin() as connection:
+        await connection.execute(text("DROP SCHEMA public CASCADE"))
+        await connection.execute(text("CREATE SCHEMA public"))
+    await migrate(engine, revisions[:-1], "upgrade")
+    async with engine.begin() as connection:
+        for statement in SEED:
+            await connection.execute(text(statement))
+    yield engine
+    async with engine.begin() as connection:
+        await connection.execute(text("DROP SCHEMA public CASCADE"))
+        await connection.execute(text("CREATE SCHEMA public"))
+    await engine.dispose()
+
+
+async def get_state(connection) -> tuple:
+    key_types = (await connection.execute(text(KEY_TYPES))).scalars().all()
+    foreign_keys = (await connection.execute(text(FOREIGN_KEYS))).scalar()
+    joined_rows = (await connection.execute(text(JOINED_ROWS))).scalar()
+    return sorted(key_types), foreign_keys, joined_rows
+
+
+async def test_native_uuid_keys_upgrade_and_downgrade(postgres, revisions):
+    async with postgres.connect() as connection:
+        before = await get_state(connection)
+    assert before == (["character varying"], 9, 1)
+
+    await migrate(postgres, revisions[-1:], "upgrade")
+    async with postgres.connect() as connection:
+        assert await get_state(connection) == (["uuid"], *before[1:])
+
+    await migrate(postgres, revisions[-1:], "downgrade")
+    async with postgres.connect() as connection:
+        assert await get_state(connection) == before
+
+
+async def test_native_uuid_keys_rejects_non_uuid_keys(postgres, revisions):
+    # The cast fails on a key that is not a UUID, and the transaction
+    # leaves the tables as they were.
+    async with postgres.begin() as connection:
+        await connection.execute(
+            text("INSERT INTO images (id) VALUES ('not-a-uuid')")
+        )
+    with pytest.raises(Exception, match="invalid input syntax for type uuid"):
+        await migrate(postgres, revisions[-1:], "upgrade")
+    async with postgres.begin() as connection:
+        key_types, _, _ = await get_state(connection)
+        await connection.execute(
+            text("DELETE FROM images WHERE id = 'not-a-uuid'")
+        )
+    assert key_types == ["character varying"]
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import insert, select
+from controller.jobs.dizimo_payment import (
+    create_month_dizimo_payment_and_transfer_payments_values,
+)
+from database import engine
+from models import Community
+
+pytestmark = pytest.mark.anyio
+
+COMMUNITIES = 250
+
+
+async def test_month_totals_move_to_last_month(database):
+    async with engine.begin() as connection:
+        await connection.execute(
+            insert(Community),
+            [
+                {
+                    "id": f"0192f1a0-0000-7000-8000-{index:012d}",
+                    "patron": f"patron {index}",
+                    "actual_month_total_payment_value": index,
+                    "last_month_total_payment_value": -1,
+                }
+                for index in range(COMMUNITIES)
+            ],
+        )
+    await create_month_dizimo_payment_and_transfer_payments_values()
+    async with engine.connect() as connection:
+        rows = await connection.execute(
+            select(
+                Community.id,
+                Community.actual_month_total_payment_value,
+                Community.last_month_total_payment_value,
+            ).order_by(Community.id)
+        )
+        rows = rows.all()
+    assert len(rows) == COMMUNITIES
+    assert [row[1] for row in rows] == [0] * COMMUNITIES
+    assert [row[2] for row in rows] == list(range(COMMUNITIES))
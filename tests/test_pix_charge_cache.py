@@ -0,0 +1,40 @@
+import pytest
+from math import inf
+from controller.src.pix_payment import (
+    PIX_ACTIVE_CACHE_TTL,
+    cache_charge,
+    charge_cache,
+    get_charge_expiry,
+)
+
+CORRELATION_ID = "charge-cache-test"
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    yield
+    charge_cache.invalidate(CORRELATION_ID)
+
+
+def test_charge_without_a_status_is_not_cached():
+    cache_charge(CORRELATION_ID, {"charge": {"value": 100}})
+    assert charge_cache.get(CORRELATION_ID) is None
+
+
+def test_charge_with_a_status_is_cached():
+    pix = {"charge": {"status": "ACTIVE"}}
+    cache_charge(CORRELATION_ID, pix)
+    assert charge_cache.get(CORRELATION_ID) == pix
+
+
+@pytest.mark.parametrize(
+    "charge, expiry",
+    [
+        ({"status": "COMPLETED"}, inf),
+        ({"status": "EXPIRED"}, inf),
+        ({"status": "ACTIVE"}, 10 + PIX_ACTIVE_CACHE_TTL),
+        ({}, 10 + PIX_ACTIVE_CACHE_TTL),
+    ],
+)
+def test_charge_expiry(charge, expiry):
+    assert get_charge_expiry(CORRELATION_ID, {"charge": charge}, 10) == expiry
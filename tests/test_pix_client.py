@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+from aiohttp import ClientTimeout, web
+from aiohttp.test_utils import TestServer
+from fastapi import HTTPException
+from controller.src.pix_payment import PixClient
+
+pytestmark = pytest.mark.anyio
+
+CHARGE = {"charge": {"correlationID": "abc", "status": "ACTIVE"}}
+
+
+class PixStub:
+    def __init__(self) -> None:
+        # Statuses to answer with before the charge, one per request.
+        self.failures: list[int] = []
+        self.delay = 0.0
+        self.hits = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.failures:
+            return web.Response(status=self.failures.pop(0))
+        return web.json_response(CHARGE)
+
+
+@pytest.fixture
+async def pix_stub(anyio_backend):
+    pix_stub = PixStub()
+    app = web.Application()
+    app.router.add_route("*", "/charge/{path:.*}", pix_stub.handle)
+    app.router.add_route("*", "/charge", pix_stub.handle)
+    server = TestServer(app)
+    await server.start_server()
+    pix_stub.url = str(server.make_url("/charge"))
+    yield pix_stub
+    await server.close()
+
+
+@pytest.fixture
+async def client(pix_stub):
+    client = PixClient(
+        pix_stub.url,
+        {"Authorization": "app-id", "unset": None},
+        ClientTimeout(total=0.2),
+        max_connections=4,
+        max_in_flight=4,
+        retries=2,
+        backoff=0,
+    )
+    yield client
+    await client.close()
+
+
+async def test_get_charge(client, pix_stub):
+    assert await client.request("get", "GET", "/abc") == CHARGE
+    metrics = client.get_metrics()["get"]
+    assert metrics["latency_seconds"]["count"] == 1
+    assert (metrics["retries"], metrics["errors"]) == (0, 0)
+
+
+async def test_get_retries_a_5xx(client, pix_stub):
+    pix_stub.failures = [503, 500]
+    assert await client.request("get", "GET", "/abc") == CHARGE
+    assert pix_stub.hits == 3
+    metrics = client.get_metrics()["get"]
+    assert (metrics["retries"], metrics["errors"]) == (2, 0)
+
+
+async def test_get_gives_up_after_the_retries(client, pix_stub):
+    pix_stub.failures = [503, 503, 503]
+    with pytest.raises(HTTPException) as error:
+        await client.request("get", "GET", "/abc")
+    assert error.value.status_code == 502
+    assert pix_stub.hits == 3
+    metrics = client.get_metrics()["get"]
+    assert (metrics["retries"], metrics["errors"]) == (2, 1)
+
+
+async def test_create_is_not_retried_on_a_5xx(client, pix_stub):
+    pix_stub.failures = [503]
+    with pytest.raises(HTTPException) as error:
+        await client.request("create", "POST", json={"value": 1})
+    assert error.value.status_code == 502
+    assert pix_stub.hits == 1
+    metrics = client.get_metrics()["create"]
+    assert (metrics["retries"], metrics["errors"]) == (0, 1)
+
+
+async def test_timeout_is_a_gateway_timeout(client, pix_stub):
+    pix_stub.delay = 1
+    client.retries = 0
+    with pytest.raises(HTTPException) as error:
+        await client.request("get", "GET", "/abc")
+    assert error.value.status_code == 504
+    metrics = client.get_metrics()["get"]
+    assert metrics["errors"] == 1
+    assert metrics["latency_seconds"]["count"] == 1
+
+
+async def test_new_loop_closes_the_stale_session(client):
+    stale = await asyncio.to_thread(asyncio.run, client.get_session())
+    assert not stale.closed
+    session = await client.get_session()
+    assert stale.closed
+    assert session is not stale
+    assert await client.get_session() is session
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from controller.jobs.pix_poller import PixPoller, get_check_minutes
+from database import AdvisoryLock, engine
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+LOCK_ID = 7_401_999
+
+pytestmark = pytest.mark.anyio
+
+
+def create_poller(lock: AdvisoryLock) -> PixPoller:
+    return PixPoller(get_check_minutes(1), 100, lock, leader_interval=0.05)
+
+
+async def start(poller: PixPoller) -> None:
+    poller.wakeup = asyncio.Event()
+    poller.task = asyncio.create_task(poller.lead())
+
+
+async def wait_for(condition) -> None:
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+async def test_only_the_leader_tracks_charges(database):
+    poller = create_poller(AdvisoryLock(engine, LOCK_ID))
+    poller.add("abc")
+    assert not poller.created
+    await start(poller)
+    try:
+        await wait_for(lambda: poller.leading)
+        poller.add("abc")
+        poller.add("abc")
+        assert list(poller.created) == ["abc"]
+        assert len(poller.due) == 1
+    finally:
+        await poller.stop()
+    assert not poller.leading
+    assert not poller.created
+
+
+@pytest.mark.skipif(
+    not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"
+)
+async def test_one_worker_leads_and_another_takes_over(database):
+    postgres = create_async_engine(TEST_POSTGRES_URL)
+    pollers = [create_poller(AdvisoryLock(postgres, LOCK_ID)) for _ in "ab"]
+    try:
+        for poller in pollers:
+            await start(poller)
+        await wait_for(lambda: any(poller.leading for poller in pollers))
+        await asyncio.sleep(0.2)
+        leaders = [poller for poller in pollers if poller.leading]
+        assert len(leaders) == 1
+        await leaders[0].stop()
+        follower = next(poller for poller in pollers if poller.task)
+        await wait_for(lambda: follower.leading)
+    finally:
+        for poller in pollers:
+            await poller.stop()
+        await postgres.dispose()
@@ -0,0 +1,170 @@
+import json
+import pytest
+from datetime import date
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import insert, select
+from controller.src import pix_webhook
+from controller.src.pix_webhook import (
+    APPLIED,
+    IGNORED,
+    PIX_WEBHOOK_SIGNATURE_HEADER,
+    UNCHANGED,
+    sign_pix_webhook,
+)
+from database import engine
+from main import app
+from models import Community, DizimoPayment, User
+
+pytestmark = pytest.mark.anyio
+
+WEBHOOK_URL = "/pix/webhook"
+CORRELATION_ID = "0192f1a0-0000-7000-8000-000000000010"
+VALUE = 5000
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    monkeypatch.setattr(pix_webhook, "PIX_WEBHOOK_SECRET", "test-secret")
+
+
+@pytest.fixture
+async def client(database, secret):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+async def payment(community):
+    user_id = "0192f1a0000070008000000000000002"
+    async with engine.begin() as connection:
+        await connection.execute(
+            insert(User).values(
+                id=user_id,
+                cpf="x",
+                name="maria",
+                birthday=date(1990, 1, 1),
+                phone="11999999999",
+                community_id=community,
+            )
+        )
+        await connection.execute(
+            insert(DizimoPayment).values(
+                correlation_id=CORRELATION_ID,
+                month="10",
+                year=2026,
+                value=VALUE,
+                status="active",
+                user_id=user_id,
+            )
+        )
+    return CORRELATION_ID
+
+
+def create_event(status: str = "COMPLETED", **charge) -> str:
+    charge = {
+        "correlationID": CORRELATION_ID,
+        "status": status,
+        "value": VALUE,
+        **charge,
+    }
+    return json.dumps({"event": "OPENPIX:CHARGE_COMPLETED", "charge": charge})
+
+
+async def post(client, body: str, signature: str | None = None):
+    body = body.encode()
+    if signature is None:
+        signature = sign_pix_webhook(body)
+    return await client.post(
+        WEBHOOK_URL,
+        content=body,
+        headers={PIX_WEBHOOK_SIGNATURE_HEADER: signature},
+    )
+
+
+async def get_community_total(community_id: str) -> float:
+    async with engine.connect() as connection:
+        return await connection.scalar(
+            select(Community.actual_month_total_payment_value).where(
+                Community.id == community_id
+            )
+        )
+
+
+async def get_payment_status() -> str:
+    async with engine.connect() as connection:
+        return await connection.scalar(
+            select(DizimoPayment.status).where(
+                DizimoPayment.correlation_id == CORRELATION_ID
+            )
+        )
+
+
+async def test_a_signed_event_is_applied(client, payment, community):
+    response = await post(client, create_event())
+    assert response.status_code == 200
+    assert response.json() == {"status": APPLIED}
+    assert await get_payment_status() == "paid"
+    assert await get_community_total(community) == VALUE
+
+
+async def test_a_repeated_event_is_counted_once(client, payment, community):
+    body = create_event()
+    assert (await post(client, body)).json() == {"status": APPLIED}
+    assert (await post(client, body)).json() == {"status": UNCHANGED}
+    assert await get_community_total(community) == VALUE
+
+
+async def test_a_bad_signature_is_rejected(client, payment, community):
+    before = pix_webhook.invalid_signatures.value
+    response = await post(client, create_event(), "bm90IGEgc2lnbmF0dXJl")
+    assert response.status_code == 401
+    response = await client.post(WEBHOOK_URL, content=create_event())
+    assert response.status_code == 401
+    assert pix_webhook.invalid_signatures.value == before + 2
+    assert await get_payment_status() == "active"
+    assert await get_community_total(community) == 0
+
+
+async def test_the_webhook_needs_a_secret(client, monkeypatch):
+    monkeypatch.setattr(pix_webhook, "PIX_WEBHOOK_SECRET", None)
+    response = await client.post(
+        WEBHOOK_URL,
+        content=create_event(),
+        headers={PIX_WEBHOOK_SIGNATURE_HEADER: "x"},
+    )
+    assert response.status_code == 503
+
+
+async def test_an_event_without_a_charge_is_ignored(client):
+    response = await post(client, json.dumps({"evento": "teste_webhook"}))
+    assert response.status_code == 200
+    assert response.json() == {"status": IGNORED}
+
+
+async def test_invalid_json_is_a_bad_request(client):
+    assert (await post(client, "not json")).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "charge",
+    [
+        {"correlationID": CORRELATION_ID},
+        {"correlationID": CORRELATION_ID, "status": None},
+        {"correlationID": CORRELATION_ID, "status": "COMPLETED"},
+        {
+            "correlationID": CORRELATION_ID,
+            "status": "COMPLETED",
+            "value": "5000",
+        },
+    ],
+)
+async def test_an_invalid_charge_is_a_bad_request(
+    client, payment, community, charge
+):
+    response = await post(client, json.dumps({"charge": charge}))
+    assert response.status_code == 400
+    assert await get_payment_status() == "active"
+    assert await get_community_total(community) == 0
@@ -0,0 +1,135 @@
+import json
+import os
+import pytest
+from sqlalchemy import and_, desc, or_, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from database import Base
+from models import DizimoPayment, Finance, User, Warning
+from controller.crud.dizimo_payment import (
+    PAYMENT_BY_CORRELATION_ID,
+    PAYMENT_BY_MONTH_YEAR_AND_USER_ID,
+)
+from controller.crud.finance import (
+    FINANCE_ROWS,
+    community_date_filter,
+    get_year_range,
+)
+from controller.crud.number import NUMBER_BY_USER_ID
+from controller.crud.web_push import WEB_PUSH_BY_USER_ID
+
+# Points at a throwaway database: the test drops and recreates every table.
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(
+        not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"
+    ),
+]
+
+USER_ID = "0192f1a0-0000-7000-8000-000000000001"
+COMMUNITY_ID = "0192f1a0-0000-7000-8000-000000000002"
+
+HOT_QUERIES = {
+    "payment by user, month and year": (
+        "payments",
+        PAYMENT_BY_MONTH_YEAR_AND_USER_ID.params(
+            user_id=USER_ID, month="october", year=2026
+        ),
+    ),
+    "payments by user and year": (
+        "payments",
+        select(DizimoPayment).filter(
+            DizimoPayment.user_id == USER_ID, DizimoPayment.year == 2026
+        ),
+    ),
+    "payment by correlation id": (
+        "payments",
+        PAYMENT_BY_CORRELATION_ID.params(correlation_id="abc"),
+    ),
+    "finance rows by community and year": (
+        "finances",
+        FINANCE_ROWS.filter(
+            community_date_filter(COMMUNITY_ID, *get_year_range(2026))
+        ),
+    ),
+    "warnings by community, newest first": (
+        "warnings",
+        select(Warning)
+        .filter(Warning.community_id == COMMUNITY_ID)
+        .order_by(desc(Warning.posted_at)),
+    ),
+    "web push by user": (
+        "web_push",
+        WEB_PUSH_BY_USER_ID.params(user_id=USER_ID),
+    ),
+    "council and parish of a community": (
+        "users",
+        select(User).filter(
+            and_(
+                User.community_id == COMMUNITY_ID,
+                or_(
+                    User.position == "parish leader",
+                    User.position == "council member",
+                ),
+            )
+        ),
+    ),
+    "users by community": (
+        "users",
+        select(User).filter(User.community_id == COMMUNITY_ID),
+    ),
+    "number by user": ("numbers", NUMBER_BY_USER_ID.params(user_id=USER_ID)),
+}
+
+
+def compile_statement(statement) -> str:
+    return str(
+        statement.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+
+
+def get_seq_scans(plan: dict) -> set[str]:
+    scans = set()
+    if plan.get("Node Type") == "Seq Scan":
+        scans.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans |= get_seq_scans(child)
+    return scans
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="module")
+async def postgres(anyio_backend):
+    engine = create_async_engine(TEST_POSTGRES_URL)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+async def test_hot_query_uses_an_index(postgres, name):
+    table, statement = HOT_QUERIES[name]
+    async with postgres.connect() as connection:
+        # The test tables are small, so make the planner prove an index can
+        # serve the query: a Seq Scan is only chosen if none can.
+        await connection.execute(text("SET enable_seqscan = off"))
+        result = await connection.execute(
+            text("EXPLAIN (FORMAT JSON) " + compile_statement(statement))
+        )
+        plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    assert table not in get_seq_scans(plan[0]["Plan"])
@@ -0,0 +1,56 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from database import engine
+from database.instrumentation import route_metrics
+from router.middleware.query_stats import track_query_stats
+
+pytestmark = pytest.mark.anyio
+
+app = FastAPI()
+app.middleware("http")(track_query_stats)
+
+
+async def select_one() -> None:
+    async with engine.connect() as connection:
+        await connection.execute(text("select 1"))
+
+
+@app.get("/plain")
+async def plain():
+    await select_one()
+    return "ok"
+
+
+@app.get("/stream")
+async def stream():
+    async def rows():
+        for number in range(3):
+            await select_one()
+            yield f"{number}\n"
+
+    return StreamingResponse(rows(), media_type="text/plain")
+
+
+@pytest.fixture
+async def client(database):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        yield client
+
+
+async def test_plain_route_queries_are_counted(client):
+    assert (await client.get("/plain")).status_code == 200
+    metrics = route_metrics["GET /plain"].queries_per_request
+    assert (metrics.count, metrics.sum) == (1, 1)
+
+
+async def test_streamed_body_queries_are_counted(client):
+    response = await client.get("/stream")
+    assert response.text == "0\n1\n2\n"
+    metrics = route_metrics["GET /stream"].queries_per_request
+    assert (metrics.count, metrics.sum) == (1, 3)
@@ -0,0 +1,226 @@
+import asyncio
+import os
+import pytest
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from controller.src import rate_limit
+from controller.src.rate_limit import (
+    DatabaseBackend,
+    Limit,
+    MemoryBackend,
+    RateLimiter,
+    PASSWORD_RECOVERY_SEND_CPF_LIMIT,
+    PASSWORD_RECOVERY_VERIFY_CPF_LIMIT,
+    SIGNIN_CPF_LIMIT,
+)
+from main import app
+from models import RateLimit
+
+pytestmark = pytest.mark.anyio
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+CPF = "52998224725"
+SIGN_UP = {
+    "cpf": CPF,
+    "name": "Maria Silva",
+    "password": "Senha@123",
+    "birthday": "1990-01-01",
+    "community": "sao jose",
+    "phone": "+5511987654321",
+}
+LIMIT = Limit("test", capacity=3, period=30)
+
+
+class Clock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BrokenBackend:
+    async def take(self, key: str, capacity: int, rate: float) -> float:
+        raise ConnectionError("backend is down")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1_000_000.0)
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+async def database_backend(request, database):
+    backend = DatabaseBackend()
+    if request.param == "sqlite":
+        yield backend
+        return
+    if not TEST_POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    postgres = create_async_engine(TEST_POSTGRES_URL)
+    async with postgres.begin() as connection:
+        await connection.run_sync(RateLimit.__table__.drop, checkfirst=True)
+        await connection.run_sync(RateLimit.__table__.create)
+    backend.session = async_sessionmaker(bind=postgres)
+    backend.insert = postgresql_insert
+    yield backend
+    async with postgres.begin() as connection:
+        await connection.run_sync(RateLimit.__table__.drop)
+    await postgres.dispose()
+
+
+async def get_tokens(backend: DatabaseBackend, key: str) -> float:
+    async with backend.session() as db_session:
+        return await db_session.scalar(
+            select(RateLimit.tokens).filter(RateLimit.key == key)
+        )
+
+
+async def take_all(backend, limit: Limit, key: str) -> None:
+    for _ in range(limit.capacity):
+        assert await backend.take(key, limit.capacity, limit.rate) == 0
+
+
+async def test_recovery_send_and_verify_have_separate_buckets():
+    rate_limiter = RateLimiter(MemoryBackend(100))
+    for _ in range(PASSWORD_RECOVERY_SEND_CPF_LIMIT.capacity):
+        await rate_limiter.hit(PASSWORD_RECOVERY_SEND_CPF_LIMIT, CPF)
+    with pytest.raises(HTTPException) as error:
+        await rate_limiter.hit(PASSWORD_RECOVERY_SEND_CPF_LIMIT, CPF)
+    assert error.value.status_code == 429
+
+    for _ in range(PASSWORD_RECOVERY_VERIFY_CPF_LIMIT.capacity):
+        await rate_limiter.hit(PASSWORD_RECOVERY_VERIFY_CPF_LIMIT, CPF)
+    with pytest.raises(HTTPException) as error:
+        await rate_limiter.hit(PASSWORD_RECOVERY_VERIFY_CPF_LIMIT, CPF)
+    assert error.value.status_code == 429
+
+
+async def test_an_empty_bucket_is_rejected_with_retry_after(clock):
+    rate_limiter = RateLimiter(MemoryBackend(100))
+    for _ in range(LIMIT.capacity):
+        await rate_limiter.hit(LIMIT, CPF)
+    clock.now += 1
+    with pytest.raises(HTTPException) as error:
+        await rate_limiter.hit(LIMIT, CPF)
+    assert error.value.status_code == 429
+    # One token comes back every 10 seconds and one already went by.
+    assert error.value.headers == {"Retry-After": "9"}
+    assert rate_limiter.get_metrics()["allowed"] == {"test": 3}
+    assert rate_limiter.get_metrics()["rejected"] == {"test": 1}
+
+
+async def test_signin_answers_429_with_retry_after(
+    community, clock, monkeypatch
+):
+    monkeypatch.setattr(rate_limit.rate_limiter, "backend", MemoryBackend(100))
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        response = await client.post("/signup", json=SIGN_UP)
+        assert response.status_code == 201
+        sign_in = {"cpf": SIGN_UP["cpf"], "password": SIGN_UP["password"]}
+        for _ in range(SIGNIN_CPF_LIMIT.capacity):
+            response = await client.post("/signin", json=sign_in)
+            assert response.status_code == 200
+        response = await client.post("/signin", json=sign_in)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "60"
+
+
+async def test_memory_backend_refills_over_time(clock):
+    backend = MemoryBackend(100)
+    await take_all(backend, LIMIT, CPF)
+    assert await backend.take(CPF, LIMIT.capacity, LIMIT.rate) == 10
+    clock.now += 10
+    assert await backend.take(CPF, LIMIT.capacity, LIMIT.rate) == 0
+    assert await backend.take(CPF, LIMIT.capacity, LIMIT.rate) == 10
+    # A long pause refills the bucket only up to its capacity.
+    clock.now += 3600
+    await take_all(backend, LIMIT, CPF)
+    assert await backend.take(CPF, LIMIT.capacity, LIMIT.rate) > 0
+
+
+async def test_memory_backend_evicts_the_least_recently_used_key(clock):
+    backend = MemoryBackend(2)
+    await take_all(backend, LIMIT, "a")
+    await backend.take("b", LIMIT.capacity, LIMIT.rate)
+    # Touching "a" makes "b" the oldest key.
+    assert await backend.take("a", LIMIT.capacity, LIMIT.rate) > 0
+    await backend.take("c", LIMIT.capacity, LIMIT.rate)
+    assert len(backend) == 2
+    assert list(backend.buckets) == ["a", "c"]
+    assert await backend.take("a", LIMIT.capacity, LIMIT.rate) > 0
+
+
+async def test_memory_backend_prunes_idle_keys(clock):
+    backend = MemoryBackend(100)
+    await backend.take("a", LIMIT.capacity, LIMIT.rate)
+    clock.now += 60
+    await backend.take("b", LIMIT.capacity, LIMIT.rate)
+    await backend.prune(clock.now - 30)
+    assert list(backend.buckets) == ["b"]
+
+
+async def test_database_backend_takes_only_available_tokens(
+    database_backend, clock
+):
+    await take_all(database_backend, LIMIT, CPF)
+    assert await get_tokens(database_backend, CPF) == 0
+    retry_after = await database_backend.take(CPF, LIMIT.capacity, LIMIT.rate)
+    assert retry_after == 10
+    # The upsert left the empty bucket as it was.
+    assert await get_tokens(database_backend, CPF) == 0
+    clock.now += 5
+    retry_after = await database_backend.take(CPF, LIMIT.capacity, LIMIT.rate)
+    assert retry_after == pytest.approx(5)
+    clock.now += 5
+    assert await database_backend.take(CPF, LIMIT.capacity, LIMIT.rate) == 0
+    assert await get_tokens(database_backend, CPF) == pytest.approx(0)
+
+
+async def test_database_backend_refills_up_to_capacity(
+    database_backend, clock
+):
+    await take_all(database_backend, LIMIT, CPF)
+    clock.now += 3600
+    await take_all(database_backend, LIMIT, CPF)
+    assert await database_backend.take(CPF, LIMIT.capacity, LIMIT.rate) > 0
+
+
+async def test_database_backend_prunes_idle_keys(database_backend, clock):
+    await database_backend.take("a", LIMIT.capacity, LIMIT.rate)
+    clock.now += 60
+    await database_backend.take("b", LIMIT.capacity, LIMIT.rate)
+    await database_backend.prune(clock.now - 30)
+    assert await get_tokens(database_backend, "a") is None
+    assert await get_tokens(database_backend, "b") == LIMIT.capacity - 1
+
+
+@pytest.mark.skipif(
+    not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set"
+)
+async def test_concurrent_takes_never_overdraw(database_backend, clock):
+    if database_backend.insert is not postgresql_insert:
+        pytest.skip("concurrency is only checked on PostgreSQL")
+    results = await asyncio.gather(
+        *(
+            database_backend.take(CPF, LIMIT.capacity, LIMIT.rate)
+            for _ in range(10)
+        )
+    )
+    assert results.count(0) == LIMIT.capacity
+
+
+async def test_a_broken_backend_fails_open():
+    rate_limiter = RateLimiter(BrokenBackend())
+    for _ in range(LIMIT.capacity + 1):
+        await rate_limiter.hit(LIMIT, CPF)
+    assert rate_limiter.backend_errors.value == LIMIT.capacity + 1
+    assert rate_limiter.get_metrics()["rejected"] == {}
@@ -0,0 +1,134 @@
+import os
+from importlib import import_module
+from time import monotonic
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from database import Base
+from database.replica import ReplicaLag
+from models import Community
+from controller.crud.crud import CRUD
+
+pytestmark = pytest.mark.anyio
+
+# database re-exports the sessionmaker under the module's own name.
+db_session = import_module("database.session")
+crud = CRUD()
+PATRON = select(Community.patron)
+
+
+async def create_database(url: str, patron: str):
+    engine = create_async_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+        # Each database names its own community, so a read shows where it
+        # was served from.
+        await connection.execute(
+            insert(Community).values(
+                id="0192f1a0000070008000000000000001",
+                patron=patron,
+                location="x",
+                email="a@a.com",
+            )
+        )
+    return engine
+
+
+def get_urls(backend: str, tmp_path) -> tuple[str, str]:
+    if backend == "sqlite":
+        return (
+            f"sqlite+aiosqlite:///{tmp_path}/primary.db",
+            f"sqlite+aiosqlite:///{tmp_path}/replica.db",
+        )
+    # Two throwaway Postgres databases stand in for primary and replica.
+    urls = (
+        os.getenv("TEST_POSTGRES_URL"),
+        os.getenv("TEST_POSTGRES_REPLICA_URL"),
+    )
+    if not all(urls):
+        pytest.skip("TEST_POSTGRES_URL and TEST_POSTGRES_REPLICA_URL not set")
+    return urls
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+async def databases(request, tmp_path, anyio_backend, monkeypatch):
+    primary_url, replica_url = get_urls(request.param, tmp_path)
+    primary = await create_database(primary_url, "primary")
+    replica = await create_database(replica_url, "replica")
+    lag = ReplicaLag(replica, interval=60)
+    monkeypatch.setattr(db_session, "engine", primary)
+    monkeypatch.setattr(db_session, "read_engine", replica)
+    monkeypatch.setattr(
+        db_session, "session", async_sessionmaker(bind=primary)
+    )
+    monkeypatch.setattr(
+        db_session, "read_session", async_sessionmaker(bind=replica)
+    )
+    monkeypatch.setattr(db_session, "replica_lag", lag)
+    yield primary, replica, lag
+    await primary.dispose()
+    await replica.dispose()
+
+
+def set_lag(lag: ReplicaLag, seconds: float) -> None:
+    lag.seconds = seconds
+    lag.checked_at = monotonic()
+
+
+async def read_patron(**kwargs) -> str:
+    return (await crud.get_row(PATRON, **kwargs)).patron
+
+
+async def test_reads_go_to_a_replica_within_staleness(databases):
+    _, _, lag = databases
+    set_lag(lag, 1)
+    assert await read_patron(max_staleness=5) == "replica"
+
+
+async def test_lagging_replica_falls_back_to_primary(databases):
+    _, _, lag = databases
+    set_lag(lag, 30)
+    assert await read_patron(max_staleness=5) == "primary"
+
+
+async def test_zero_staleness_reads_the_primary(databases):
+    _, _, lag = databases
+    set_lag(lag, 0)
+    assert await read_patron(max_staleness=0) == "primary"
+
+
+async def test_caller_session_reads_its_own_writes(databases):
+    _, _, lag = databases
+    set_lag(lag, 0)
+    async with db_session.session() as session:
+        community = await session.get(
+            Community, "0192f1a0000070008000000000000001"
+        )
+        community.patron = "written"
+        await session.flush()
+        assert await read_patron(session=session) == "written"
+
+
+async def test_unreachable_replica_is_treated_as_lagging(databases):
+    primary, _, _ = databases
+    broken = create_async_engine(
+        "postgresql+asyncpg://nobody@127.0.0.1:1/missing"
+    )
+    lag = ReplicaLag(broken, interval=60)
+    db_session.replica_lag = lag
+    try:
+        assert await read_patron(max_staleness=5) == "primary"
+        assert lag.check_errors.value == 1
+        assert await lag.get_seconds() == float("inf")
+        assert lag.check_errors.value == 1
+    finally:
+        await broken.dispose()
+
+
+async def test_without_a_replica_everything_reads_the_primary(
+    databases, monkeypatch
+):
+    primary, _, _ = databases
+    monkeypatch.setattr(db_session, "read_engine", primary)
+    assert await read_patron() == "primary"
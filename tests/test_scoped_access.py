@@ -0,0 +1,107 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert, update
+from controller.auth import jwt
+from controller.crud.user import user_cache
+from database import engine
+from main import app
+from models import Community, User
+
+pytestmark = pytest.mark.anyio
+
+OTHER_COMMUNITY_ID = "0192f1a0000070008000000000000002"
+SIGN_UP = {
+    "cpf": "52998224725",
+    "name": "Maria Silva",
+    "password": "Senha@123",
+    "birthday": "1990-01-01",
+    "community": "sao jose",
+    "phone": "+5511987654321",
+}
+
+
+@pytest.fixture
+async def client(database, community):
+    async with engine.begin() as connection:
+        await connection.execute(
+            insert(Community).values(
+                id=OTHER_COMMUNITY_ID,
+                patron="santa ana",
+                location="y",
+                email="b@b.com",
+            )
+        )
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://test"
+    ) as client:
+        yield client
+    user_cache.invalidate(SIGN_UP["cpf"])
+
+
+@pytest.fixture
+async def headers(client):
+    response = await client.post("/signup", json=SIGN_UP)
+    return {"Authorization": response.json()["access_token"]}
+
+
+async def change_user(statement) -> None:
+    async with engine.begin() as connection:
+        await connection.execute(statement)
+    user_cache.invalidate(SIGN_UP["cpf"])
+
+
+async def get_finances(client, headers, patron: str = "sao jose"):
+    return await client.get(
+        f"/community/{patron}/finance/2026", headers=headers
+    )
+
+
+async def test_scoped_to_the_token_community(client, headers):
+    assert (await get_finances(client, headers)).status_code == 200
+
+
+async def test_other_patron_is_forbidden(client, headers):
+    response = await get_finances(client, headers, "santa ana")
+    assert response.status_code == 403
+
+
+async def test_deactivated_user_loses_access(client, headers):
+    await change_user(update(User).values(active=False))
+    assert (await get_finances(client, headers)).status_code == 401
+
+
+async def test_moved_user_loses_access(client, headers):
+    await change_user(update(User).values(community_id=OTHER_COMMUNITY_ID))
+    assert (await get_finances(client, headers)).status_code == 401
+    response = await get_finances(client, headers, "santa ana")
+    assert response.status_code == 401
+
+
+async def test_deleted_user_loses_access(client, headers):
+    await change_user(delete(User))
+    assert (await get_finances(client, headers)).status_code == 401
+
+
+async def test_unknown_patron_without_a_patron_claim(client, headers):
+    # Tokens issued before the patron claim look the community up.
+    headers = {"Authorization": jwt.create_access_token(SIGN_UP["cpf"])}
+    assert (await get_finances(client, headers)).status_code == 200
+    response = await get_finances(client, headers, "unknown")
+    assert response.status_code == 404
+
+
+async def test_profile_update_with_an_unknown_patron(client, headers):
+    profile = {
+        key: SIGN_UP[key] for key in ("cpf", "phone", "name", "birthday")
+    }
+    response = await client.put(
+        "/me", json={**profile, "community_patron": "unknown"}, headers=headers
+    )
+    assert response.status_code == 404
+    response = await client.put(
+        "/me",
+        json={**profile, "community_patron": "santa ana"},
+        headers=headers,
+    )
+    assert response.status_code == 200
@@ -0,0 +1,157 @@
+import random
+import pytest
+from fastapi import HTTPException
+from controller.validators.cpf import (
+    CPFValidator,
+    validate_cpfs,
+    ONLY_DIGITS_ERROR,
+)
+from controller.validators.date import DateValidator, validate_birthdays
+from controller.validators.name import NameValidator, validate_names
+from controller.validators.password import (
+    PasswordValidator,
+    validate_passwords,
+)
+from controller.validators.phone import PhoneValidator, validate_phones
+from controller.validators.sign_validator import (
+    SignUpValidator,
+    validate_sign_ups,
+)
+
+SEED = 20261018
+
+
+def get_scalar_error(validator, value) -> str | None:
+    try:
+        validator(value)
+    except HTTPException as error:
+        return error.detail
+    return None
+
+
+def add_check_digits(digits: str) -> str:
+    for weight in (10, 11):
+        total = sum(
+            int(digit) * (weight - index) for index, digit in enumerate(digits)
+        )
+        digit = 11 - total % 11
+        digits += str(0 if digit > 9 else digit)
+    return digits
+
+
+def get_cpfs(generator: random.Random) -> list[str]:
+    cpfs = ["", "1234567890", "123456789012", "00000000000", "52998224725"]
+    for _ in range(300):
+        digits = "".join(generator.choices("0123456789", k=9))
+        cpf = add_check_digits(digits)
+        cpfs.append(cpf)
+        cpfs.append(cpf[:9] + str((int(cpf[9]) + 1) % 10) + cpf[10])
+        cpfs.append(cpf[:10] + str((int(cpf[10]) + 1) % 10))
+    return cpfs
+
+
+def get_names(generator: random.Random) -> list[str]:
+    names = ["", "Al", "Ana", "Maria Silva", "Jo4o", "Jose!", 'Lu"a']
+    alphabet = "abcdeABCDE 19!;"
+    names += [
+        "".join(generator.choices(alphabet, k=generator.randint(0, 8)))
+        for _ in range(300)
+    ]
+    return names
+
+
+def get_birthdays(generator: random.Random) -> list[str]:
+    birthdays = ["", "1990-01-01", "1990-1-1", "01/01/1990", "1990-02-30"]
+    birthdays += ["2020-05-05", "1850-05-05", "abcd-ef-gh", "1990-13-01"]
+    birthdays += [
+        f"{generator.randint(1880, 2026)}-{generator.randint(0, 13)}"
+        f"-{generator.randint(0, 32)}"
+        for _ in range(300)
+    ]
+    return birthdays
+
+
+def get_passwords(generator: random.Random) -> list[str]:
+    passwords = ["", "Senha@123", "senha@123", "Senha@abc", "Senha1234"]
+    passwords += ["Senha @123", "S@1"]
+    alphabet = "abcAB12@! "
+    passwords += [
+        "".join(generator.choices(alphabet, k=generator.randint(0, 12)))
+        for _ in range(300)
+    ]
+    return passwords
+
+
+def get_phones() -> list[str]:
+    return [
+        "",
+        "+5511987654321",
+        "(11) 98765-4321",
+        "+55 11 98765-4321",
+        "5511987654321",
+        "+1 202 555 0143",
+        "12345",
+        "+999123456789",
+        "abc",
+        "+55-11-9876-54321",
+    ]
+
+
+@pytest.mark.parametrize(
+    "validator, validate, get_values",
+    [
+        (CPFValidator, validate_cpfs, get_cpfs),
+        (NameValidator, validate_names, get_names),
+        (DateValidator, validate_birthdays, get_birthdays),
+        (PasswordValidator, validate_passwords, get_passwords),
+        (PhoneValidator, validate_phones, lambda _: get_phones()),
+    ],
+)
+def test_batch_matches_the_scalar_validator(validator, validate, get_values):
+    values = get_values(random.Random(SEED))
+    expected = [get_scalar_error(validator, value) for value in values]
+    assert validate(values) == expected
+
+
+def test_batch_reports_non_digit_cpfs():
+    # CPFValidator crashes with ValueError on these, the batch path
+    # reports them.
+    with pytest.raises(ValueError):
+        CPFValidator("5299822472a")
+    assert validate_cpfs(["5299822472a", "529.982.247"]) == [
+        ONLY_DIGITS_ERROR,
+        ONLY_DIGITS_ERROR,
+    ]
+
+
+def test_batch_sign_ups_keep_the_first_error():
+    generator = random.Random(SEED)
+    columns = {
+        "cpf": get_cpfs(generator),
+        "name": get_names(generator),
+        "birthday": get_birthdays(generator),
+        "password": get_passwords(generator),
+        "phone": get_phones(),
+    }
+    valid = {
+        "cpf": "52998224725",
+        "name": "Maria Silva",
+        "birthday": "1990-01-01",
+        "password": "Senha@123",
+        "phone": "+5511987654321",
+    }
+    # Most fields stay valid so that every column gets to reject rows.
+    rows = [
+        {
+            field: (
+                generator.choice(values)
+                if generator.random() < 0.3
+                else valid[field]
+            )
+            for field, values in columns.items()
+        }
+        for _ in range(2000)
+    ]
+    expected = [get_scalar_error(SignUpValidator, row) for row in rows]
+    assert validate_sign_ups(rows) == expected
+    assert None in expected